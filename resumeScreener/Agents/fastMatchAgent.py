@@ -0,0 +1,116 @@
+"""
+    Fast Match Agent - Parse the resume, parse the job description and match them in a single LLM call.
+"""
+
+import textwrap
+from typing import Dict, Any
+
+from prompting import count_tokens
+from jsonstream import acomplete_json
+
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FastMatchAgent:
+    """
+        One round trip instead of three. Only the match-relevant fields are extracted, the other
+        parsed fields are filled with the parser defaults so the result has the usual shape.
+    """
+
+    def __init__(self, llm, resume_agent, jd_agent, matcher_agent):
+        self.llm = llm
+        self.resume_agent = resume_agent
+        self.jd_agent = jd_agent
+        self.matcher_agent = matcher_agent
+
+    def __build_prompt__(self, resume_text: str, jd_text: str) -> str:
+        """
+            Build the combined extraction and matching prompt for the LLM.
+        """
+        prompt = f"""
+                You are a highly skilled technical recruiter. Read the resume and the job description below, extract the key facts from both and evaluate how well the candidate fits the job.
+
+                Return a single JSON object with exactly these keys:
+                {{
+                    "resume": {{
+                        "name": string,
+                        "education": list of strings (institution names and degrees),
+                        "experience": list of objects with keys "company", "title", "description" and "years of experience",
+                        "skills": list of strings (all mentioned skills),
+                        "projects": list of short descriptions,
+                        "certifications": list of strings,
+                        "summary": 1-2 sentence string
+                    }},
+                    "job_description": {{
+                        "title": job title,
+                        "experience required": minimum years of experience as a string,
+                        "qualifications": list of educational qualifications,
+                        "required skills": list of skills required for the job,
+                        "preferred skills": list of skills preferred for the job,
+                        "summary": 1-2 sentence summary of the job
+                    }},
+                    "match": {{
+                        "match_score": integer from 0 to 100 (technical skills 30%, soft skills 15%, experience 25%, education 10%, domain 10%, projects 10%),
+                        "domain_relevance": integer from 0 to 100, relevance of the candidate's domain / industry experience,
+                        "project_relevance": integer from 0 to 100, relevance and impact of the candidate's projects,
+                        "matching_skills": skills found in both the resume and the job description,
+                        "missing_skills": skills required by the job but missing in the resume,
+                        "Suggestions": list of specific suggestions to improve the resume for this job
+                    }}
+                }}
+
+                If a field is not found, use the string "N/A".
+
+                Resume:
+                {resume_text}
+
+                Job description:
+                {jd_text}
+
+                Respond ONLY with the JSON object. No explanations, markdown or extra text.
+            """
+        prompt = textwrap.dedent(prompt).strip()
+        logger.info(f"Fast match prompt: {count_tokens(prompt)} tokens")
+        return prompt
+
+    def __process_response__(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Split the combined JSON object into resume_data, jd_data and match_results.
+        """
+        if not parsed_data:
+            raise ValueError("No valid JSON found in response")
+
+        resume_data = self.resume_agent.__get_default_response__()
+        resume_data.update({key: value for key, value in (parsed_data.get("resume") or {}).items() if key in resume_data})
+
+        jd_data = self.jd_agent.__get_default_response__()
+        jd_data.update({key: value for key, value in (parsed_data.get("job_description") or {}).items() if key in jd_data})
+
+        match_results = self.matcher_agent.__get_default_response__()
+        match_results.update(parsed_data.get("match") or {})
+
+        return {"resume_data": resume_data, "jd_data": jd_data, "match_results": match_results}
+
+    async def arun(self, resume, jd_text: str) -> Dict[str, Any]:
+        """
+            Run the fast match on a resume (file path, bytes, stream or pasted text) and the raw JD text.
+        """
+        resume_text = await self.resume_agent.aparse_resume(resume)
+        jd_text = self.jd_agent.parse_job_description(jd_text)
+
+        parsed_data = await acomplete_json(
+            self.llm, self.__build_prompt__(resume_text, jd_text), ["resume", "job_description", "match"], agent="fast_match"
+        )
+        try:
+            results = self.__process_response__(parsed_data)
+        except Exception as e:
+            logger.error(f"Error in fast match: {e}")
+            raise ValueError(f"Fast match returned an invalid response: {e}")
+
+        results["match_results"] = self.matcher_agent.__apply_local_score__(
+            results["match_results"], results["resume_data"], results["jd_data"]
+        )
+        return results
@@ -6,13 +6,15 @@ import os
 import json
 from typing import Dict, List, Any, Optional
 
-from dotenv import load_dotenv
-load_dotenv()
-
 import sys
-sys.path.append(os.getcwd())
-from config import FILE_CONFIG
+if __name__ == "__main__":
+    # Run as a script - the shared modules live one directory up
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import FILE_CONFIG, CACHE_CONFIG
 from utils import initialize_llm
+from cache import build_cache, content_hash
+from jsonstream import complete_json, acomplete_json
+from metrics import CACHE_REQUESTS, FALLBACK_RESPONSES
 
 import logging
 
@@ -21,8 +23,10 @@ logger = logging.getLogger(__name__)
 
 
 class JDParserAgent:
-    def __init__(self, llm):
+    def __init__(self, llm, cache=None):
         self.llm = llm
+        # Parsed JDs keyed on the normalized JD text, popular postings are resubmitted constantly
+        self.cache = cache if cache is not None else build_cache(CACHE_CONFIG["jd_parser"])
 
     def parse_job_description(self, jd_text: str) -> Dict[str, Any]:
         """
@@ -33,12 +37,11 @@ class JDParserAgent:
         
         return jd_text.strip()
     
-    def __parse_response__(self, jd_text: str) -> Dict[str, Any]:
+    def __build_prompt__(self, jd_text: str) -> str:
         """
-            Parse the response from the LLM.
+            Build the extraction prompt for the LLM.
         """
-        try:
-            prompt = f"""
+        return f"""
                 You are a job description parsing engine.
 
                 Extract the following fields from the given job description and return a valid JSON object only. Do not include any explanations, text, markdown, or formatting—only the raw JSON.
@@ -69,44 +72,58 @@ class JDParserAgent:
                 Respond ONLY with a valid JSON object. No extra text.
             """
 
-            response = self.llm.invoke(prompt)
-
-            # Clean the response - remove any markdown or extra text
-            cleaned_response = response.content.strip() if hasattr(response, 'content') else response.strip()
-
-            # logger.info(f"RAW LLM RESPONSE (JD PARSER) : {cleaned_response}")
-            
-            # Find JSON in response (in case LLM adds extra text) - cause json is a dict so extracting indices of '{' and '}' from the string.
-            start_idx = cleaned_response.find('{')
-            end_idx = cleaned_response.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != 0:
-                json_str = cleaned_response[start_idx:end_idx]
-                parsed_data = json.loads(json_str)
-
-                return {
-                    "title": parsed_data.get("title", "N/A"),
-                    "company": parsed_data.get("company", "N/A"),
-                    "location": parsed_data.get("location", "N/A"),
-                    "type": parsed_data.get("type", "N/A"),
-                    "experience required": parsed_data.get("experience required", "N/A"),
-                    "qualifications": parsed_data.get("qualifications", "N/A"),
-                    "required skills": parsed_data.get("required skills", "N/A"),
-                    "preferred skills": parsed_data.get("preferred skills", "N/A"),
-                    "salary": parsed_data.get("salary", "N/A"),
-                    "work type": parsed_data.get("work type", "N/A"),
-                    "summary": parsed_data.get("summary", "N/A"),
-                    "other": parsed_data.get("other", "N/A")
-                }
-            else:
-                raise ValueError("Invalid JSON response")
-        except json.JSONDecodeError as e:
-            print(f"JSON Decode Error: {e}")
-            print('--------------------------------')
-            print(f"Response: {response}")
-            print('--------------------------------')
-            
+    def __parse_response__(self, jd_text: str) -> Dict[str, Any]:
+        """
+            Parse the response from the LLM.
+        """
+        try:
+            parsed_data = complete_json(
+                self.llm, self.__build_prompt__(jd_text), list(self.__get_default_response__()), agent="jd_parser"
+            )
+        except Exception as e:
+            logger.warning(f"Error in job description parsing: {e}")
+            FALLBACK_RESPONSES.inc(agent="jd_parser")
+            return self.__get_default_response__()
+
+        return self.__process_response__(parsed_data)
+
+    async def __aparse_response__(self, jd_text: str) -> Dict[str, Any]:
+        """
+            Parse the response from the LLM without blocking the event loop.
+        """
+        try:
+            parsed_data = await acomplete_json(
+                self.llm, self.__build_prompt__(jd_text), list(self.__get_default_response__()), agent="jd_parser"
+            )
+        except Exception as e:
+            logger.warning(f"Error in job description parsing: {e}")
+            FALLBACK_RESPONSES.inc(agent="jd_parser")
             return self.__get_default_response__()
+
+        return self.__process_response__(parsed_data)
+
+    def __process_response__(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Map the parsed (and repaired) JSON onto the job description fields.
+        """
+        if not parsed_data:
+            FALLBACK_RESPONSES.inc(agent="jd_parser")
+            return self.__get_default_response__()
+
+        return {
+            "title": parsed_data.get("title", "N/A"),
+            "company": parsed_data.get("company", "N/A"),
+            "location": parsed_data.get("location", "N/A"),
+            "type": parsed_data.get("type", "N/A"),
+            "experience required": parsed_data.get("experience required", "N/A"),
+            "qualifications": parsed_data.get("qualifications", "N/A"),
+            "required skills": parsed_data.get("required skills", "N/A"),
+            "preferred skills": parsed_data.get("preferred skills", "N/A"),
+            "salary": parsed_data.get("salary", "N/A"),
+            "work type": parsed_data.get("work type", "N/A"),
+            "summary": parsed_data.get("summary", "N/A"),
+            "other": parsed_data.get("other", "N/A")
+        }
         
     def __get_default_response__(self) -> Dict[str, Any]:
         """
@@ -133,7 +150,57 @@ class JDParserAgent:
         """
         logger.info(f"Parsing job description")
         jd_text = self.parse_job_description(jd_text)
-        return self.__parse_response__(jd_text)
+
+        cached = self.__get_cached__(jd_text)
+        if cached is not None:
+            return cached
+
+        jd_data = self.__parse_response__(jd_text)
+        self.__set_cached__(jd_text, jd_data)
+        return jd_data
+
+    async def arun(self, jd_text: str) -> Dict[str, Any]:
+        """
+            Run the JD parser agent asynchronously.
+        """
+        logger.info(f"Parsing job description")
+        jd_text = self.parse_job_description(jd_text)
+
+        cached = self.__get_cached__(jd_text)
+        if cached is not None:
+            return cached
+
+        jd_data = await self.__aparse_response__(jd_text)
+        self.__set_cached__(jd_text, jd_data)
+        return jd_data
+
+    def __get_cached__(self, jd_text: str) -> Optional[Dict[str, Any]]:
+        """
+            Look up a previously parsed job description.
+        """
+        if self.cache is None:
+            return None
+
+        cached = self.cache.get(f"jd:{content_hash(jd_text)}")
+        if cached is not None:
+            logger.info("Job description cache hit")
+        CACHE_REQUESTS.inc(cache="jd_parser", result="miss" if cached is None else "hit")
+        return cached
+
+    def __set_cached__(self, jd_text: str, jd_data: Dict[str, Any]) -> None:
+        """
+            Store a parsed job description, failed parses are not cached.
+        """
+        if self.cache is None or jd_data == self.__get_default_response__():
+            return
+
+        self.cache.set(f"jd:{content_hash(jd_text)}", jd_data)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+            Hit / miss counts of the JD cache.
+        """
+        return self.cache.stats() if self.cache is not None else {}
         
 
 if __name__ == "__main__":
@@ -4,31 +4,75 @@
 
 import os
 import json
-from typing import Dict, List, Any, Optional
-
-from dotenv import load_dotenv
-load_dotenv()
+import textwrap
+from typing import Dict, List, Any, Optional, Callable
 
 import sys
-sys.path.append(os.getcwd())
-from config import FILE_CONFIG
+if __name__ == "__main__":
+    # Run as a script - the shared modules live one directory up
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import FILE_CONFIG, AGENT_CONFIG, CACHE_CONFIG
 from utils import initialize_llm
+from cache import build_cache
+from scoring import LocalScorer, as_list, normalize_skill
+from prompting import serialize_section, count_tokens
+from jsonstream import complete_json, acomplete_json
+from metrics import FALLBACK_RESPONSES, CACHE_REQUESTS
+import hashlib
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fields a match result depends on, edits anywhere else (salary, location, contact details, ...) reuse it
+RESUME_MATCH_FIELDS = ("skills", "experience", "education", "certifications", "projects")
+JD_MATCH_FIELDS = ("required skills", "preferred skills", "qualifications", "experience required")
+SKILL_FIELDS = {"skills", "required skills", "preferred skills"}
+
+
+def match_fingerprint(data: Dict[str, Any], fields) -> Dict[str, List[str]]:
+    """
+        Order-, case- and whitespace-insensitive view of the match-relevant fields
+    """
+    fingerprint = {}
+    for field in fields:
+        if field in SKILL_FIELDS:
+            values = {normalize_skill(value) for value in as_list(data.get(field))}
+        else:
+            values = {" ".join(value.lower().split()) for value in as_list(data.get(field))}
+        fingerprint[field] = sorted(value for value in values if value)
+    return fingerprint
+
 
 class MatcherAgent:
-    def __init__(self, llm):
+    def __init__(self, llm, scorer=None, cache=None):
         self.llm = llm
-    
-    def run(self, resume_json: Dict, jd_json: Dict) -> Dict[str, Any]:
+        # LLM match results keyed on the match-relevant fields, JD owners edit postings constantly
+        self.cache = cache if cache is not None else build_cache(CACHE_CONFIG["matcher"])
+        # Set-overlap parts of the rubric are scored locally, the LLM is needed only for suggestions
+        self.scorer = scorer or LocalScorer(max_missing_skills=AGENT_CONFIG["matcher"]["max_missing_skills"])
+        self.score_source = AGENT_CONFIG["matcher"].get("score_source", "llm")
+        self.compact_prompt = AGENT_CONFIG["matcher"].get("compact_prompt", False)
+        self.prompt_budget = AGENT_CONFIG["matcher"].get("prompt_budget", {})
+
+    def __serialize__(self, resume_json: Dict, jd_json: Dict):
         """
-        Complete matching analysis in one LLM call.
+        Resume and JD as prompt text, compacted and cut to the per-section token budget when enabled.
         """
-        try:
-            prompt = f"""
+        if not self.compact_prompt:
+            return json.dumps(resume_json), json.dumps(jd_json)
+
+        resume_str, resume_tokens = serialize_section(resume_json, self.prompt_budget.get("resume"))
+        jd_str, jd_tokens = serialize_section(jd_json, self.prompt_budget.get("jd"))
+        logger.info(f"Matcher prompt sections: resume {resume_tokens} tokens, jd {jd_tokens} tokens")
+        return resume_str, jd_str
+
+    def __build_prompt__(self, resume_json: Dict, jd_json: Dict) -> str:
+        """
+        Build the matching prompt for the LLM.
+        """
+        resume_str, jd_str = self.__serialize__(resume_json, jd_json)
+        prompt = f"""
                 You are a highly skilled technical recruiter. Carefully analyze and compare the following resume and job description, both provided as structured JSON.
 
                 Your task is to evaluate how well the candidate fits the job based on the following criteria and return a detailed JSON object with the evaluation.
@@ -41,6 +85,8 @@ class MatcherAgent:
                     - Education alignment (10%)
                     - Domain or industry relevance (10%)
                     - Project relevance or impact (10%)
+                - "domain_relevance": How relevant the candidate's domain / industry experience is to the job, integer from 0 to 100
+                - "project_relevance": How relevant and impactful the candidate's projects are for the job, integer from 0 to 100
 
                 Suggestions:
                 - Provide specific suggestions for improvements in the resume
@@ -59,6 +105,8 @@ class MatcherAgent:
                 Feedback Structure:
                 {{
                     "match_score": integer,  // final score from 0 to 100
+                    "domain_relevance": integer,  // 0 to 100
+                    "project_relevance": integer,  // 0 to 100
                     "matching_skills": ["skill1", "skill2"],  // skills found in both resume and job description
                     "missing_skills": ["skill3", "skill4"],   // skills required by the job but missing in the resume
                     "Suggestions": [
@@ -68,45 +116,166 @@ class MatcherAgent:
                     ]
                 }}
 
-                Resume JSON:
-                {json.dumps(resume_json)}
+                Resume JSON (empty fields omitted):
+                {resume_str}
 
-                Job Description JSON:
-                {json.dumps(jd_json)}
+                Job Description JSON (empty fields omitted):
+                {jd_str}
 
                 Instructions:
                 - Return ONLY a valid JSON object as specified, do not add any other text or markdown and do not forget to add at the end of the JSON object.
                 - Do not include explanations, markdown formatting, or any additional text.
                 Do not return any other text at all , return JSON object only.
             """
-            
-            response = self.llm.invoke(prompt)
-
-            # logger.info(f"RAW LLM RESPONSE (MATCHER AGENT) : {response}")
-
-            # Clean and parse JSON response
-            cleaned_response = response.content.strip() if hasattr(response, 'content') else response.strip()
-            start_idx = cleaned_response.find('{')
-            end_idx = cleaned_response.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != 0:
-                json_str = cleaned_response[start_idx:end_idx]
-                return json.loads(json_str)
-            else:
-                raise ValueError("No valid JSON found in response")
-                
+        if self.compact_prompt:
+            # The template's source indentation alone is ~25% of its tokens
+            prompt = textwrap.dedent(prompt).strip()
+        logger.info(f"Matcher prompt: {count_tokens(prompt)} tokens")
+        return prompt
+
+    def __process_response__(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fill the parsed (and repaired) JSON up to the full response shape.
+        """
+        if not parsed_data:
+            raise ValueError("No valid JSON found in response")
+
+        results = self.__get_default_response__()
+        results.update(parsed_data)
+        return results
+
+    def __get_default_response__(self) -> Dict[str, Any]:
+        """
+        Get the default response when matching fails.
+        """
+        return {
+            "match_score": 0.0,
+            "missing_skills": [],
+            "matching_skills": [],
+            "Suggestions": []
+        }
+
+    def __handle_error__(self, e: Exception, response) -> Dict[str, Any]:
+        """
+        Log the failed response and fall back to the default response.
+        """
+        logger.warning(f"Error in matching: {e}. Response: {response}")
+
+        FALLBACK_RESPONSES.inc(agent="matcher")
+        return self.__get_default_response__()
+    
+    def __cache_key__(self, resume_json: Dict, jd_json: Dict) -> str:
+        """
+        Stable hash of the match-relevant resume and JD fields.
+        """
+        fingerprint = {
+            "resume": match_fingerprint(resume_json, RESUME_MATCH_FIELDS),
+            "jd": match_fingerprint(jd_json, JD_MATCH_FIELDS)
+        }
+        digest = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"match:{digest}"
+
+    def __get_cached__(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previous LLM match of the same resume / JD requirements.
+        """
+        if self.cache is None:
+            return None
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info("Match cache hit")
+        CACHE_REQUESTS.inc(cache="matcher", result="miss" if cached is None else "hit")
+        return cached
+
+    def __set_cached__(self, key: str, results: Dict[str, Any]) -> None:
+        """
+        Store an LLM match, fallback responses are not cached.
+        """
+        if self.cache is None or results == self.__get_default_response__():
+            return
+
+        self.cache.set(key, results)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Hit / miss counts of the match cache.
+        """
+        return self.cache.stats() if self.cache is not None else {}
+
+    def score(self, resume_json: Dict, jd_json: Dict) -> Dict[str, Any]:
+        """
+        Deterministic local score only, no LLM call.
+        """
+        results = self.scorer.score(resume_json, jd_json)
+        results["Suggestions"] = []
+        return results
+
+    def __apply_local_score__(self, results: Dict[str, Any], resume_json: Dict, jd_json: Dict) -> Dict[str, Any]:
+        """
+        Replace the LLM's score and skill lists with the local scorer's, when configured. The score
+        combines the locally computed parts of the rubric with the LLM's domain and project ratings.
+        """
+        if self.score_source != "local":
+            return results
+
+        merged = dict(results)
+        merged["llm_match_score"] = results.get("match_score")
+        merged.update(self.scorer.score(resume_json, jd_json, assessment=results))
+        return merged
+    
+    def run(self, resume_json: Dict, jd_json: Dict, score_only: bool = False) -> Dict[str, Any]:
+        """
+        Complete matching analysis in one LLM call.
+        """
+        if score_only:
+            return self.score(resume_json, jd_json)
+
+        key = self.__cache_key__(resume_json, jd_json)
+        results = self.__get_cached__(key)
+        if results is not None:
+            return self.__apply_local_score__(results, resume_json, jd_json)
+
+        response = None
+        try:
+            response = complete_json(
+                self.llm, self.__build_prompt__(resume_json, jd_json), list(self.__get_default_response__()), agent="matcher"
+            )
+            results = self.__process_response__(response)
+            self.__set_cached__(key, results)
         except Exception as e:
-            print(f"Error in matching: {e}")
-            print('--------------------------------')
-            print(f"Response: {response}")
-            print('--------------------------------')
-            
-            return {
-                "match_score": 0.0,
-                "missing_skills": [],
-                "matching_skills": [],
-                "Suggestions": []
-            }
+            results = self.__handle_error__(e, response)
+
+        return self.__apply_local_score__(results, resume_json, jd_json)
+
+    async def arun(self, resume_json: Dict, jd_json: Dict, score_only: bool = False,
+                   on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Complete matching analysis in one non-blocking LLM call.
+
+        With on_token the completion is streamed and every token is passed to it as it arrives,
+        a cached match is returned at once without tokens.
+        """
+        if score_only:
+            return self.score(resume_json, jd_json)
+
+        key = self.__cache_key__(resume_json, jd_json)
+        results = self.__get_cached__(key)
+        if results is not None:
+            return self.__apply_local_score__(results, resume_json, jd_json)
+
+        response = None
+        try:
+            response = await acomplete_json(
+                self.llm, self.__build_prompt__(resume_json, jd_json), list(self.__get_default_response__()),
+                on_token=on_token, agent="matcher"
+            )
+            results = self.__process_response__(response)
+            self.__set_cached__(key, results)
+        except Exception as e:
+            results = self.__handle_error__(e, response)
+
+        return self.__apply_local_score__(results, resume_json, jd_json)
     
 if __name__ == "__main__":
     # Test with sample data
@@ -6,18 +6,21 @@
 
 import os
 import json
-from typing import Dict, List, Any, Optional
+import asyncio
+from typing import Dict, List, Any, Optional, Union, BinaryIO
 
 import sys
-sys.path.append(os.getcwd())
-from config import FILE_CONFIG
+if __name__ == "__main__":
+    # Run as a script - the shared modules live one directory up
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import FILE_CONFIG, CACHE_CONFIG, AGENT_CONFIG
 
-from dotenv import load_dotenv
-load_dotenv()
 from utils import initialize_llm
+from cache import build_cache, bytes_hash
 
-import PyPDF2
-from docx import Document
+from extraction import extract_text, extract_text_async, detect_format
+from jsonstream import complete_json, acomplete_json
+from metrics import EXTRACTION_SECONDS, CACHE_REQUESTS, FALLBACK_RESPONSES
 
 import logging
 
@@ -25,53 +28,73 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ResumeParserAgent:
-    def __init__(self, llm):
+    def __init__(self, llm, cache=None):
         self.llm = llm
+        # Parsed resumes keyed on a digest of the raw bytes, the same resume is submitted against many jobs
+        self.cache = cache if cache is not None else build_cache(CACHE_CONFIG["resume_parser"])
+        # Text beyond this budget is never extracted or sent to the LLM
+        self.max_text_length = AGENT_CONFIG["resume_parser"]["max_text_length"]
 
-    def parse_resume(self, resume_file: str) -> Dict[str, Any]: # NOTE: Need to add the text limit length here
+    def read_resume(self, resume: Union[str, bytes, BinaryIO]) -> bytes:
         """
-        Parse the resume and extract the relevant information.
+        Normalize the resume input to raw bytes.
+
+        Accepts a file path, raw bytes, a binary / text stream or pasted resume text
+        (any string that is not an existing file). A single-line string ending in a
+        supported extension is taken as a path and must exist.
         """
-        if resume_file is None:
+        if resume is None:
             raise ValueError("Resume file is required")
-        
-        possible_extensions = FILE_CONFIG["supported_formats"]
-        # extensions are not in possible_extensions
-        if not resume_file.endswith(tuple(possible_extensions)):
-            raise ValueError("Invalid file extension")
-        
-        if resume_file.endswith(".pdf"):
-            try:
-                with open(resume_file, "rb") as file:
-                        
-                    pdf_reader = PyPDF2.PdfReader(file, strict=False)  # Add strict=False
-                    text = ""
-                    for page in pdf_reader.pages:
-                        text += page.extract_text()
-                    resume_text = text
-            except Exception as e:
-                logger.error(f"PDF parsing failed: {e}")
-                resume_text = f"Error reading PDF: {str(e)}"
-        elif resume_file.endswith(".docx"):
-            # read the docx file
-            doc = Document(resume_file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            resume_text = text
-        elif resume_file.endswith(".txt"):
-            # read the txt file
-            with open(resume_file, "r", encoding="utf-8") as file:
-                resume_text = file.read()
 
+        if isinstance(resume, (bytes, bytearray, memoryview)):
+            return bytes(resume)
+
+        if hasattr(resume, "read"):
+            if hasattr(resume, "seek"):
+                resume.seek(0)
+            data = resume.read()
+            return data.encode("utf-8") if isinstance(data, str) else data
+
+        if isinstance(resume, os.PathLike) or os.path.isfile(resume):
+            resume = os.fspath(resume)
+            possible_extensions = FILE_CONFIG["supported_formats"]
+            # extensions are not in possible_extensions
+            if not resume.endswith(tuple(possible_extensions)):
+                raise ValueError("Invalid file extension")
+
+            with open(resume, "rb") as file:
+                return file.read()
+
+        if "\n" not in resume and resume.strip().lower().endswith(tuple(FILE_CONFIG["supported_formats"])):
+            raise FileNotFoundError(f"Resume file not found: {resume}")
+
+        # Pasted resume text
+        return resume.encode("utf-8")
+
+    def parse_resume(self, resume: Union[str, bytes, BinaryIO]) -> str:
+        """
+        Extract the resume text, the format is detected from the content.
+        """
+        resume_bytes = self.read_resume(resume)
+        with EXTRACTION_SECONDS.time(format=detect_format(resume_bytes)):
+            return extract_text(resume_bytes, self.max_text_length)
+
+    async def aparse_resume(self, resume: Union[str, bytes, BinaryIO]) -> str:
+        """
+        Extract the resume text without blocking the event loop.
+        """
+        resume_bytes = await asyncio.to_thread(self.read_resume, resume)
+        with EXTRACTION_SECONDS.time(format=detect_format(resume_bytes)):
+            resume_text = await extract_text_async(resume_bytes, self.max_text_length)
+        if not resume_text.strip():
+            raise ValueError("No text could be extracted from the resume")
         return resume_text
     
-    def __parse_response__(self, resume_text: str) -> Dict[str, Any]:
+    def __build_prompt__(self, resume_text: str) -> str:
         """
-            Parse the response fromt the LLM.
+            Build the extraction prompt for the LLM.
         """
-        try:
-            prompt = f"""
+        return f"""
                 You are a resume extraction engine. Extract the following fields from the given resume text and return only a valid JSON object. No extra text, markdown, or code blocks.
 
                 Required JSON structure:
@@ -101,51 +124,62 @@ class ResumeParserAgent:
                 {resume_text}
             """
 
-            response = self.llm.invoke(prompt)
-
-            # Clean the response - remove any markdown or extra text
-            cleaned_response = response.content.strip() if hasattr(response, 'content') else response.strip()
-            
-            # logger.info(f"RAW LLM RESPONSE (RESUME PARSER) : {cleaned_response}")
-            
-            # Find JSON in response (in case LLM adds extra text)
-            start_idx = cleaned_response.find('{')
-            end_idx = cleaned_response.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != 0:
-                json_str = cleaned_response[start_idx:end_idx]
-                parsed_data = json.loads(json_str)
-
-                return {
-                    "name": parsed_data.get("name", "N/A"),
-                    "email": parsed_data.get("email", "N/A"),
-                    "phone": parsed_data.get("phone", "N/A"),
-                    "linkedin": parsed_data.get("linkedin", "N/A"),
-                    "github": parsed_data.get("github", "N/A"),
-                    "portfolio url": parsed_data.get("portfolio url", "N/A"),
-                    "education": parsed_data.get("education", "N/A"),
-                    "experience": parsed_data.get("experience", "N/A"),
-                    "skills": parsed_data.get("skills", "N/A"),
-                    "projects": parsed_data.get("projects", "N/A"),
-                    "certifications": parsed_data.get("certifications", "N/A"),
-                    "publications": parsed_data.get("publications", "N/A"),
-                    "awards": parsed_data.get("awards", "N/A"),
-                    "summary": parsed_data.get("summary", "N/A"),
-                    "other": parsed_data.get("other", "N/A")
-                }
-            else:
-                raise ValueError("Invalid JSON response")
-        except json.JSONDecodeError as e:
-            print(f"JSON Decode Error: {e}")
-            print('--------------------------------')
-            print(f"Response: {response}")
-            print('--------------------------------')
-
+    def __parse_response__(self, resume_text: str) -> Dict[str, Any]:
+        """
+            Parse the response fromt the LLM.
+        """
+        try:
+            parsed_data = complete_json(
+                self.llm, self.__build_prompt__(resume_text), list(self.__get_default_response__()), agent="resume_parser"
+            )
+        except Exception as e:
+            logger.warning(f"Error in resume parsing: {e}")
+            FALLBACK_RESPONSES.inc(agent="resume_parser")
             return self.__get_default_response__()
+
+        return self.__process_response__(parsed_data)
+
+    async def __aparse_response__(self, resume_text: str) -> Dict[str, Any]:
+        """
+            Parse the response from the LLM without blocking the event loop.
+        """
+        try:
+            parsed_data = await acomplete_json(
+                self.llm, self.__build_prompt__(resume_text), list(self.__get_default_response__()), agent="resume_parser"
+            )
         except Exception as e:
-            print(f"Error: {e}")
+            logger.warning(f"Error in resume parsing: {e}")
+            FALLBACK_RESPONSES.inc(agent="resume_parser")
             return self.__get_default_response__()
-            
+
+        return self.__process_response__(parsed_data)
+
+    def __process_response__(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+            Map the parsed (and repaired) JSON onto the resume fields.
+        """
+        if not parsed_data:
+            FALLBACK_RESPONSES.inc(agent="resume_parser")
+            return self.__get_default_response__()
+
+        return {
+            "name": parsed_data.get("name", "N/A"),
+            "email": parsed_data.get("email", "N/A"),
+            "phone": parsed_data.get("phone", "N/A"),
+            "linkedin": parsed_data.get("linkedin", "N/A"),
+            "github": parsed_data.get("github", "N/A"),
+            "portfolio url": parsed_data.get("portfolio url", "N/A"),
+            "education": parsed_data.get("education", "N/A"),
+            "experience": parsed_data.get("experience", "N/A"),
+            "skills": parsed_data.get("skills", "N/A"),
+            "projects": parsed_data.get("projects", "N/A"),
+            "certifications": parsed_data.get("certifications", "N/A"),
+            "publications": parsed_data.get("publications", "N/A"),
+            "awards": parsed_data.get("awards", "N/A"),
+            "summary": parsed_data.get("summary", "N/A"),
+            "other": parsed_data.get("other", "N/A")
+        }
+        
     def __get_default_response__(self) -> Dict[str, Any]:
         """
             Get the default response from the LLM.
@@ -168,15 +202,75 @@ class ResumeParserAgent:
             "other": "N/A"
         }
     
-    def run(self, resume_file: str) -> Dict[str, Any]:
+    def __get_cached__(self, digest: str) -> Optional[Dict[str, Any]]:
+        """
+            Look up a previously parsed resume.
+        """
+        if self.cache is None:
+            return None
+
+        cached = self.cache.get(f"resume:{digest}")
+        if cached is not None:
+            logger.info("Resume cache hit")
+        CACHE_REQUESTS.inc(cache="resume_parser", result="miss" if cached is None else "hit")
+        return cached
+
+    def __set_cached__(self, digest: str, resume_data: Dict[str, Any]) -> None:
+        """
+            Store a parsed resume, failed parses are not cached.
+        """
+        if self.cache is None or resume_data == self.__get_default_response__():
+            return
+
+        self.cache.set(f"resume:{digest}", resume_data)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+            Hit / miss counts of the resume cache.
+        """
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def run(self, resume: Union[str, bytes, BinaryIO]) -> Dict[str, Any]:
         """
-            Run the resume parser agent.
+            Run the resume parser agent on a file path, raw bytes, a stream or pasted text.
         """
-        logger.info(f"Parsing resume: {resume_file}")
-        resume_text = self.parse_resume(resume_file)
+        logger.info(f"Parsing resume")
+        resume_bytes = self.read_resume(resume)
+        digest = bytes_hash(resume_bytes)
+        cached = self.__get_cached__(digest)
+        if cached is not None:
+            return cached
+
+        resume_text = extract_text(resume_bytes, self.max_text_length)
+        if not resume_text.strip():
+            raise ValueError("No text could be extracted from the resume")
+
+        logger.info(f"Resume text")
+        resume_data = self.__parse_response__(resume_text)
+        self.__set_cached__(digest, resume_data)
+        return resume_data
+
+    async def arun(self, resume: Union[str, bytes, BinaryIO]) -> Dict[str, Any]:
+        """
+            Run the resume parser agent asynchronously, reading and extraction run off the event loop.
+        """
+        logger.info(f"Parsing resume")
+        resume_bytes = await asyncio.to_thread(self.read_resume, resume)
+        digest = bytes_hash(resume_bytes)
+        cached = self.__get_cached__(digest)
+        if cached is not None:
+            return cached
+
+        # PDF / DOCX extraction is CPU bound, it runs in the extraction process pool
+        with EXTRACTION_SECONDS.time(format=detect_format(resume_bytes)):
+            resume_text = await extract_text_async(resume_bytes, self.max_text_length)
+        if not resume_text.strip():
+            raise ValueError("No text could be extracted from the resume")
 
         logger.info(f"Resume text")
-        return self.__parse_response__(resume_text)
+        resume_data = await self.__aparse_response__(resume_text)
+        self.__set_cached__(digest, resume_data)
+        return resume_data
 
 
 if __name__ == "__main__":
@@ -1,19 +1,52 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 load_dotenv()
 
 import os
+import json
+import asyncio
 
-from main import process_resume_and_job
+from main import (
+    process_resume_and_job, stream_resume_and_job, process_batch, process_candidate, process_shortlist,
+    search_resumes, search_jobs, get_agents, warm_up, reindex_candidates
+)
+from llm_pool import llm_stats
+from evaluation import get_evaluation_queue
+from reports import get_report_writer
+from metrics import render_metrics, CONTENT_TYPE
+from jobs import get_job_queue, JobQueueFull
+from config import BATCH_CONFIG, WORKFLOW_CONFIG, RETRIEVAL_CONFIG, CANDIDATE_STORE_CONFIG
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start serving right away, the LLM client, agents, graph and tracer are built in the background
+    warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up)) if WORKFLOW_CONFIG["warm_up"] else None
+    # Stored candidates are searchable again once re-indexed, new analyses are indexed meanwhile
+    reindex_task = asyncio.create_task(asyncio.to_thread(reindex_candidates)) if RETRIEVAL_CONFIG["enabled"] else None
+    await get_job_queue().start()
+    yield
+    for task in (warm_up_task, reindex_task):
+        if task is not None:
+            # The worker thread finishes on its own, the task is not left pending
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    await get_job_queue().shutdown()
+    from extraction import shutdown_extraction_pool
+    shutdown_extraction_pool()
+    get_evaluation_queue().shutdown()
+    if get_report_writer() is not None:
+        get_report_writer().shutdown()
 
 # App intialization
 app = FastAPI(
     title = "Resume Match & Advisor API",
     description = "AI powered resume match and advisor API",
-    version = "1.0.0"
+    version = "1.0.0",
+    lifespan = lifespan
 )
 
 
@@ -24,11 +57,32 @@ async def health_check(): # TODO: add health check as whehter LLM is accessible
         "message": "API is running"
     } 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+        Hit / miss counts of the parse and match caches, and LLM calls saved by single-flight coalescing
+    """
+    return {
+        "resume_parser": get_agents().resume_agent.cache_stats(),
+        "jd_parser": get_agents().jd_agent.cache_stats(),
+        "matcher": get_agents().matcher_agent.cache_stats(),
+        "llm": llm_stats()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """
+        Stage latencies, queue waits, cache hits, fallbacks and errors in the Prometheus text format
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
 @app.post("/analyze")
 async def analyze_resume(
     job_description: str = Form(...),
     resume_text: Optional[str] = Form(...),
-    resume_file: Optional[UploadFile] = File(None)
+    resume_file: Optional[UploadFile] = File(None),
+    score_only: bool = Form(False),
+    fast_mode: bool = Form(False)
 ):
     """
         Main Analysis Endpoint for Resume and Job Description
@@ -44,7 +98,9 @@ async def analyze_resume(
         result = await process_resume_and_job(
             job_description = job_description,
             resume_text = resume_text,
-            resume_file = resume_file
+            resume_file = resume_file,
+            score_only = score_only,
+            fast_mode = fast_mode
         )
 
         return {
@@ -55,6 +111,301 @@ async def analyze_resume(
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze/stream")
+async def analyze_resume_stream(
+    job_description: str = Form(...),
+    resume_text: Optional[str] = Form(...),
+    resume_file: Optional[UploadFile] = File(None),
+    score_only: bool = Form(False),
+    fast_mode: bool = Form(False)
+):
+    """
+        Streaming Analysis Endpoint - server-sent events per workflow node and per matcher token
+    """
+    # Validate inputs
+    if not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description is required")
+    if not resume_text.strip() and not resume_file:
+        raise HTTPException(status_code=400, detail="Resume file or text is required")
+
+    # The upload is closed once this handler returns, read it before streaming starts
+    resume_bytes = await resume_file.read() if resume_file else None
+
+    async def events():
+        async for event, data in stream_resume_and_job(
+            job_description = job_description,
+            resume_text = resume_text,
+            resume_bytes = resume_bytes,
+            score_only = score_only,
+            fast_mode = fast_mode
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type = "text/event-stream",
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/analyze/jobs", status_code=202)
+async def submit_analysis_job(
+    job_description: str = Form(...),
+    resume_text: Optional[str] = Form(...),
+    resume_file: Optional[UploadFile] = File(None),
+    score_only: bool = Form(False),
+    fast_mode: bool = Form(False)
+):
+    """
+        Queue an analysis and return its job ID right away, poll GET /analyze/jobs/{job_id} for the result
+    """
+    # Validate inputs
+    if not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description is required")
+    if not resume_text.strip() and not resume_file:
+        raise HTTPException(status_code=400, detail="Resume file or text is required")
+
+    # The upload is closed once this handler returns, the job keeps the bytes
+    resume_bytes = await resume_file.read() if resume_file else None
+
+    try:
+        job_id = get_job_queue().submit({
+            "job_description": job_description,
+            "resume_text": resume_text,
+            "resume_bytes": resume_bytes,
+            "score_only": score_only,
+            "fast_mode": fast_mode
+        })
+    except JobQueueFull as e:
+        # Backpressure - the client waits instead of piling more work onto a saturated backend
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    return {
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": f"/analyze/jobs/{job_id}"
+    }
+
+@app.get("/analyze/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """
+        Status of a queued analysis - queued, running, completed or failed - with the result once finished
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+@app.post("/analyze/batch")
+async def analyze_batch(
+    job_description: str = Form(...),
+    resume_texts: Optional[List[str]] = Form(None),
+    resume_files: Optional[List[UploadFile]] = File(None),
+    max_concurrency: Optional[int] = Form(None),
+    score_only: bool = Form(False),
+    shortlist: Optional[int] = Form(None)
+):
+    """
+        Batch Endpoint - rank many resumes against one Job Description
+    """
+    try:
+
+        # Validate inputs
+        if not job_description.strip():
+            raise HTTPException(status_code=400, detail="Job description is required")
+
+        resumes = []
+        for resume_file in resume_files or []:
+            resumes.append({
+                "name": resume_file.filename,
+                "bytes": await resume_file.read()
+            })
+        for index, resume_text in enumerate(resume_texts or []):
+            if resume_text.strip():
+                resumes.append({"name": f"resume_text_{index + 1}", "text": resume_text})
+
+        if not resumes:
+            raise HTTPException(status_code=400, detail="At least one resume file or text is required")
+        if len(resumes) > BATCH_CONFIG["max_resumes"]:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_CONFIG['max_resumes']} resumes per batch")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise HTTPException(status_code=400, detail="max_concurrency must be at least 1")
+        if shortlist is not None and shortlist < 1:
+            raise HTTPException(status_code=400, detail="shortlist must be at least 1")
+
+        result = await process_batch(
+            job_description = job_description,
+            resumes = resumes,
+            max_concurrency = max_concurrency,
+            score_only = score_only,
+            shortlist = shortlist
+        )
+
+        return {
+            "status": "success",
+            "message": f"Ranked {result['total']} resumes",
+            "data": result
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze/shortlist")
+async def analyze_shortlist(
+    job_description: str = Form(...),
+    top_k: Optional[int] = Form(None),
+    max_concurrency: Optional[int] = Form(None),
+    score_only: bool = Form(False)
+):
+    """
+        Shortlist Endpoint - match one Job Description against the most similar previously parsed resumes
+    """
+    try:
+
+        # Validate inputs
+        if not job_description.strip():
+            raise HTTPException(status_code=400, detail="Job description is required")
+        if top_k is not None and not 1 <= top_k <= BATCH_CONFIG["max_resumes"]:
+            raise HTTPException(status_code=400, detail=f"top_k must be between 1 and {BATCH_CONFIG['max_resumes']}")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise HTTPException(status_code=400, detail="max_concurrency must be at least 1")
+
+        result = await process_shortlist(
+            job_description = job_description,
+            top_k = top_k,
+            max_concurrency = max_concurrency,
+            score_only = score_only
+        )
+
+        return {
+            "status": "success",
+            "message": f"Ranked {result['total']} of {result['indexed']} indexed resumes",
+            "data": result
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/search/resumes")
+async def search_similar_resumes(
+    job_description: str = Form(...),
+    top_k: int = Form(RETRIEVAL_CONFIG["default_top_k"])
+):
+    """
+        Search Endpoint - previously parsed resumes most similar to a Job Description, no LLM matching
+    """
+    if not job_description.strip():
+        raise HTTPException(status_code=400, detail="Job description is required")
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+
+    try:
+        return {"status": "success", "data": await search_resumes(job_description, top_k)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/search/jobs")
+async def search_similar_jobs(
+    resume_text: Optional[str] = Form(None),
+    resume_file: Optional[UploadFile] = File(None),
+    top_k: int = Form(RETRIEVAL_CONFIG["default_top_k"])
+):
+    """
+        Search Endpoint - previously parsed Job Descriptions most similar to a resume, no LLM matching
+    """
+    if not (resume_text or "").strip() and not resume_file:
+        raise HTTPException(status_code=400, detail="Resume file or text is required")
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+
+    resume = {"bytes": await resume_file.read()} if resume_file else {"text": resume_text}
+    try:
+        return {"status": "success", "data": await search_jobs(resume, top_k)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/candidates/search")
+async def search_candidates(q: str = "", limit: int = CANDIDATE_STORE_CONFIG["default_limit"]):
+    """
+        Candidate Search Endpoint - stored resumes matching e.g. "Python AND Django AND 3+ years", no LLM call
+    """
+    if not 1 <= limit <= CANDIDATE_STORE_CONFIG["max_limit"]:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {CANDIDATE_STORE_CONFIG['max_limit']}")
+
+    from candidates import get_candidate_store
+    try:
+        return {"status": "success", "data": await asyncio.to_thread(get_candidate_store().search, q, limit)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/candidates/{candidate_id}")
+async def get_candidate(candidate_id: str):
+    """
+        A stored candidate with its parsed resume
+    """
+    from candidates import get_candidate_store
+    candidate = await asyncio.to_thread(get_candidate_store().get, candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return {"status": "success", "data": candidate}
+
+@app.post("/analyze/candidate")
+async def analyze_candidate(
+    job_descriptions: List[str] = Form(...),
+    resume_text: Optional[str] = Form(None),
+    resume_file: Optional[UploadFile] = File(None),
+    job_titles: Optional[List[str]] = Form(None),
+    max_concurrency: Optional[int] = Form(None),
+    score_only: bool = Form(False)
+):
+    """
+        Candidate Endpoint - rank many Job Descriptions for one resume
+    """
+    try:
+
+        # Validate inputs
+        if not (resume_text or "").strip() and not resume_file:
+            raise HTTPException(status_code=400, detail="Resume file or text is required")
+
+        job_titles = job_titles or []
+        jobs = [
+            {"name": job_titles[index] if index < len(job_titles) else None, "text": job_description}
+            for index, job_description in enumerate(job_descriptions)
+            if job_description.strip()
+        ]
+
+        if not jobs:
+            raise HTTPException(status_code=400, detail="At least one job description is required")
+        if len(jobs) > BATCH_CONFIG["max_job_descriptions"]:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_CONFIG['max_job_descriptions']} job descriptions per request")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise HTTPException(status_code=400, detail="max_concurrency must be at least 1")
+
+        resume = {"bytes": await resume_file.read()} if resume_file else {"text": resume_text}
+
+        result = await process_candidate(
+            resume = resume,
+            job_descriptions = jobs,
+            max_concurrency = max_concurrency,
+            score_only = score_only
+        )
+
+        return {
+            "status": "success",
+            "message": f"Ranked {result['total']} job descriptions",
+            "data": result
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
     
 if __name__ == "__main__":
     import uvicorn
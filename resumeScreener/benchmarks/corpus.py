@@ -0,0 +1,83 @@
+"""
+Benchmark documents - the examples/ corpus, plus PDF and DOCX renderings of its text files
+"""
+
+import io
+import os
+import glob
+from typing import Dict, List
+
+from docx import Document
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+LINES_PER_PAGE = 40
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace").decode("latin-1")
+
+
+def make_pdf(text: str) -> bytes:
+    """
+        Minimal text-only PDF, one line per Tj, LINES_PER_PAGE lines per page
+    """
+    lines = text.splitlines() or [""]
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        body = " ".join(f"({_pdf_escape(line)}) Tj T*" for line in page)
+        stream = f"BT /F1 10 Tf 14 TL 50 750 Td {body} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R "
+            f"/Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n" # binary marker, like real PDF writers
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def make_docx(text: str) -> bytes:
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def load_corpus(repeat: int = 1) -> List[Dict[str, object]]:
+    """
+        [{"name", "format", "bytes"}] - every examples/ file as is, and every .txt as PDF and DOCX.
+        repeat multiplies the text so multi-page documents can be benchmarked too.
+    """
+    documents = []
+    for path in sorted(glob.glob(os.path.join(EXAMPLES_DIR, "*"))):
+        name = os.path.basename(path)
+        extension = os.path.splitext(name)[1].lower()
+        with open(path, "rb") as file:
+            data = file.read()
+
+        if extension == ".txt":
+            text = "\n".join([data.decode("utf-8", errors="ignore")] * repeat)
+            documents.append({"name": name, "format": "txt", "bytes": text.encode("utf-8")})
+            documents.append({"name": f"{name}.pdf", "format": "pdf", "bytes": make_pdf(text)})
+            documents.append({"name": f"{name}.docx", "format": "docx", "bytes": make_docx(text)})
+        elif extension in (".pdf", ".docx"):
+            documents.append({"name": name, "format": extension[1:], "bytes": data})
+    return documents
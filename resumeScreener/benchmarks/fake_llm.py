@@ -0,0 +1,115 @@
+"""
+Deterministic fake LLM (and a no-op tracer) for benchmarks - recognises the agent prompts and answers with
+synthetic JSON of configurable size after a configurable latency
+"""
+
+import json
+import time
+import random
+import asyncio
+from typing import Any, Dict
+
+
+class FakeLLM:
+    """
+        latency: seconds per call, spread evenly over the streamed chunks
+        response_scale: multiplies the number of skills / experience entries / suggestions
+    """
+
+    def __init__(self, latency: float = 0.0, response_scale: int = 1, chunk_size: int = 16, seed: int = 0):
+        self.latency = latency
+        self.response_scale = max(1, response_scale)
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.calls = 0
+
+    def _resume(self, rng: random.Random) -> Dict[str, Any]:
+        n = self.response_scale
+        return {
+            "name": "Jane Doe",
+            "email": "jane@example.com",
+            "phone": "N/A",
+            "education": ["B.S. in Computer Science, State University"] * n,
+            "experience": [
+                {
+                    "company": f"Company {i}",
+                    "title": "Software Engineer",
+                    "description": "Built and operated Python services on AWS. " * 3,
+                    "years of experience": str(rng.randint(1, 4))
+                }
+                for i in range(2 * n)
+            ],
+            "skills": [f"skill{rng.randint(0, 50)}" for _ in range(10 * n)] + ["Python", "Django", "SQL"],
+            "projects": ["Resume screening pipeline"] * n,
+            "certifications": "N/A",
+            "summary": "Backend engineer with a focus on data pipelines."
+        }
+
+    def _jd(self, rng: random.Random) -> Dict[str, Any]:
+        n = self.response_scale
+        return {
+            "title": "Backend Developer",
+            "company": "Acme",
+            "experience required": "3+ years",
+            "qualifications": ["Bachelor's degree in Computer Science"],
+            "required skills": ["Python", "Django", "React"] + [f"skill{rng.randint(0, 50)}" for _ in range(5 * n)],
+            "preferred skills": ["AWS", "Kubernetes"],
+            "summary": "Build and scale backend services. Strong communication skills."
+        }
+
+    def _match(self, rng: random.Random) -> Dict[str, Any]:
+        return {
+            "match_score": rng.randint(40, 95),
+            "matching_skills": ["Python", "Django"],
+            "missing_skills": ["React"],
+            "Suggestions": [f"Suggestion {i}: quantify the impact of your work." for i in range(3 * self.response_scale)],
+            "domain_relevance": rng.randint(30, 90),
+            "project_relevance": rng.randint(30, 90)
+        }
+
+    def response(self, prompt: str) -> str:
+        self.calls += 1
+        # Same prompt, same answer
+        rng = random.Random(f"{self.seed}:{len(prompt)}")
+
+        if "extract the key facts from both" in prompt:
+            data = {"resume": self._resume(rng), "job_description": self._jd(rng), "match": self._match(rng)}
+        elif "resume extraction engine" in prompt:
+            data = self._resume(rng)
+        elif "job description parsing engine" in prompt:
+            data = self._jd(rng)
+        else:
+            data = self._match(rng)
+        return "```json\n" + json.dumps(data, indent=2) + "\n```"
+
+    def _chunks(self, text: str):
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+
+    def invoke(self, prompt: str) -> str:
+        time.sleep(self.latency)
+        return self.response(prompt)
+
+    async def ainvoke(self, prompt: str) -> str:
+        await asyncio.sleep(self.latency)
+        return self.response(prompt)
+
+    def stream(self, prompt: str):
+        chunks = self._chunks(self.response(prompt))
+        for chunk in chunks:
+            time.sleep(self.latency / len(chunks))
+            yield chunk
+
+    async def astream(self, prompt: str):
+        chunks = self._chunks(self.response(prompt))
+        for chunk in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            yield chunk
+
+
+class NullTracer:
+    """
+        Stand-in for the Judgeval Tracer, @observe leaves functions unwrapped
+    """
+
+    def observe(self, name: str = None, span_type: str = None):
+        return lambda func: func
@@ -0,0 +1,337 @@
+"""
+Micro-benchmarks for the non-LLM overhead of the pipeline.
+
+Every agent gets a deterministic FakeLLM, so timings measure extraction, prompt building,
+JSON post-processing, scoring and graph orchestration rather than the model. Results are
+written as JSON; --compare checks them against an earlier run.
+
+Run from the resumeScreener directory:
+    python benchmarks/run_benchmarks.py --iterations 50 --output bench.json
+    python benchmarks/run_benchmarks.py --compare bench.json --threshold 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import platform
+import statistics
+import tempfile
+import contextlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_llm import FakeLLM, NullTracer
+from benchmarks.corpus import load_corpus, EXAMPLES_DIR
+
+import logging
+
+SUITES = ["extraction", "json", "nodes", "workflow"]
+
+
+def summarize(samples: List[float], llm_calls: float = 0, latency: float = 0.0) -> Dict[str, Any]:
+    """
+        Timing stats in milliseconds. overhead_ms is the mean minus the fake LLM latency
+    """
+    samples_ms = sorted(sample * 1000 for sample in samples)
+    mean_ms = statistics.fmean(samples_ms)
+    return {
+        "iterations": len(samples_ms),
+        "mean_ms": round(mean_ms, 4),
+        "p50_ms": round(samples_ms[len(samples_ms) // 2], 4),
+        "p95_ms": round(samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))], 4),
+        "min_ms": round(samples_ms[0], 4),
+        "max_ms": round(samples_ms[-1], 4),
+        "llm_calls": llm_calls,
+        "overhead_ms": round(mean_ms - llm_calls * latency * 1000, 4)
+    }
+
+
+def timeit(fn: Callable[[], Any], iterations: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def atimeit(fn: Callable[[], Any], iterations: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def read_example(name: str) -> str:
+    with open(os.path.join(EXAMPLES_DIR, name), "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def bench_extraction(args) -> Dict[str, Any]:
+    from config import AGENT_CONFIG
+    from extraction import extract_text
+
+    max_chars = AGENT_CONFIG["resume_parser"]["max_text_length"]
+    results = {}
+    for document in load_corpus(repeat=args.repeat):
+        data = document["bytes"]
+        samples = timeit(lambda: extract_text(data, max_chars), args.iterations)
+        results[f"extraction.{document['format']}.{document['name']}"] = summarize(samples)
+    return results
+
+
+def bench_json(args) -> Dict[str, Any]:
+    from jsonstream import extract_json
+    from prompting import serialize_section
+    from config import AGENT_CONFIG
+    from Agents.resumeParserAgent import ResumeParserAgent
+    from Agents.matcherAgent import MatcherAgent
+
+    fake = FakeLLM(response_scale=args.response_scale)
+    resume_response = fake.response("resume extraction engine")
+    jd_response = fake.response("job description parsing engine")
+    match_response = fake.response("recruiter")
+    truncated = resume_response[:int(len(resume_response) * 0.7)]
+
+    resume_agent = ResumeParserAgent(fake)
+    matcher_agent = MatcherAgent(fake)
+    resume_data = extract_json(resume_response)
+    jd_data = extract_json(jd_response)
+    budget = AGENT_CONFIG["matcher"]["prompt_budget"]["resume"]
+
+    cases = {
+        "json.extract.resume": lambda: extract_json(resume_response),
+        "json.extract.match": lambda: extract_json(match_response),
+        "json.repair.truncated_resume": lambda: extract_json(truncated),
+        "json.map.resume_fields": lambda: resume_agent.__process_response__(extract_json(resume_response)),
+        "prompt.serialize.resume": lambda: serialize_section(resume_data, budget),
+        "prompt.build.matcher": lambda: matcher_agent.__build_prompt__(resume_data, jd_data),
+        "scoring.local": lambda: matcher_agent.score(resume_data, jd_data)
+    }
+    return {name: summarize(timeit(fn, args.iterations)) for name, fn in cases.items()}
+
+
+def _setup_app(args, fake: FakeLLM):
+    """
+        Import the app with FakeLLM agents and a no-op tracer injected, caches off, evaluation off and
+        reports and the candidate store in args.workdir - no LLM provider or Judgment credentials are needed
+    """
+    from types import SimpleNamespace
+    from config import REPORT_CONFIG, CANDIDATE_STORE_CONFIG, CACHE_CONFIG
+    REPORT_CONFIG["directory"] = os.path.join(args.workdir, "reports")
+    CANDIDATE_STORE_CONFIG["path"] = os.path.join(args.workdir, "candidates.db")
+    # Measure the full path, not cache hits - and no disk cache is opened
+    for cache_config in CACHE_CONFIG.values():
+        cache_config["enabled"] = False
+
+    import main
+    import tracing
+    from evaluation import get_evaluation_queue
+    from Agents.resumeParserAgent import ResumeParserAgent
+    from Agents.jdParserAgent import JDParserAgent
+    from Agents.matcherAgent import MatcherAgent
+    from Agents.fastMatchAgent import FastMatchAgent
+    get_evaluation_queue().sample_rate = 0.0
+
+    resume_agent = ResumeParserAgent(fake)
+    jd_agent = JDParserAgent(fake)
+    matcher_agent = MatcherAgent(fake)
+    main._agents = SimpleNamespace(
+        llm=fake,
+        resume_agent=resume_agent,
+        jd_agent=jd_agent,
+        matcher_agent=matcher_agent,
+        fast_match_agent=FastMatchAgent(fake, resume_agent, jd_agent, matcher_agent)
+    )
+    tracing._tracer = NullTracer()
+    return main
+
+
+def _teardown_app() -> None:
+    """
+        Flush the report writer and close the candidate store before args.workdir is removed
+    """
+    if "reports" in sys.modules:
+        from reports import get_report_writer
+        if get_report_writer() is not None:
+            get_report_writer().shutdown()
+    if "candidates" in sys.modules:
+        import candidates
+        if candidates._store is not None:
+            candidates._store.close()
+            candidates._store = None
+
+
+async def _run_workflow(main, **state_kwargs) -> Dict[str, Any]:
+    app = main.get_workflow_app()
+    state = await main._build_initial_state(**state_kwargs)
+    thread_id = f"bench-{uuid.uuid4().hex}"
+    try:
+        return await app.ainvoke(state, {"configurable": {"thread_id": thread_id}})
+    finally:
+        main._checkpointer.mark_completed(thread_id)
+
+
+async def _measure(fake: FakeLLM, fn: Callable[[], Any], args) -> Dict[str, Any]:
+    calls_before = fake.calls
+    samples = await atimeit(fn, args.iterations)
+    calls = (fake.calls - calls_before) / (args.iterations + 1)  # + warmup
+    return summarize(samples, llm_calls=round(calls, 2), latency=fake.latency)
+
+
+async def bench_nodes(args) -> Dict[str, Any]:
+    fake = FakeLLM(latency=args.latency_ms / 1000, response_scale=args.response_scale)
+    main = _setup_app(args, fake)
+
+    jd_text = read_example("sample_jd.txt")
+    resume_text = read_example("sample_resume.txt")
+    state = await main._build_initial_state(jd_text, None, resume_text)
+    state.update(await main.parse_resume_node(state))
+    state.update(await main.parse_jd_node(state))
+    state.update(await main.match_analysis_node(state))
+
+    async def compile_report():
+        main.compile_report_node(state)
+
+    return {
+        "node.parse_resume": await _measure(fake, lambda: main.parse_resume_node(state), args),
+        "node.parse_jd": await _measure(fake, lambda: main.parse_jd_node(state), args),
+        "node.match_analysis": await _measure(fake, lambda: main.match_analysis_node(state), args),
+        "node.compile_report": await _measure(fake, compile_report, args),
+        "node.fast_analysis": await _measure(fake, lambda: main.fast_analysis_node(state), args)
+    }
+
+
+async def bench_workflow(args) -> Dict[str, Any]:
+    from benchmarks.corpus import make_pdf
+
+    fake = FakeLLM(latency=args.latency_ms / 1000, response_scale=args.response_scale)
+    main = _setup_app(args, fake)
+
+    jd_text = read_example("sample_jd.txt")
+    resume_text = read_example("sample_resume.txt")
+    resume_pdf = make_pdf(resume_text)
+    batch = [{"name": f"resume_{i}", "text": f"{resume_text}\nCandidate {i}"} for i in range(args.batch_size)]
+
+    results = {
+        "workflow.text": await _measure(
+            fake, lambda: _run_workflow(main, job_description=jd_text, resume_file=None, resume_text=resume_text), args
+        ),
+        "workflow.pdf": await _measure(
+            fake, lambda: _run_workflow(main, job_description=jd_text, resume_file=None, resume_text=None, resume_bytes=resume_pdf), args
+        ),
+        "workflow.fast_mode": await _measure(
+            fake, lambda: _run_workflow(main, job_description=jd_text, resume_file=None, resume_text=resume_text, fast_mode=True), args
+        ),
+        "workflow.score_only": await _measure(
+            fake, lambda: _run_workflow(main, job_description=jd_text, resume_file=None, resume_text=resume_text, score_only=True), args
+        ),
+        f"workflow.batch_{args.batch_size}": await _measure(fake, lambda: main.process_batch(jd_text, batch), args)
+    }
+
+    from extraction import shutdown_extraction_pool
+    shutdown_extraction_pool()
+    return results
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta_ms: float) -> List[str]:
+    """
+        Benchmarks whose non-LLM overhead grew by more than threshold (and min_delta_ms)
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        before, after = previous["overhead_ms"], current["overhead_ms"]
+        if after - before > min_delta_ms and after > before * (1 + threshold):
+            regressions.append(f"{name}: {before:.3f} ms -> {after:.3f} ms")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"comma separated subset of {SUITES}")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake LLM latency per call")
+    parser.add_argument("--response-scale", type=int, default=1, help="fake LLM response size multiplier")
+    parser.add_argument("--repeat", type=int, default=1, help="corpus text multiplier (multi-page documents)")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--output", help="write results JSON here instead of stdout")
+    parser.add_argument("--compare", help="baseline results JSON, exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    suites = [suite.strip() for suite in args.suites.split(",") if suite.strip()]
+    results, errors = {}, {}
+
+    # The app logs and prints per request, keep stdout for the results
+    logging.disable(logging.WARNING)
+    # Reports and the candidate store written by the app are removed after the run
+    with tempfile.TemporaryDirectory(prefix="rma-bench-") as workdir, contextlib.redirect_stdout(sys.stderr):
+        args.workdir = workdir
+        try:
+            for suite in suites:
+                try:
+                    if suite == "extraction":
+                        results.update(bench_extraction(args))
+                    elif suite == "json":
+                        results.update(bench_json(args))
+                    elif suite == "nodes":
+                        results.update(asyncio.run(bench_nodes(args)))
+                    elif suite == "workflow":
+                        results.update(asyncio.run(bench_workflow(args)))
+                    else:
+                        errors[suite] = "unknown suite"
+                except Exception as e:
+                    errors[suite] = f"{type(e).__name__}: {e}"
+        finally:
+            _teardown_app()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "latency_ms": args.latency_ms,
+            "response_scale": args.response_scale,
+            "repeat": args.repeat,
+            "suites": suites
+        },
+        "results": results,
+        "errors": errors
+    }
+
+    exit_code = 1 if errors else 0
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        report["regressions"] = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if report["regressions"]:
+            exit_code = 1
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""
+Persistent candidate store - every parsed resume in SQLite, with an inverted index on normalized
+skills, certifications and education so candidates can be searched without an LLM call or re-parsing
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import CANDIDATE_STORE_CONFIG
+from scoring import as_list, normalize_skill, resume_years, degree_level, without_contacts, DEGREE_LEVELS
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Resume field -> field name in the index
+INDEXED_FIELDS = {"skills": "skill", "certifications": "certification", "education": "education"}
+# Query prefixes, e.g. "cert:aws" only matches certifications
+FIELD_PREFIXES = {
+    "skill": "skill", "skills": "skill",
+    "cert": "certification", "certification": "certification", "certifications": "certification",
+    "edu": "education", "education": "education"
+}
+DEGREE_NAMES = {4: "phd", 3: "master", 2: "bachelor", 1: "associate"}
+
+_STOP_WORDS = {"a", "an", "and", "at", "for", "in", "of", "on", "the", "to", "with"}
+_WORD = re.compile(r"[\w+#.]+")
+_AND = re.compile(r"\s+AND\s+|\s*&&\s*|\s*,\s*", re.IGNORECASE)
+_YEARS = re.compile(r"^(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?)(?:\s+of)?(?:\s+experience)?$", re.IGNORECASE)
+_DEGREE_KEYWORDS = {keyword: level for level, keywords in DEGREE_LEVELS for keyword in keywords}
+
+
+def index_terms(value: str) -> List[str]:
+    """
+        The normalized entry itself plus its words, so "Django REST Framework" is found by "django"
+    """
+    entry = normalize_skill(value)
+    terms = {entry} if entry else set()
+    for word in _WORD.findall(entry):
+        word = normalize_skill(word)
+        if word and word not in _STOP_WORDS:
+            terms.add(word)
+    return sorted(terms)
+
+
+def parse_query(query: str) -> Dict[str, Any]:
+    """
+        Parse "Python AND Django AND 3+ years" into required terms and minimums. Conditions are
+        separated by AND (any case), && or commas, a single & stays part of the term ("R&D").
+        "N+ years" sets the minimum experience, a degree keyword ("master", "MSc", "edu:phd") the
+        minimum degree, and skill: / cert: / edu: restrict a term to one field. Unprefixed terms
+        match any indexed field.
+    """
+    parsed = {"terms": [], "min_years": None, "min_degree": 0}
+    for condition in _AND.split(query or ""):
+        condition = condition.strip()
+        if not condition:
+            continue
+
+        years = _YEARS.match(condition)
+        if years:
+            parsed["min_years"] = max(parsed["min_years"] or 0.0, float(years.group(1)))
+            continue
+
+        field = None
+        prefix, separator, rest = condition.partition(":")
+        if separator and prefix.strip().lower() in FIELD_PREFIXES:
+            field, condition = FIELD_PREFIXES[prefix.strip().lower()], rest
+
+        term = normalize_skill(condition)
+        if not term:
+            raise ValueError(f"Empty search term in {query!r}")
+        if field in (None, "education") and term.replace("'", "") in _DEGREE_KEYWORDS:
+            parsed["min_degree"] = max(parsed["min_degree"], _DEGREE_KEYWORDS[term.replace("'", "")])
+            continue
+        parsed["terms"].append((field, term))
+    return parsed
+
+
+def candidate_id(resume_data: Dict[str, Any]) -> str:
+    """
+        Candidates with an email are keyed on it, so a newer resume replaces the older one
+    """
+    email = str(resume_data.get("email") or "").strip().lower()
+    if "@" in email:
+        key = email
+    else:
+        key = json.dumps(resume_data, sort_keys=True, default=str)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+class CandidateStore:
+    """
+        Parsed resumes in a single SQLite file. candidate_terms is the inverted index
+        (term, field) -> candidate, years of experience and degree level are plain columns.
+        Beyond max_candidates the oldest stored candidates are dropped.
+    """
+
+    def __init__(self, path: str, max_candidates: Optional[int] = None):
+        self.path = path
+        self.max_candidates = max_candidates
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "id TEXT PRIMARY KEY, name TEXT, email TEXT, years REAL NOT NULL, degree_level INTEGER NOT NULL, "
+            "data TEXT NOT NULL, stored_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_candidates_stored ON candidates (stored_at);"
+            "CREATE TABLE IF NOT EXISTS candidate_terms ("
+            "term TEXT NOT NULL, field TEXT NOT NULL, candidate_id TEXT NOT NULL, "
+            "PRIMARY KEY (term, field, candidate_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS idx_candidate_terms_candidate ON candidate_terms (candidate_id);"
+        )
+        self._conn.commit()
+
+    def add(self, resume_data: Dict[str, Any], name: Optional[str] = None) -> str:
+        """
+            Store (or replace) a parsed resume and return its candidate ID
+        """
+        doc_id = candidate_id(resume_data)
+        name = next(iter(as_list(resume_data.get("name"))), None) or name
+        email = next(iter(as_list(resume_data.get("email"))), None)
+        terms = set()
+        for key, field in INDEXED_FIELDS.items():
+            for value in as_list(resume_data.get(key)):
+                terms.update((term, field, doc_id) for term in index_terms(value))
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM candidate_terms WHERE candidate_id = ?", (doc_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO candidates (id, name, email, years, degree_level, data, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (doc_id, name, email, resume_years(resume_data),
+                     degree_level(as_list(resume_data.get("education"))),
+                     json.dumps(resume_data, default=str), time.time())
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO candidate_terms (term, field, candidate_id) VALUES (?, ?, ?)", terms
+                )
+                self._evict()
+        return doc_id
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, name, years, degree_level, data, stored_at FROM candidates WHERE id = ?", (doc_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def search(self, query: str, limit: int = 50) -> Dict[str, Any]:
+        """
+            Candidates matching every condition of the query (see parse_query), most experienced first:
+            {"query", "total", "candidates"}. Raises ValueError for an invalid query.
+        """
+        parsed = parse_query(query)
+        conditions, params = self._conditions(parsed)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        with self._lock:
+            (total,) = self._conn.execute(f"SELECT COUNT(*) FROM candidates{where}", params).fetchone()
+            rows = self._conn.execute(
+                "SELECT id, name, years, degree_level, data, stored_at FROM candidates"
+                f"{where} ORDER BY years DESC, stored_at DESC LIMIT ?", params + [limit]
+            ).fetchall()
+
+        return {
+            "query": {
+                "terms": [{"field": field or "any", "term": term} for field, term in parsed["terms"]],
+                "min_years": parsed["min_years"],
+                "min_degree": DEGREE_NAMES.get(parsed["min_degree"])
+            },
+            "total": total,
+            "candidates": [self._to_dict(row) for row in rows]
+        }
+
+    def iter_candidates(self, limit: Optional[int] = None, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+            The newest limit candidates, oldest first, read a page at a time so writers are not blocked
+        """
+        query = (
+            "SELECT * FROM (SELECT id, name, years, degree_level, data, stored_at FROM candidates "
+            "ORDER BY stored_at DESC LIMIT ?) ORDER BY stored_at ASC LIMIT ? OFFSET ?"
+        )
+        offset = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(query, (-1 if limit is None else limit, page_size, offset)).fetchall()
+            for row in rows:
+                yield self._to_dict(row)
+            if len(rows) < page_size:
+                return
+            offset += page_size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()
+            (terms,) = self._conn.execute("SELECT COUNT(DISTINCT term) FROM candidate_terms").fetchone()
+        return {"candidates": count, "terms": terms, "max_candidates": self.max_candidates}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _conditions(parsed: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        conditions, params = [], []
+        for field, term in parsed["terms"]:
+            if field is None:
+                conditions.append("id IN (SELECT candidate_id FROM candidate_terms WHERE term = ?)")
+                params.append(term)
+            else:
+                conditions.append("id IN (SELECT candidate_id FROM candidate_terms WHERE term = ? AND field = ?)")
+                params.extend([term, field])
+        if parsed["min_years"] is not None:
+            conditions.append("years >= ?")
+            params.append(parsed["min_years"])
+        if parsed["min_degree"]:
+            conditions.append("degree_level >= ?")
+            params.append(parsed["min_degree"])
+        return conditions, params
+
+    def _evict(self) -> None:
+        if self.max_candidates is None:
+            return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()
+        if count > self.max_candidates:
+            oldest = "SELECT id FROM candidates ORDER BY stored_at ASC LIMIT ?"
+            self._conn.execute(f"DELETE FROM candidate_terms WHERE candidate_id IN ({oldest})", (count - self.max_candidates,))
+            self._conn.execute(f"DELETE FROM candidates WHERE id IN ({oldest})", (count - self.max_candidates,))
+
+    @staticmethod
+    def _to_dict(row: Tuple) -> Dict[str, Any]:
+        # The endpoints serving these are unauthenticated, contact details stay in the database
+        doc_id, name, years, level, data, stored_at = row
+        return {
+            "id": doc_id,
+            "name": name,
+            "years_of_experience": years,
+            "degree": DEGREE_NAMES.get(level),
+            "stored_at": datetime.fromtimestamp(stored_at).isoformat(timespec="seconds"),
+            "resume_data": without_contacts(json.loads(data))
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_candidate_store() -> CandidateStore:
+    """
+        Process-wide candidate store built from CANDIDATE_STORE_CONFIG
+    """
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = CandidateStore(
+                CANDIDATE_STORE_CONFIG["path"],
+                max_candidates=CANDIDATE_STORE_CONFIG["max_candidates"]
+            )
+        return _store
+
+
+def store_candidate(resume_data: Dict[str, Any], name: Optional[str] = None) -> Optional[str]:
+    """
+        Persist a ResumeParserAgent result, failures are logged and never break an analysis
+    """
+    if not CANDIDATE_STORE_CONFIG["enabled"] or not resume_data or resume_data.get("error"):
+        return None
+    if not any(as_list(resume_data.get(key)) for key in ("name", "email", *INDEXED_FIELDS)):
+        return None # the parser's all-"N/A" fallback
+    try:
+        return get_candidate_store().add(resume_data, name)
+    except Exception as e:
+        logger.error(f"Storing candidate failed: {e}")
+        return None
@@ -0,0 +1,28 @@
+"""
+Workflow checkpointer - imported when the graph is first compiled, langgraph is not needed before that
+"""
+
+import threading
+from collections import deque
+
+from langgraph.checkpoint.memory import MemorySaver
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+        In-memory checkpointer that only keeps the most recent completed threads.
+
+        In-flight threads are never evicted, completed ones are dropped oldest first.
+    """
+
+    def __init__(self, max_completed_threads: int = 100):
+        super().__init__()
+        self.max_completed_threads = max_completed_threads
+        self._completed = deque()
+        self._completed_lock = threading.Lock()
+
+    def mark_completed(self, thread_id: str) -> None:
+        with self._completed_lock:
+            self._completed.append(thread_id)
+            while len(self._completed) > self.max_completed_threads:
+                self.delete_thread(self._completed.popleft())
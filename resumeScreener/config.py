@@ -15,7 +15,13 @@ AGENT_CONFIG = {
     },
     "matcher": {
         "min_match_threshold": 0.3,
-        "max_missing_skills": 10
+        "max_missing_skills": 10,
+        "score_source": "local", # "local": deterministic scorer sets match_score / skill lists, "llm": trust the LLM
+        "compact_prompt": True, # drop N/A fields and contact details, shorten keys
+        "prompt_budget": { # max tokens per prompt section, None for no limit
+            "resume": 1200,
+            "jd": 600
+        }
     },
     "advisor": {
         "max_suggestions": 5,
@@ -23,15 +29,127 @@ AGENT_CONFIG = {
     }
 }
 
+# Batch Ranking Settings
+BATCH_CONFIG = {
+    "max_resumes": 200,
+    "max_job_descriptions": 100, # per /analyze/candidate request
+    "max_concurrency": 8 # parallel resume parse + match calls per batch
+}
+
+# Background Job Settings (/analyze/jobs)
+JOB_CONFIG = {
+    "workers": 4, # analyses running at the same time
+    "max_queue_size": 100, # pending jobs, new submissions get 429 beyond this
+    "result_ttl_seconds": 3600, # finished jobs can be fetched for this long
+    "max_finished_jobs": 10000, # finished jobs kept, oldest are dropped first
+    "default_retry_after_seconds": 30 # Retry-After hint until job durations have been measured
+}
+
+# Retrieval Settings (similarity search over parsed resumes / JDs)
+RETRIEVAL_CONFIG = {
+    "enabled": True, # index every parsed resume and JD in memory
+    "max_documents": 50000, # per index, oldest are dropped beyond this
+    "n_features": 2 ** 18, # hashed feature space
+    "skill_weight": 3, # skills count this many times more than free text
+    "default_top_k": 50
+}
+
+# Candidate Store Settings (every parsed resume, searchable by skill / certification / education)
+CANDIDATE_STORE_CONFIG = {
+    "enabled": True,
+    "path": os.getenv("CANDIDATE_DB_PATH", "cache/candidates.db"), # SQLite file
+    "max_candidates": 100000, # oldest stored candidates are dropped beyond this
+    "default_limit": 50, # results per search
+    "max_limit": 500
+}
+
+# Workflow Settings
+WORKFLOW_CONFIG = {
+    "max_completed_threads": 100, # checkpoints of finished analyses kept in memory, oldest are evicted
+    "warm_up": True, # build the LLM client, agents, tracer and graph in the background after API startup
+    "import_budget_seconds": 1.0 # `import api` must stay under this, heavy SDKs are loaded on first use
+}
+
+# Cache Settings
+CACHE_CONFIG = {
+    "jd_parser": {
+        "enabled": True,
+        "max_entries": 1024, # in-memory LRU tier
+        "ttl_seconds": 24 * 60 * 60,
+        "disk_path": os.getenv("JD_CACHE_PATH"), # optional SQLite tier, e.g. "cache/jd_cache.db"
+        "disk_max_entries": 50000
+    },
+    "resume_parser": {
+        "enabled": True,
+        "max_entries": 4096, # in-memory LRU tier, bounds memory
+        "ttl_seconds": 24 * 60 * 60,
+        "disk_path": os.getenv("RESUME_CACHE_PATH"), # optional SQLite tier
+        "disk_max_entries": 100000
+    },
+    "matcher": { # LLM match results, keyed on the match-relevant resume / JD fields only
+        "enabled": True,
+        "max_entries": 4096,
+        "ttl_seconds": 7 * 24 * 60 * 60,
+        "disk_path": os.getenv("MATCH_CACHE_PATH"), # optional SQLite tier
+        "disk_max_entries": 100000
+    }
+}
+
 # File Processing
 FILE_CONFIG = {
     "supported_formats": [".pdf", ".docx", ".txt"]
 }
 
+# LLM Client Settings
+LLM_CONFIG = {
+    "max_in_flight": 8, # concurrent requests per backend, the rest wait for a slot
+    "single_flight": True, # concurrent identical prompts share one backend call
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 60, # seconds an idle connection is kept open
+    "timeout_seconds": 120
+}
+
+# LLM Response Parsing Settings
+PARSING_CONFIG = {
+    "stream": True, # stream completions and stop as soon as the JSON object is closed
+    "max_field_retries": 1 # follow-up prompts for fields missing from a truncated / malformed response
+}
+
+# Document Extraction Settings
+EXTRACTION_CONFIG = {
+    "use_process_pool": True, # PDF / DOCX extraction runs in worker processes, off the event loop
+    "max_workers": None, # defaults to the number of CPUs
+    "timeout_seconds": 30, # per document, pathological files are abandoned after this
+    "start_method": "spawn" # fork is unsafe once the API has started threads
+}
+
+# Report Settings
+REPORT_CONFIG = {
+    "enabled": True,
+    "format": "markdown", # "markdown": one file per report, "jsonl": one append-only file for high volume
+    "directory": os.getenv("REPORT_DIR", "reports"),
+    "jsonl_file": "reports.jsonl",
+    "jsonl_segment_bytes": 50 * 1024 * 1024, # the JSONL file is rotated to a timestamped segment beyond this
+    "max_files": 1000, # markdown reports / rotated JSONL segments kept
+    "max_total_bytes": 500 * 1024 * 1024,
+    "max_age_days": 30,
+    "queue_size": 10000, # pending reports, new ones are dropped beyond this
+    "batch_size": 50,
+    "flush_interval_seconds": 1
+}
+
 # Judgeval Settings
 JUDGEVAL_CONFIG = {
     "enabled": True,
     "log_level": "INFO",
     "metrics_enabled": True,
-    "assertions_enabled": True
+    "assertions_enabled": True,
+    "project_name": "resume_screening_agent",
+    "model": "gpt-4",
+    "scorer_threshold": 0.5,
+    "sample_rate": 0.05, # fraction of agent outputs that are evaluated
+    "queue_size": 1000, # pending examples, new ones are dropped beyond this
+    "batch_size": 20, # examples per evaluation run
+    "flush_interval_seconds": 5 # send a partial batch after this long
 }
\ No newline at end of file
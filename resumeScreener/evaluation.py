@@ -0,0 +1,186 @@
+"""
+Background Judgeval evaluation - sampled, batched and bounded, so requests never wait on it
+"""
+
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from config import JUDGEVAL_CONFIG
+from tracing import current_span
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _as_text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+class EvaluationQueue:
+    """
+        Requests call submit(), which samples and enqueues without blocking. A worker thread
+        sends the examples to Judgeval in batches. When the queue is full new examples are
+        dropped instead of slowing requests down.
+
+        Each example carries the trace and span it was submitted from, so its scores stay
+        linked to the request's trace.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, max_queue_size: int = 1000, batch_size: int = 20,
+                 flush_interval: float = 5.0, send_batch: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None):
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.send_batch = send_batch or self._send_to_judgeval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._client = None
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.sent = 0
+        self.failed = 0
+
+    def submit(self, stage: str, input: Any, actual_output: Any) -> bool:
+        """
+            Queue one example for evaluation, returns False when it was sampled out or dropped
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            self._count("sampled_out")
+            return False
+
+        self._ensure_worker()
+        trace_id, span_id = current_span()
+        try:
+            self._queue.put_nowait((stage, input, actual_output, trace_id, span_id))
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+        self._count("submitted")
+        return True
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        # Request threads submit concurrently, += on an attribute is not atomic
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="judgeval-evaluation", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _next_batch(self) -> List[tuple]:
+        """
+            Up to batch_size examples, waiting at most flush_interval for the batch to fill
+        """
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or (self._stopping.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _flush(self, batch: List[tuple]) -> None:
+        by_stage = {}
+        for stage, input, actual_output, trace_id, span_id in batch:
+            example = {"input": _as_text(input), "actual_output": _as_text(actual_output)}
+            if trace_id is not None:
+                example["trace_id"] = trace_id
+                example["additional_metadata"] = {"span_id": span_id}
+            by_stage.setdefault(stage, []).append(example)
+
+        for stage, examples in by_stage.items():
+            try:
+                self.send_batch(stage, examples)
+                self._count("sent", len(examples))
+            except Exception as e:
+                self._count("failed", len(examples))
+                logger.error(f"Judgeval evaluation of {len(examples)} {stage} examples failed: {e}")
+
+    def _send_to_judgeval(self, stage: str, examples: List[Dict[str, Any]]) -> None:
+        from judgeval import JudgmentClient
+        from judgeval.data import Example
+        from judgeval.scorers import AnswerRelevancyScorer
+
+        if self._client is None:
+            self._client = JudgmentClient()
+
+        self._client.run_evaluation(
+            examples=[Example(**example) for example in examples],
+            scorers=[AnswerRelevancyScorer(threshold=JUDGEVAL_CONFIG["scorer_threshold"])],
+            model=JUDGEVAL_CONFIG["model"],
+            project_name=JUDGEVAL_CONFIG["project_name"],
+            eval_run_name=f"{stage}-{uuid.uuid4().hex[:8]}"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "sample_rate": self.sample_rate,
+                "queued": self._queue.qsize(),
+                "submitted": self.submitted,
+                "sampled_out": self.sampled_out,
+                "dropped": self.dropped,
+                "sent": self.sent,
+                "failed": self.failed
+            }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+            Send what is queued, waiting at most timeout seconds
+        """
+        self._stopping.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+
+_evaluation_queue = None
+
+
+def get_evaluation_queue() -> EvaluationQueue:
+    """
+        Process-wide queue built from JUDGEVAL_CONFIG, evaluation is off when "enabled" is False
+    """
+    global _evaluation_queue
+
+    if _evaluation_queue is None:
+        _evaluation_queue = EvaluationQueue(
+            sample_rate=JUDGEVAL_CONFIG["sample_rate"] if JUDGEVAL_CONFIG["enabled"] else 0.0,
+            max_queue_size=JUDGEVAL_CONFIG["queue_size"],
+            batch_size=JUDGEVAL_CONFIG["batch_size"],
+            flush_interval=JUDGEVAL_CONFIG["flush_interval_seconds"]
+        )
+    return _evaluation_queue
+
+
+def evaluate(stage: str, input: Any, actual_output: Any) -> bool:
+    """
+        Queue an example for answer relevancy scoring, off the request path
+    """
+    return get_evaluation_queue().submit(stage, input, actual_output)
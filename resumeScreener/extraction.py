@@ -0,0 +1,273 @@
+"""
+Document text extraction - reads pages lazily and stops once the character budget is reached
+"""
+
+import io
+import asyncio
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Optional, Union
+
+import PyPDF2
+from docx import Document
+
+from config import EXTRACTION_CONFIG
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+Source = Union[str, BinaryIO] # file path or binary stream
+
+
+def cap_text(text: str, max_chars: Optional[int] = None) -> str:
+    """
+        Trim text to the character budget
+    """
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return text[:max_chars]
+
+
+def _collect(chunks, max_chars: Optional[int] = None) -> str:
+    """
+        Join chunks, stop pulling from the iterator as soon as the budget is reached
+    """
+    parts = []
+    length = 0
+    for chunk in chunks:
+        parts.append(chunk)
+        length += len(chunk) + 1
+        if max_chars is not None and length >= max_chars:
+            break
+    return cap_text("\n".join(parts), max_chars)
+
+
+def extract_pdf_text(source: Source, max_chars: Optional[int] = None) -> str:
+    """
+        Extract text from a PDF page by page, later pages are never decoded once the budget is full
+    """
+    pdf_reader = PyPDF2.PdfReader(source, strict=False)
+    return _collect((page.extract_text() or "" for page in pdf_reader.pages), max_chars)
+
+
+def extract_docx_text(source: Source, max_chars: Optional[int] = None) -> str:
+    """
+        Extract paragraph text from a DOCX file
+    """
+    doc = Document(source)
+    return _collect((paragraph.text for paragraph in doc.paragraphs), max_chars)
+
+
+def extract_txt_text(source: Source, max_chars: Optional[int] = None) -> str:
+    """
+        Read a plain text file, at most max_chars characters
+    """
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as file:
+            return file.read(max_chars if max_chars is not None else -1)
+
+    data = source.read(max_chars * 4 if max_chars is not None else -1) # utf-8 is at most 4 bytes per char
+    return cap_text(data.decode("utf-8", errors="ignore"), max_chars)
+
+
+def detect_format(data: bytes) -> str:
+    """
+        Detect the document format from its content - "pdf", "docx" or "txt"
+    """
+    # PDF header may be preceded by a few junk bytes
+    if b"%PDF-" in data[:1024]:
+        return "pdf"
+
+    if data[:4] == b"PK\x03\x04":
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            pass
+
+    return "txt"
+
+
+def extract_text(data: bytes, max_chars: Optional[int] = None) -> str:
+    """
+        Extract text from raw document bytes, the format is detected from the content
+    """
+    document_format = detect_format(data)
+
+    if document_format == "pdf":
+        try:
+            return extract_pdf_text(io.BytesIO(data), max_chars)
+        except Exception as e:
+            logger.error(f"PDF parsing failed: {e}")
+            raise ValueError(f"Could not read PDF: {e}")
+    if document_format == "docx":
+        return extract_docx_text(io.BytesIO(data), max_chars)
+
+    return extract_txt_text(io.BytesIO(data), max_chars)
+
+
+def _worker_main(conn, target) -> None:
+    """
+        Extraction worker process - runs target on one document per message until it gets None
+    """
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        try:
+            conn.send(("ok", target(*task)))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class ExtractionPool:
+    """
+        Worker processes that each extract one document at a time. A document that runs past
+        its timeout only costs its own worker: that process is terminated and replaced on
+        demand, documents in the other workers are not affected.
+
+        Async callers go through the pool's own threads, one per worker, so documents queued
+        for a busy pool never tie up the event loop's default executor.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, start_method: str = "spawn", target=extract_text):
+        self.target = target # module-level function(data, max_chars), the spawned workers import it
+        self.max_workers = max_workers or multiprocessing.cpu_count()
+        self._context = multiprocessing.get_context(start_method)
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="extraction")
+        self._idle = [] # (process, connection) waiting for a document
+        self._busy = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _checkout(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Extraction pool is shut down")
+            worker = self._idle.pop() if self._idle else None
+        if worker is None or not worker[0].is_alive():
+            parent_conn, child_conn = self._context.Pipe()
+            process = self._context.Process(target=_worker_main, args=(child_conn, self.target), daemon=True)
+            process.start()
+            child_conn.close()
+            worker = (process, parent_conn)
+        with self._lock:
+            self._busy.add(worker)
+        return worker
+
+    def _checkin(self, worker, healthy: bool) -> None:
+        with self._lock:
+            self._busy.discard(worker)
+            if healthy and not self._closed:
+                self._idle.append(worker)
+                return
+        self._kill(worker)
+
+    @staticmethod
+    def _kill(worker) -> None:
+        process, conn = worker
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=1)
+        conn.close()
+
+    def extract(self, data: bytes, max_chars: Optional[int] = None, timeout: Optional[float] = None) -> str:
+        """
+            Extract in a worker process, blocking. Waiting for a free worker does not count
+            towards the timeout.
+        """
+        with self._slots:
+            worker = self._checkout()
+            healthy = False
+            try:
+                _, conn = worker
+                conn.send((data, max_chars))
+                if not conn.poll(timeout):
+                    raise TimeoutError(f"Document extraction timed out after {timeout}s")
+                status, result = conn.recv()
+                healthy = True
+            except (EOFError, ConnectionError) as e:
+                raise ValueError(f"Document extraction failed, worker crashed: {e}")
+            finally:
+                self._checkin(worker, healthy)
+
+        if status == "error":
+            raise ValueError(result)
+        return result
+
+    async def aextract(self, data: bytes, max_chars: Optional[int] = None, timeout: Optional[float] = None) -> str:
+        """
+            Extract in a worker process without blocking the event loop
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.extract, data, max_chars, timeout)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers = self._idle + list(self._busy)
+            self._idle, self._busy = [], set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for worker in workers:
+            self._kill(worker)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """
+        Shared extraction worker pool, created on first use
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool(
+                max_workers=EXTRACTION_CONFIG["max_workers"],
+                start_method=EXTRACTION_CONFIG["start_method"]
+            )
+        return _pool
+
+
+def shutdown_extraction_pool() -> None:
+    """
+        Stop every worker, in-flight extractions fail
+    """
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+
+    if pool is not None:
+        pool.shutdown()
+
+
+async def extract_text_async(data: bytes, max_chars: Optional[int] = None, timeout: Optional[float] = None) -> str:
+    """
+        Extract text without blocking the event loop.
+
+        PDF / DOCX extraction is CPU-bound pure Python, so it runs in a worker process
+        with a per-document timeout. Plain text is decoded inline.
+    """
+    if detect_format(data) == "txt":
+        return extract_text(data, max_chars)
+
+    if not EXTRACTION_CONFIG["use_process_pool"]:
+        return await asyncio.to_thread(extract_text, data, max_chars)
+
+    timeout = timeout if timeout is not None else EXTRACTION_CONFIG["timeout_seconds"]
+    try:
+        return await get_extraction_pool().aextract(data, max_chars, timeout)
+    except TimeoutError as e:
+        logger.error(str(e))
+        raise ValueError(str(e))
@@ -0,0 +1,194 @@
+"""
+Background analysis jobs - a bounded queue drained by a fixed pool of asyncio workers,
+so long analyses do not hold HTTP connections open
+"""
+
+import math
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import JOB_CONFIG
+from metrics import QUEUE_WAIT_SECONDS
+from main import process_resume_and_job
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, COMPLETED, FAILED = "queued", "running", "completed", "failed"
+
+
+class JobQueueFull(Exception):
+    """
+        Raised by submit() when the backlog is full, retry_after is a hint in seconds
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """
+        handler(params) runs every job and returns its result. A result with an "error"
+        marks the job as failed, like an exception does.
+
+        start() has to be called from the event loop the workers should run on.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]], workers: int = 4,
+                 max_queue_size: int = 100, result_ttl: float = 3600, max_finished_jobs: int = 10000,
+                 default_retry_after: int = 30):
+        self.handler = handler
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.result_ttl = result_ttl
+        self.max_finished_jobs = max_finished_jobs
+        self.default_retry_after = default_retry_after
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._finished_at: "OrderedDict[str, float]" = OrderedDict()  # job_id -> monotonic finish time, oldest first
+        self._durations = []  # recent job durations, for the Retry-After estimate
+        self.rejected = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def shutdown(self) -> None:
+        """
+            Stop the workers, queued and running jobs are abandoned
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, params: Dict[str, Any]) -> str:
+        """
+            Queue a job and return its ID without waiting, raises JobQueueFull when the backlog is full
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not started")
+        self._prune()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+        try:
+            self._queue.put_nowait((job_id, params, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise JobQueueFull(self.retry_after())
+
+        self._jobs[job_id] = job
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def retry_after(self) -> int:
+        """
+            Seconds until a queue slot is likely free - with every worker busy, a job finishes
+            (and a queued one starts) every average duration / workers
+        """
+        if not self._durations:
+            return self.default_retry_after
+        average = sum(self._durations) / len(self._durations)
+        return max(1, math.ceil(average / self.workers))
+
+    def stats(self) -> Dict[str, Any]:
+        statuses = [job["status"] for job in self._jobs.values()]
+        return {
+            "workers": self.workers,
+            "queued": statuses.count(QUEUED),
+            "running": statuses.count(RUNNING),
+            "completed": statuses.count(COMPLETED),
+            "failed": statuses.count(FAILED),
+            "rejected": self.rejected
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, params, queued_at = await self._queue.get()
+            try:
+                await self._run(job_id, params, queued_at)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, params: Dict[str, Any], queued_at: float) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+
+        started = time.perf_counter()
+        QUEUE_WAIT_SECONDS.observe(started - queued_at, queue="jobs")
+        job["status"] = RUNNING
+        job["started_at"] = datetime.now().isoformat(timespec="seconds")
+        try:
+            result = await self.handler(params)
+            job["result"] = result
+            job["error"] = (result or {}).get("error")
+        except asyncio.CancelledError:
+            job["error"] = "Cancelled on shutdown"
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            job["error"] = str(e)
+        finally:
+            job["status"] = FAILED if job["error"] else COMPLETED
+            job["finished_at"] = datetime.now().isoformat(timespec="seconds")
+            self._finished_at[job_id] = time.monotonic()
+            self._durations = (self._durations + [time.perf_counter() - started])[-50:]
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.result_ttl
+        while self._finished_at:
+            job_id, finished = next(iter(self._finished_at.items()))
+            if finished >= cutoff and len(self._finished_at) <= self.max_finished_jobs:
+                break
+            self._finished_at.popitem(last=False)
+            self._jobs.pop(job_id, None)
+
+
+async def run_analysis(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+        One /analyze/jobs job - the full workflow for a resume / JD pair
+    """
+    return await process_resume_and_job(**params)
+
+
+_job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    """
+        Process-wide analysis job queue built from JOB_CONFIG
+    """
+    global _job_queue
+
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            run_analysis,
+            workers=JOB_CONFIG["workers"],
+            max_queue_size=JOB_CONFIG["max_queue_size"],
+            result_ttl=JOB_CONFIG["result_ttl_seconds"],
+            max_finished_jobs=JOB_CONFIG["max_finished_jobs"],
+            default_retry_after=JOB_CONFIG["default_retry_after_seconds"]
+        )
+    return _job_queue
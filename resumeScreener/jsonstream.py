@@ -0,0 +1,289 @@
+"""
+Streaming JSON extraction for LLM output - stops generation once the top-level object closes
+and repairs the usual defects (code fences, comments, trailing commas, truncation)
+"""
+
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config import PARSING_CONFIG
+from metrics import LLM_CALL_SECONDS, JSON_PARSE_SECONDS, FIELD_RETRIES
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSERS = {"{": "}", "[": "]"}
+
+
+def _token_text(chunk) -> str:
+    # Chat models stream message chunks, completion models stream strings
+    return chunk.content if hasattr(chunk, "content") else (chunk or "")
+
+
+class JSONObjectScanner:
+    """
+        Incremental scanner that tracks nesting outside of strings, fed one chunk at a time.
+
+        complete becomes True as soon as the first top-level object is closed.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.depth = 0
+        self.started = False
+        self.complete = False
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> bool:
+        self.chunks.append(text)
+        for char in text:
+            if self.complete:
+                break
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self.started:
+                self._in_string = True
+            elif char in "{[" and (self.started or char == "{"):
+                self.started = True
+                self.depth += 1
+            elif char in "}]" and self.started:
+                self.depth -= 1
+                self.complete = self.depth == 0
+        return self.complete
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+
+def _repair_candidates(text: str) -> Iterable[str]:
+    """
+        Rebuild the first JSON object in text: comments and trailing commas are dropped, and if the
+        text is truncated the open strings / containers are closed. When closing is not enough the
+        object is also cut back to each earlier member boundary in turn.
+    """
+    start = text.find("{")
+    if start == -1:
+        return
+
+    out = []
+    stack = []
+    cuts = []  # (output length, open containers) before each separating comma
+    in_string = escape = False
+    i = start
+    while i < len(text):
+        char = text[i]
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                out[-1] = "\\n"  # raw newlines are invalid inside JSON strings
+        elif char == '"':
+            in_string = True
+            out.append(char)
+        elif char == "/" and text.startswith("//", i):
+            # "// comment" copied from the schema in the prompt
+            end = text.find("\n", i)
+            i = len(text) if end == -1 else end
+            continue
+        elif char in "{[":
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            while out and out[-1] in " \t\r\n,":
+                out.pop()  # trailing comma
+            if stack:
+                out.append(CLOSERS[stack.pop()])
+            if not stack:
+                yield "".join(out)
+                return
+        elif char == ",":
+            cuts.append((len(out), list(stack)))
+            out.append(char)
+        else:
+            out.append(char)
+        i += 1
+
+    # Truncated - close whatever is still open
+    tail = "".join(out)
+    if in_string:
+        tail += '"'
+    yield _close(tail, stack)
+
+    for length, open_containers in reversed(cuts):
+        yield _close("".join(out[:length]), open_containers)
+
+
+def _close(text: str, stack: List[str]) -> str:
+    text = text.rstrip(" \t\r\n,")
+    return text + "".join(CLOSERS[char] for char in reversed(stack))
+
+
+def extract_json(text: str) -> Dict[str, Any]:
+    """
+        Parse the first JSON object in an LLM response, repairing it when needed
+    """
+    text = text or ""
+    start = text.find("{")
+    end = text.rfind("}") + 1
+    if start != -1 and end > start:
+        try:
+            return json.loads(text[start:end])
+        except json.JSONDecodeError:
+            pass
+
+    for candidate in _repair_candidates(text):
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            logger.info("Repaired malformed JSON in LLM response")
+            return data
+
+    raise ValueError("No valid JSON found in response")
+
+
+def collect_json(llm, prompt: str, on_token: Optional[Callable[[str], None]] = None, agent: str = "llm") -> str:
+    """
+        Stream the completion and stop reading once the top-level JSON object is closed
+    """
+    with LLM_CALL_SECONDS.time(agent=agent):
+        if not hasattr(llm, "stream") or (on_token is None and not PARSING_CONFIG["stream"]):
+            return _token_text(llm.invoke(prompt))
+
+        scanner = JSONObjectScanner()
+        stream = llm.stream(prompt)
+        try:
+            for chunk in stream:
+                token = _token_text(chunk)
+                if on_token is not None and token:
+                    on_token(token)
+                if scanner.feed(token):
+                    break
+        finally:
+            stream.close()  # stops generation on the backend
+        return scanner.text
+
+
+async def acollect_json(llm, prompt: str, on_token: Optional[Callable[[str], None]] = None, agent: str = "llm") -> str:
+    """
+        Async collect_json
+    """
+    with LLM_CALL_SECONDS.time(agent=agent):
+        if not hasattr(llm, "astream") or (on_token is None and not PARSING_CONFIG["stream"]):
+            return _token_text(await llm.ainvoke(prompt))
+
+        scanner = JSONObjectScanner()
+        stream = llm.astream(prompt)
+        try:
+            async for chunk in stream:
+                token = _token_text(chunk)
+                if on_token is not None and token:
+                    on_token(token)
+                if scanner.feed(token):
+                    break
+        finally:
+            await stream.aclose()
+        return scanner.text
+
+
+def missing_fields(data: Dict[str, Any], fields: Iterable[str]) -> List[str]:
+    """
+        Expected keys the response did not contain (e.g. cut off by truncation)
+    """
+    return [field for field in fields if field not in data]
+
+
+def build_field_prompt(prompt: str, fields: List[str]) -> str:
+    """
+        Follow-up prompt that asks only for the fields missing from the first response
+    """
+    keys = ", ".join(f'"{field}"' for field in fields)
+    return (
+        f"{prompt}\n\n"
+        f"Your previous answer was incomplete. Return a single valid JSON object with ONLY these keys: {keys}. "
+        f"No other keys, text or markdown."
+    )
+
+
+def _safe_extract(text: str, agent: str = "llm") -> Dict[str, Any]:
+    with JSON_PARSE_SECONDS.time(agent=agent):
+        try:
+            return extract_json(text)
+        except ValueError as e:
+            logger.warning(f"{e}: {text[:200]!r}")
+            return {}
+
+
+def _is_closed(text: str) -> bool:
+    return JSONObjectScanner().feed(text)
+
+
+def _merge_missing(data: Dict[str, Any], text: str, missing: List[str], agent: str = "llm") -> None:
+    extra = _safe_extract(text, agent)
+    for field in missing:
+        if field in extra:
+            data[field] = extra[field]
+
+
+def complete_json(llm, prompt: str, fields: List[str], max_field_retries: Optional[int] = None,
+                  on_token: Optional[Callable[[str], None]] = None, agent: str = "llm") -> Dict[str, Any]:
+    """
+        Run the prompt and parse the JSON object. When the response was cut off, the fields it lost
+        (or everything, when nothing could be parsed) are re-requested on their own instead of
+        rerunning the whole request. agent labels the call and parse metrics.
+    """
+    retries = PARSING_CONFIG["max_field_retries"] if max_field_retries is None else max_field_retries
+    text = collect_json(llm, prompt, on_token, agent)
+    data = _safe_extract(text, agent)
+    if data and _is_closed(text):
+        return data  # keys the model left out of a complete object are not retried
+
+    # The last key of a truncated object was probably cut off mid-value as well
+    last = list(data)[-1:] if data else []
+    for attempt in range(retries):
+        missing = missing_fields(data, fields) + ([field for field in last if field in fields] if attempt == 0 else [])
+        if not missing:
+            break
+        logger.warning(f"Re-prompting for missing fields: {missing}")
+        FIELD_RETRIES.inc(agent=agent)
+        _merge_missing(data, collect_json(llm, build_field_prompt(prompt, missing), agent=agent), missing, agent)
+
+    return data
+
+
+async def acomplete_json(llm, prompt: str, fields: List[str], max_field_retries: Optional[int] = None,
+                         on_token: Optional[Callable[[str], None]] = None, agent: str = "llm") -> Dict[str, Any]:
+    """
+        Async complete_json
+    """
+    retries = PARSING_CONFIG["max_field_retries"] if max_field_retries is None else max_field_retries
+    text = await acollect_json(llm, prompt, on_token, agent)
+    data = _safe_extract(text, agent)
+    if data and _is_closed(text):
+        return data  # keys the model left out of a complete object are not retried
+
+    # The last key of a truncated object was probably cut off mid-value as well
+    last = list(data)[-1:] if data else []
+    for attempt in range(retries):
+        missing = missing_fields(data, fields) + ([field for field in last if field in fields] if attempt == 0 else [])
+        if not missing:
+            break
+        logger.warning(f"Re-prompting for missing fields: {missing}")
+        FIELD_RETRIES.inc(agent=agent)
+        _merge_missing(data, await acollect_json(llm, build_field_prompt(prompt, missing), agent=agent), missing, agent)
+
+    return data
@@ -0,0 +1,316 @@
+"""
+Pooled LLM clients - per-backend in-flight limits and single-flight coalescing of identical prompts
+"""
+
+import asyncio
+import threading
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Tuple
+
+from metrics import QUEUE_WAIT_SECONDS
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BackendLimiter:
+    """
+        In-flight limit shared by every client of one backend (e.g. one Ollama server).
+
+        Sync and async callers, on any event loop, count against the same max_in_flight. Waiters
+        are served first come, first served, and async waiters never block their loop or a thread.
+        Single-flight futures are kept per loop, asyncio futures belong to one loop.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.sync_inflight = {}  # key -> _Call
+        self.lock = threading.Lock()
+        self._waiters = deque()  # threading.Event or (loop, future), a released slot is handed to the first
+        self._loops = weakref.WeakKeyDictionary()  # loop -> in-flight futures
+
+    def loop_inflight(self) -> Dict[Any, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        inflight = self._loops.get(loop)
+        if inflight is None:
+            inflight = self._loops[loop] = {}
+        return inflight
+
+    def _try_acquire(self) -> bool:
+        # Caller holds self.lock
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            return True
+        return False
+
+    def release(self) -> None:
+        with self.lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                if future.cancelled():
+                    continue
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+                except RuntimeError:
+                    continue  # loop closed
+            self.in_flight -= 1
+
+    def _grant(self, future: asyncio.Future) -> None:
+        # Runs on the waiter's loop, the slot moves on if the waiter gave up meanwhile
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    @contextmanager
+    def slot(self):
+        with QUEUE_WAIT_SECONDS.time(queue="llm"):
+            with self.lock:
+                event = None if self._try_acquire() else threading.Event()
+                if event is not None:
+                    self._waiters.append(event)
+            if event is not None:
+                event.wait()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        with QUEUE_WAIT_SECONDS.time(queue="llm"):
+            with self.lock:
+                future = None
+                if not self._try_acquire():
+                    future = asyncio.get_running_loop().create_future()
+                    self._waiters.append((asyncio.get_running_loop(), future))
+            if future is not None:
+                try:
+                    await future
+                except asyncio.CancelledError:
+                    with self.lock:
+                        queued = (asyncio.get_running_loop(), future) in self._waiters
+                        if queued:
+                            self._waiters.remove((asyncio.get_running_loop(), future))
+                    if not queued and future.done() and not future.cancelled():
+                        self.release()  # granted, but cancelled before it ran
+                    raise
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class _Call:
+    """
+        Result of a sync call that other threads are waiting on
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _text(chunk) -> str:
+    return chunk.content if hasattr(chunk, "content") else (chunk or "")
+
+
+class PooledLLM:
+    """
+        Wraps a LangChain LLM. Calls hold a slot of the backend's in-flight limit, and concurrent
+        calls with an identical prompt share one backend call and its result.
+
+        Coalesced stream callers receive the leader's full text as a single chunk.
+    """
+
+    def __init__(self, llm, limiter: BackendLimiter, single_flight: bool = True):
+        self.llm = llm
+        self.limiter = limiter
+        self.single_flight = single_flight
+        self.calls = 0
+        self.coalesced = 0
+
+    def __getattr__(self, name):
+        # model name, bind(), with_config() ... come from the wrapped LLM
+        return getattr(self.llm, name)
+
+    def _count(self, counter: str) -> None:
+        # Clients are shared by request threads, += on an attribute is not atomic
+        with self.limiter.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.limiter.lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "max_in_flight": self.limiter.max_in_flight
+            }
+
+    def _key(self, kind: str, prompt) -> Any:
+        if not self.single_flight or not isinstance(prompt, str):
+            return None
+        return (kind, id(self.llm), prompt)
+
+    def invoke(self, prompt, **kwargs):
+        key = self._key("invoke", prompt) if not kwargs else None
+        if key is None:
+            return self._invoke(prompt, **kwargs)
+
+        with self.limiter.lock:
+            call = self.limiter.sync_inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self.limiter.sync_inflight[key] = _Call()
+
+        if not leader:
+            self._count("coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._invoke(prompt)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.limiter.lock:
+                self.limiter.sync_inflight.pop(key, None)
+            call.done.set()
+
+    def _invoke(self, prompt, **kwargs):
+        with self.limiter.slot():
+            self._count("calls")
+            return self.llm.invoke(prompt, **kwargs)
+
+    def stream(self, prompt, **kwargs):
+        with self.limiter.slot():
+            self._count("calls")
+            yield from self.llm.stream(prompt, **kwargs)
+
+    async def ainvoke(self, prompt, **kwargs):
+        key = self._key("invoke", prompt) if not kwargs else None
+        if key is None:
+            return await self._ainvoke(prompt, **kwargs)
+
+        inflight = self.limiter.loop_inflight()
+        future = inflight.get(key)
+        if future is not None:
+            self._count("coalesced")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled, make our own call
+
+            return await self._ainvoke(prompt)
+
+        future = inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._ainvoke(prompt)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved, even if nobody else was waiting
+            raise
+        finally:
+            inflight.pop(key, None)
+
+    async def _ainvoke(self, prompt, **kwargs):
+        async with self.limiter.aslot():
+            self._count("calls")
+            return await self.llm.ainvoke(prompt, **kwargs)
+
+    async def astream(self, prompt, **kwargs):
+        key = self._key("stream", prompt) if not kwargs else None
+        inflight = None
+        future = None
+        if key is not None:
+            inflight = self.limiter.loop_inflight()
+            leader_future = inflight.get(key)
+            if leader_future is not None:
+                self._count("coalesced")
+                try:
+                    text = await asyncio.shield(leader_future)
+                except asyncio.CancelledError:
+                    if not leader_future.cancelled():
+                        raise
+                else:
+                    yield text
+                    return
+            future = inflight[key] = asyncio.get_running_loop().create_future()
+
+        chunks = []
+        try:
+            async with self.limiter.aslot():
+                self._count("calls")
+                async for chunk in self.llm.astream(prompt, **kwargs):
+                    chunks.append(_text(chunk))
+                    yield chunk
+        except asyncio.CancelledError:
+            if future is not None:
+                future.cancel()
+            raise
+        except Exception as e:
+            if future is not None:
+                future.set_exception(e)
+                future.exception()
+            raise
+        finally:
+            if future is not None:
+                inflight.pop(key, None)
+                if not future.done():
+                    # Finished, or the consumer stopped early (e.g. once its JSON object closed)
+                    future.set_result("".join(chunks))
+
+
+_limiters = {}
+_clients = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(backend: str, max_in_flight: int) -> BackendLimiter:
+    with _registry_lock:
+        if backend not in _limiters:
+            _limiters[backend] = BackendLimiter(max_in_flight)
+        return _limiters[backend]
+
+
+def get_pooled_llm(key: Tuple, backend: str, factory, max_in_flight: int, single_flight: bool = True) -> PooledLLM:
+    """
+        One shared client per (provider, model, base_url), built by factory on first use
+    """
+    with _registry_lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+
+    client = PooledLLM(factory(), get_limiter(backend, max_in_flight), single_flight)
+    with _registry_lock:
+        return _clients.setdefault(key, client)
+
+
+def llm_stats() -> Dict[str, Any]:
+    """
+        Call / coalesced counts of every pooled client
+    """
+    with _registry_lock:
+        return {":".join(str(part) for part in key if part): client.stats() for key, client in _clients.items()}
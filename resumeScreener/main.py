@@ -1,36 +1,40 @@
 import os
 import sys
 import json
-from datetime import datetime
+import time
+import asyncio
+import threading
+import uuid
+from types import SimpleNamespace
 
 from dotenv import load_dotenv
 load_dotenv()
 
-# from judgeval import JudgementClient
-from judgeval.common.tracer import Tracer
-from judgeval.scorers import AnswerRelevancyScorer
-from judgeval.data import Example
-
+# Heavy SDKs (judgeval, langgraph, LangChain providers, PDF / DOCX readers) are imported on
+# first use, so importing this module - and starting the API - stays fast
 from utils import initialize_llm
-from typing import Dict, Any, TypedDict, Optional
-
-sys.path.append(os.getcwd())
-from config import FILE_CONFIG, AGENT_CONFIG, JUDGEVAL_CONFIG
-
-from Agents.jdParserAgent import JDParserAgent
-from Agents.resumeParserAgent import ResumeParserAgent
-from Agents.matcherAgent import MatcherAgent
+from evaluation import evaluate
+from reports import save_report
+from metrics import track_stage, QUEUE_WAIT_SECONDS, ERRORS
+from tracing import observe, get_tracer
+from typing import Dict, Any, TypedDict, Optional, List, Annotated
 
-from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+from config import FILE_CONFIG, AGENT_CONFIG, JUDGEVAL_CONFIG, BATCH_CONFIG, WORKFLOW_CONFIG, RETRIEVAL_CONFIG, CANDIDATE_STORE_CONFIG
 
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-output_dir = "reports"
-os.makedirs(output_dir, exist_ok=True)
+def merge_errors(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    """
+        Reducer for the error channel - the parallel parse branches can both fail in the same step
+    """
+    if not current:
+        return new
+    if not new or new == current:
+        return current
+    return f"{current}; {new}"
 
 # Define state structure
 class RMAState(TypedDict):
@@ -38,27 +42,78 @@ class RMAState(TypedDict):
     State for Resume Matching Agent
     """
     resume_file_path: str
+    resume_upload: Optional[str] # key of the raw upload in _uploads, the bytes stay out of state and checkpoints
     resume_text: str
     jd_text: str
     resume_data: Dict[str, Any]
     jd_data: Dict[str, Any]
     match_results: Dict[str, Any]
     final_report: str
-    error: Optional[str] = None # If any error occurred b/w the process
-
-llm = initialize_llm() # Initialize LLM
+    report_id: Optional[str] # ID of the saved report
+    score_only: bool # local deterministic score, skips the LLM matcher
+    fast_mode: bool # parse and match in a single LLM call
+    stream_tokens: bool # push matcher tokens to the stream writer (/analyze/stream)
+    error: Annotated[Optional[str], merge_errors] # If any error occurred b/w the process
+
+_agents = None
+_agents_lock = threading.Lock()
+
+# Raw uploads waiting to be parsed, keyed by RMAState.resume_upload
+_uploads: Dict[str, bytes] = {}
+
+def _stash_upload(resume_bytes: Optional[bytes]) -> Optional[str]:
+    if not resume_bytes:
+        return None
+    upload_id = uuid.uuid4().hex
+    _uploads[upload_id] = resume_bytes
+    return upload_id
+
+def _take_upload(upload_id: Optional[str]) -> Optional[bytes]:
+    """
+        Hand an upload to the node that parses it, it is released right away
+    """
+    return _uploads.pop(upload_id, None) if upload_id else None
 
-resume_agent = ResumeParserAgent(llm)
-jd_agent = JDParserAgent(llm)
-matcher_agent = MatcherAgent(llm)
+def get_agents() -> SimpleNamespace:
+    """
+        The LLM client and the agents, built on first use
+    """
+    global _agents
+
+    with _agents_lock:
+        if _agents is None:
+            from Agents.jdParserAgent import JDParserAgent
+            from Agents.resumeParserAgent import ResumeParserAgent
+            from Agents.matcherAgent import MatcherAgent
+            from Agents.fastMatchAgent import FastMatchAgent
+
+            llm = initialize_llm() # Initialize LLM
+            resume_agent = ResumeParserAgent(llm)
+            jd_agent = JDParserAgent(llm)
+            matcher_agent = MatcherAgent(llm)
+            fast_match_agent = FastMatchAgent(llm, resume_agent, jd_agent, matcher_agent)
+            _agents = SimpleNamespace(
+                llm=llm,
+                resume_agent=resume_agent,
+                jd_agent=jd_agent,
+                matcher_agent=matcher_agent,
+                fast_match_agent=fast_match_agent
+            )
+        return _agents
 
-tracer = Tracer(project_name="resume_screening_agent") # can do this later
-# client = JudgementClient()
+def __getattr__(name: str):
+    # main.resume_agent, main.tracer etc. still work, they are created on first access
+    if name in ("llm", "resume_agent", "jd_agent", "matcher_agent", "fast_match_agent"):
+        return getattr(get_agents(), name)
+    if name == "tracer":
+        return get_tracer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def create_workflow() -> StateGraph:
+def create_workflow() -> "StateGraph":
     """
         Create the LangGraph workflow
     """
+    from langgraph.graph import StateGraph, START, END
 
     workflow = StateGraph(RMAState)
 
@@ -66,128 +121,227 @@ def create_workflow() -> StateGraph:
     workflow.add_node("parse_resume", parse_resume_node)
     workflow.add_node("parse_jd", parse_jd_node)
     workflow.add_node("match_analysis", match_analysis_node)
+    workflow.add_node("fast_analysis", fast_analysis_node)
     workflow.add_node("compile_report", compile_report_node)
 
-    # Define flow
-    workflow.set_entry_point("parse_resume")
+    # Define flow - resume and JD parsing are independent, so they fan out in parallel,
+    # fast mode does both and the match in one node
+    workflow.add_conditional_edges(START, route_start, ["parse_resume", "parse_jd", "fast_analysis"])
 
-    workflow.add_edge("parse_resume", "parse_jd")
-    workflow.add_edge("parse_jd", "match_analysis")
+    # and join before matching
+    workflow.add_edge(["parse_resume", "parse_jd"], "match_analysis")
     workflow.add_edge("match_analysis", "compile_report")
+    workflow.add_edge("fast_analysis", "compile_report")
 
     workflow.add_edge("compile_report", END)
 
     return workflow
+
+def route_start(state: RMAState) -> List[str]:
+    """
+        Entry nodes for the request - the single fast_analysis node or the parallel parsers
+    """
+    if state.get("fast_mode"):
+        return ["fast_analysis"]
+    return ["parse_resume", "parse_jd"]
+
+_workflow_app = None
+_checkpointer = None
+_workflow_lock = threading.Lock()
+
+def get_workflow_app():
+    """
+        Compile the workflow once and reuse it for every request
+    """
+    global _workflow_app, _checkpointer
+
+    with _workflow_lock:
+        if _workflow_app is None:
+            from checkpoints import BoundedMemorySaver
+            _checkpointer = BoundedMemorySaver(WORKFLOW_CONFIG["max_completed_threads"])
+            _workflow_app = create_workflow().compile(checkpointer=_checkpointer)
+
+    return _workflow_app
+
+def warm_up() -> None:
+    """
+        Build what is otherwise built by the first request - run in the background after startup
+    """
+    try:
+        get_agents()
+        get_workflow_app()
+        get_tracer()
+        if RETRIEVAL_CONFIG["enabled"]:
+            from retrieval import get_index
+            get_index("resume")
+        logger.info("Warm-up completed")
+    except Exception as e:
+        # Every getter retries on its next call
+        logger.error(f"Warm-up failed: {e}")
+
+def reindex_candidates() -> None:
+    """
+        Rebuild the resume retrieval index from the candidate store, e.g. after a restart
+    """
+    try:
+        from retrieval import rebuild_resume_index
+        rebuild_resume_index()
+    except Exception as e:
+        logger.error(f"Rebuilding the resume index failed: {e}")
+
+def _index_parsed_sync(kind: str, data: Dict[str, Any], name: Optional[str] = None) -> None:
+    if RETRIEVAL_CONFIG["enabled"]:
+        from retrieval import index_document
+        index_document(kind, data, name)
+    if kind == "resume" and CANDIDATE_STORE_CONFIG["enabled"]:
+        from candidates import store_candidate
+        store_candidate(data, name)
+
+async def _index_parsed(kind: str, data: Dict[str, Any], name: Optional[str] = None) -> None:
+    """
+        Add a parsed resume / JD to the retrieval index (scikit-learn is only imported here, on first use),
+        and persist parsed resumes in the candidate store. Vectorizing and the SQLite write run off the event loop.
+    """
+    if RETRIEVAL_CONFIG["enabled"] or (kind == "resume" and CANDIDATE_STORE_CONFIG["enabled"]):
+        await asyncio.to_thread(_index_parsed_sync, kind, data, name)
     
-@tracer.observe(name="resume_parsing_agent", span_type="resume")
-def parse_resume_node(state: RMAState) -> RMAState:
+@observe(name="resume_parsing_agent", span_type="resume")
+@track_stage("parse_resume")
+async def parse_resume_node(state: RMAState) -> Dict[str, Any]:
+    """
+        Runs in parallel with parse_jd_node, so it only returns the keys it owns
+    """
     try:
+        resume_agent = get_agents().resume_agent
+
         if state.get("resume_file_path"):
-            resume_data = resume_agent.run(state["resume_file_path"])
+            resume_data = await resume_agent.arun(state["resume_file_path"])
+        elif state.get("resume_upload"):
+            resume_data = await resume_agent.arun(_uploaded_resume(state))
         elif state.get("resume_text"):
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as temp_file:
-                temp_file.write(state["resume_text"].encode("utf-8"))
-                temp_file_path = temp_file.name
-            
-            resume_data = resume_agent.run(temp_file_path)
-
-            # delete the temp file
-            os.remove(temp_file_path)
-
             resume_text = state["resume_text"]
 
-            print('<-------------------------------->')
-            print(f"Resume Text: {resume_text}")
-            print('--------------------------------')
-            print(f"Resume Data: {resume_data}")
-            print('--------------------------------')
-
-            # JUDGEVAL SCORING
-            tracer.async_evaluate(
-                scorers=[AnswerRelevancyScorer(threshold=0.5)],
-                input=resume_text,
-                actual_output=json.dumps(resume_data),
-                model="gpt-4"
-            )
+            # Passed as bytes so pasted text is never mistaken for a file path
+            resume_data = await resume_agent.arun(resume_text.encode("utf-8"))
+            logger.debug(f"Parsed pasted resume text ({len(resume_text)} chars)")
+
+            # JUDGEVAL SCORING (sampled, in the background)
+            evaluate("resume_parsing", resume_text, resume_data)
 
         else:
             raise ValueError("No resume file or text provided")
         
-        state["resume_data"] = resume_data
         logger.info("Resume parsed successfully")
         # logger.info(f"Resume data: {resume_data}")
+        await _index_parsed("resume", resume_data)
+
+        return {"resume_data": resume_data}
         
     except Exception as e:
         logger.error(f"Error parsing resume: {e}")
-        state["error"] = str(e)
-        state["resume_data"] = {}
+        return {"error": str(e), "resume_data": {}}
 
-    return state
-
-@tracer.observe(name="job_description_parsing_agent", span_type="job")  
-def parse_jd_node(state: RMAState) -> RMAState:
+@observe(name="job_description_parsing_agent", span_type="job")  
+@track_stage("parse_jd")
+async def parse_jd_node(state: RMAState) -> Dict[str, Any]:
+    """
+        Runs in parallel with parse_resume_node, so it only returns the keys it owns
+    """
     try:
         logger.info("Parsing job description...")
 
         if not state.get("jd_text"):
             raise ValueError("No job description text provided")
         
-        jd_data = jd_agent.run(state["jd_text"])
-        state["jd_data"] = jd_data
+        jd_data = await get_agents().jd_agent.arun(state["jd_text"])
         logger.info("Job description parsed successfully")
         # logger.info(f"Job description data: {jd_data}")
 
-        # JUDGEVAL SCORING
-        tracer.async_evaluate(
-            scorers=[AnswerRelevancyScorer(threshold=0.5)],
-            input=state["jd_text"],
-            actual_output=json.dumps(jd_data),
-            model="gpt-4"
-        )
+        # JUDGEVAL SCORING (sampled, in the background)
+        evaluate("job_description_parsing", state["jd_text"], jd_data)
+        await _index_parsed("jd", jd_data)
+
+        return {"jd_data": jd_data}
 
     except Exception as e:
         logger.error(f"Error parsing job description: {e}")
-        state["error"] = str(e)
-        state["jd_data"] = {}
+        return {"error": str(e), "jd_data": {}}
 
-    return state
-
-@tracer.observe(name="match_analysis_agent", span_type="match")
-def match_analysis_node(state: RMAState) -> RMAState:
+@observe(name="match_analysis_agent", span_type="match")
+@track_stage("match_analysis")
+async def match_analysis_node(state: RMAState) -> Dict[str, Any]:
     try:
         logger.info("Analyzing match...")
 
         if not state.get("resume_data") or not state.get("jd_data"):
             raise ValueError("Missing resume or job description data")
         
-        match_results = matcher_agent.run(state["resume_data"], state["jd_data"])
-        state["match_results"] = match_results
+        matcher_agent = get_agents().matcher_agent
+        score_only = state.get("score_only", False)
+        on_token = None
+        if state.get("stream_tokens"):
+            from langgraph.config import get_stream_writer
+            writer = get_stream_writer()
+            if not score_only:
+                # The local score is ready long before the LLM suggestions
+                writer({"event": "score", "data": matcher_agent.score(state["resume_data"], state["jd_data"])})
+            on_token = lambda token: writer({"event": "token", "data": {"text": token}})
+
+        match_results = await matcher_agent.arun(
+            state["resume_data"], state["jd_data"], score_only=score_only, on_token=on_token
+        )
         logger.info("Match analysis completed")
 
-        # Evaluating Agent usign judgeval scorer
-        tracer.async_evaluate(
-            scorers=[AnswerRelevancyScorer(threshold=0.5)],
-            input=state["resume_data"],
-            actual_output=json.dumps(match_results),
-            model="gpt-4"
-        )
+        # Evaluating Agent usign judgeval scorer (sampled, in the background)
+        evaluate("match_analysis", state["resume_data"], match_results)
+
+        return {"match_results": match_results}
 
     except Exception as e:
         logger.error(f"Error during match analysis: {e}")
-        state["error"] = str(e)
-        state["match_results"] = {}
+        return {"error": str(e), "match_results": {}}
 
-    return state
+@observe(name="fast_analysis_agent", span_type="match")
+@track_stage("fast_analysis")
+async def fast_analysis_node(state: RMAState) -> Dict[str, Any]:
+    """
+        Parse the resume and the JD and match them in a single LLM call
+    """
+    try:
+        logger.info("Running fast analysis...")
 
-@tracer.observe(name="compile_report_node", span_type="report")
-def compile_report_node(state: RMAState) -> RMAState:
+        if not state.get("jd_text"):
+            raise ValueError("No job description text provided")
+
+        if state.get("resume_file_path"):
+            resume = state["resume_file_path"]
+        elif state.get("resume_upload"):
+            resume = _uploaded_resume(state)
+        elif state.get("resume_text"):
+            # Passed as bytes so pasted text is never mistaken for a file path
+            resume = state["resume_text"].encode("utf-8")
+        else:
+            raise ValueError("No resume file or text provided")
+
+        results = await get_agents().fast_match_agent.arun(resume, state["jd_text"])
+        logger.info("Fast analysis completed")
+        # Not indexed or stored: the combined prompt only extracts the match fields, a thin record
+        # would look like a full parse in search results
+
+        return results
+
+    except Exception as e:
+        logger.error(f"Error during fast analysis: {e}")
+        return {"error": str(e), "resume_data": {}, "jd_data": {}, "match_results": {}}
+
+@observe(name="compile_report_node", span_type="report")
+@track_stage("compile_report")
+def compile_report_node(state: RMAState) -> Dict[str, Any]:
     try:
         logger.info("Compiling report...")
 
         if state.get("error"):
-            state["final_report"] = f"#Analysis Failed\n\nReason: {state['error']}"
-            return state
+            return {"final_report": f"#Analysis Failed\n\nReason: {state['error']}"}
         
         match_results = state["match_results"]
         # resume_data = state["resume_data"]
@@ -210,27 +364,57 @@ Suggestions: \n
 {chr(10).join([f'- {imp}' for imp in match_results.get('Suggestions', [])[:3]])}
         """
 
-        state["final_report"] = final_report
         logger.info("Report compiled successfully")
 
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        file_name = f"report_{timestamp}.md"
-        file_path = os.path.join(output_dir, file_name)
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(final_report)
-
-        print(f"Report saved to {file_path}")
+        # Written by the background report writer, off the request path
+        report_id = save_report(final_report, match_results=match_results)
+        logger.info(f"Report {report_id} queued for saving")
 
-        return state
+        return {"final_report": final_report, "report_id": report_id}
 
     except Exception as e:
         logger.error(f"Error compiling report: {e}")
-        state["error"] = str(e)
-        state["final_report"] = f"#Analysis Failed\n\nReason: {str(e)}"
-        return state    
+        return {"error": str(e), "final_report": f"#Analysis Failed\n\nReason: {str(e)}"}    
 
-async def process_resume_and_job(job_description=None, resume_file=None, resume_text=None, chat_history=None, user_message=""):
+def _uploaded_resume(state: RMAState) -> bytes:
+    resume_bytes = _take_upload(state["resume_upload"])
+    if resume_bytes is None:
+        raise ValueError("Resume upload is no longer available")
+    return resume_bytes
+
+async def _build_initial_state(job_description, resume_file, resume_text, score_only=False,
+                               fast_mode=False, resume_bytes=None, stream_tokens=False) -> Dict[str, Any]:
+    """
+        Workflow input state for one resume / JD pair
+    """
+    # Get file path if uploaded
+    resume_file_path = None
+    if resume_file:
+        # Check if it's a Gradio file object (has .name) or FastAPI UploadFile (has .filename)
+        if hasattr(resume_file, 'name'):
+            resume_file_path = resume_file.name  # Gradio file object
+        elif hasattr(resume_file, 'filename'):
+            # For FastAPI UploadFile, keep the raw bytes - the parser caches on them
+            await resume_file.seek(0)
+            resume_bytes = await resume_file.read()
+
+    return {
+        "resume_file_path": resume_file_path,
+        "resume_upload": _stash_upload(resume_bytes),
+        "resume_text": resume_text or "",
+        "jd_text": job_description or "",
+        "resume_data": {},
+        "jd_data": {},
+        "match_results": {},
+        "final_report": "",
+        "report_id": None,
+        "score_only": score_only,
+        "fast_mode": fast_mode,
+        "stream_tokens": stream_tokens,
+        "error": None
+    }
+
+async def process_resume_and_job(job_description=None, resume_file=None, resume_text=None, chat_history=None, user_message="", score_only=False, fast_mode=False, resume_bytes=None):
     """
         Afunction for both workflow processing
     """
@@ -253,80 +437,19 @@ async def process_resume_and_job(job_description=None, resume_file=None, resume_
                 chat_history.append(["Analysis", response])
                 return chat_history
             
-        # Get file path if uploaded
-        if resume_file:
-            # Check if it's a Gradio file object (has .name) or FastAPI UploadFile (has .filename)
-            if hasattr(resume_file, 'name'):
-                resume_file_path = resume_file.name  # Gradio file object
-            elif hasattr(resume_file, 'filename'):
-                # print(f"Resume file: {resume_file}")
-                
-                # For FastAPI UploadFile, read the uploaded content
-                import tempfile
-                resume_file.file.seek(0)
-                resume_bytes = resume_file.file.read()
-                
-                # If it's a PDF, extract text first
-                if resume_file.filename.endswith(".pdf"):
-                    try:
-                        import PyPDF2
-                        import io
-                        
-                        # Create PDF reader from bytes
-                        pdf_reader = PyPDF2.PdfReader(io.BytesIO(resume_bytes))
-                        text = ""
-                        for page in pdf_reader.pages:
-                            text += page.extract_text()
-                        resume_text = text
-                        # print(f"Resume text extracted from PDF: {resume_text[:200]}...")
-                        
-                        # Create temp file with extracted text
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as temp_txt_file:
-                            temp_txt_file.write(resume_text)
-                            temp_txt_file.flush()
-                            resume_file_path = temp_txt_file.name
-                            
-                    except Exception as e:
-                        logger.error(f"PDF parsing failed: {e}")
-                        # Fallback to treating as binary
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as temp_txt_file:
-                            content_as_str = resume_bytes.decode("utf-8", errors="ignore")
-                            temp_txt_file.write(content_as_str)
-                            temp_txt_file.flush()
-                            resume_file_path = temp_txt_file.name
-                else:
-                    # For non-PDF files
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as temp_txt_file:
-                        content_as_str = resume_bytes.decode("utf-8", errors="ignore")
-                        temp_txt_file.write(content_as_str)
-                        temp_txt_file.flush()
-                        resume_file_path = temp_txt_file.name
-            else:
-                resume_file_path = None
-        else:
-            resume_file_path = None
+        app = get_workflow_app()
+        initial_state = await _build_initial_state(
+            job_description, resume_file, resume_text, score_only, fast_mode, resume_bytes=resume_bytes
+        )
 
-        # print(f"Written file path: {resume_file_path}")
-        # print(f"Size: {os.path.getsize(resume_file_path)} bytes")
-        
-        # Create and run workflow
-        workflow = create_workflow()
-        memory = MemorySaver()
-        app = workflow.compile(checkpointer=memory)
-        
-        initial_state = {
-            "resume_file_path": resume_file_path,
-            "resume_text": resume_text or "",
-            "jd_text": job_description or "",
-            "resume_data": {},
-            "jd_data": {},
-            "match_results": {},
-            "final_report": "",
-            "error": None
-        }
-        
-        config = {"configurable": {"thread_id": "rma-analysis"}}
-        result = app.invoke(initial_state, config)
+        # Every request gets its own checkpoint thread
+        thread_id = f"rma-analysis-{uuid.uuid4().hex}"
+        config = {"configurable": {"thread_id": thread_id}}
+        try:
+            result = await app.ainvoke(initial_state, config)
+        finally:
+            _checkpointer.mark_completed(thread_id)
+            _take_upload(initial_state["resume_upload"])
 
         # print(f"Result: {result}")
         
@@ -338,7 +461,8 @@ async def process_resume_and_job(job_description=None, resume_file=None, resume_
             chat_history.append(["Analysis Complete", final_report])
             return chat_history
         else:
-            # Direct mode
+            # Direct mode, the upload key is internal
+            result.pop("resume_upload", None)
             return result
             
     except Exception as e:
@@ -347,15 +471,370 @@ async def process_resume_and_job(job_description=None, resume_file=None, resume_
             return chat_history
         else:
             return {"final_report": f"Error: {str(e)}", "error": str(e)}
+
+# Per-node results sent to stream clients, the rest of the state is input or internal
+STREAM_FIELDS = {
+    "parse_resume": ("resume_data",),
+    "parse_jd": ("jd_data",),
+    "match_analysis": ("match_results",),
+    "fast_analysis": ("resume_data", "jd_data", "match_results"),
+    "compile_report": ("final_report", "report_id")
+}
+
+async def stream_resume_and_job(job_description=None, resume_file=None, resume_text=None, resume_bytes=None, score_only=False, fast_mode=False):
+    """
+        Run the workflow and yield (event, data) as it progresses.
+
+        Every node yields its partial result as soon as it finishes, the matcher additionally
+        yields the local "score" and then each "token" of the LLM output. A failed stage (or a
+        failure of the workflow itself) also yields an "error" event. A final "done" event
+        carries the error (if any) and the report.
+    """
+    app = get_workflow_app()
+    initial_state = await _build_initial_state(
+        job_description, resume_file, resume_text, score_only, fast_mode, resume_bytes=resume_bytes, stream_tokens=True
+    )
+
+    thread_id = f"rma-analysis-{uuid.uuid4().hex}"
+    config = {"configurable": {"thread_id": thread_id}}
+    error = None
+    final_report = ""
+    try:
+        async for mode, chunk in app.astream(initial_state, config, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                yield chunk["event"], chunk["data"]
+                continue
+
+            for node, update in chunk.items():
+                if node not in STREAM_FIELDS:
+                    continue
+                update = update or {}
+                if update.get("error"):
+                    error = update["error"]
+                final_report = update.get("final_report", final_report)
+                data = {field: update.get(field) for field in STREAM_FIELDS[node]}
+                data["error"] = update.get("error")
+                yield node, data
+                if update.get("error"):
+                    yield "error", {"stage": node, "error": update["error"]}
+    except Exception as e:
+        logger.error(f"Error streaming analysis: {e}")
+        error = str(e)
+        yield "error", {"stage": None, "error": error}
+    finally:
+        _checkpointer.mark_completed(thread_id)
+        _take_upload(initial_state["resume_upload"])
+
+    yield "done", {"error": error, "final_report": final_report}
+
+def _shortlist(candidates: List[Dict[str, Any]], jd_data: Dict[str, Any], top_k: int) -> List[Dict[str, Any]]:
+    """
+        Mark the top_k candidates whose parsed resume is most similar to the JD, and return them
+    """
+    from retrieval import RetrievalIndex
+
+    index = RetrievalIndex(n_features=RETRIEVAL_CONFIG["n_features"], skill_weight=RETRIEVAL_CONFIG["skill_weight"])
+    for position, candidate in enumerate(candidates):
+        candidate["shortlisted"] = False
+        candidate["similarity"] = 0.0
+        index.add(candidate["resume_data"], doc_id=str(position))
+
+    shortlisted = []
+    for hit in index.search(jd_data, len(candidates)):
+        candidate = candidates[int(hit["id"])]
+        candidate["similarity"] = hit["score"]
+        if len(shortlisted) < top_k:
+            candidate["shortlisted"] = True
+            shortlisted.append(candidate)
+    return shortlisted
+
+def _score_value(match_results: Dict[str, Any]) -> float:
+    """
+        Read match_score as a number, LLMs sometimes return it as a string
+    """
+    try:
+        return float(match_results.get("match_score", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+async def process_batch(job_description: str, resumes: List[Dict[str, str]], max_concurrency: Optional[int] = None, score_only: bool = False,
+                        shortlist: Optional[int] = None) -> Dict[str, Any]:
+    """
+        Rank many resumes against a single job description.
+
+        The job description is parsed once, every resume is then parsed and
+        matched concurrently (bounded by max_concurrency) and the candidates
+        are returned sorted by match score. With score_only the LLM matcher is
+        skipped and the whole pool is scored locally in one vectorized pass.
+        With shortlist only the shortlist resumes most similar to the JD get the
+        LLM matcher, the others are scored locally.
+
+        resumes: list of {"name": label, "text": resume text} or {"name": filename, "bytes": raw upload}
+    """
+    if not job_description or not job_description.strip():
+        raise ValueError("Job description is required")
+    if not resumes:
+        raise ValueError("At least one resume is required")
+
+    max_concurrency = max_concurrency or BATCH_CONFIG["max_concurrency"]
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    logger.info(f"Batch analysis: {len(resumes)} resumes, concurrency {max_concurrency}")
+
+    agents = get_agents()
+    resume_agent, matcher_agent = agents.resume_agent, agents.matcher_agent
+
+    # JD is parsed only once for the whole batch
+    jd_data = await agents.jd_agent.arun(job_description)
+    await _index_parsed("jd", jd_data)
+    match_inline = not score_only and shortlist is None
+
+    async def match_candidate(candidate: Dict[str, Any]) -> None:
+        match_results = await matcher_agent.arun(candidate["resume_data"], jd_data)
+        candidate["match_results"] = match_results
+        candidate["match_score"] = _score_value(match_results)
+
+    async def analyze_candidate(index: int, resume: Dict[str, str]) -> Dict[str, Any]:
+        candidate = {
+            "candidate": resume.get("name") or f"resume_{index + 1}",
+            "resume_data": {},
+            "match_results": {},
+            "match_score": 0.0,
+            "error": None
+        }
+        queued_at = time.perf_counter()
+        async with semaphore:
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued_at, queue="batch")
+            try:
+                if resume.get("bytes"):
+                    resume_data = await resume_agent.arun(resume["bytes"])
+                elif resume.get("text", "").strip():
+                    resume_data = await resume_agent.arun(resume["text"].encode("utf-8"))
+                else:
+                    raise ValueError("Resume text is required")
+                candidate["resume_data"] = resume_data
+                await _index_parsed("resume", resume_data, candidate["candidate"])
+
+                if match_inline:
+                    await match_candidate(candidate)
+            except Exception as e:
+                logger.error(f"Error analyzing {candidate['candidate']}: {e}")
+                candidate["error"] = str(e)
+                ERRORS.inc(stage="batch_candidate")
+
+        return candidate
+
+    candidates = await asyncio.gather(*[analyze_candidate(i, resume) for i, resume in enumerate(resumes)])
+    parsed = [c for c in candidates if c["error"] is None]
+
+    local = parsed if score_only else []
+    if shortlist is not None and not score_only:
+        shortlisted = await asyncio.to_thread(_shortlist, parsed, jd_data, shortlist)
+        logger.info(f"Shortlisted {len(shortlisted)} of {len(parsed)} resumes for the LLM matcher")
+
+        async def match_shortlisted(candidate: Dict[str, Any]) -> None:
+            async with semaphore:
+                try:
+                    await match_candidate(candidate)
+                except Exception as e:
+                    logger.error(f"Error matching {candidate['candidate']}: {e}")
+                    candidate["error"] = str(e)
+                    ERRORS.inc(stage="batch_candidate")
+
+        await asyncio.gather(*[match_shortlisted(c) for c in shortlisted])
+        local = [c for c in parsed if not c["shortlisted"]]
+
+    if local:
+        scores = matcher_agent.scorer.score_many([c["resume_data"] for c in local], jd_data)
+        for candidate, match_results in zip(local, scores):
+            match_results["Suggestions"] = []
+            candidate["match_results"] = match_results
+            candidate["match_score"] = _score_value(match_results)
+
+    # Failed candidates go to the bottom, ties keep submission order
+    ranked = sorted(candidates, key=lambda c: (c["error"] is None, c["match_score"]), reverse=True)
+    for rank, candidate in enumerate(ranked, start=1):
+        candidate["rank"] = rank
+
+    return {
+        "jd_data": jd_data,
+        "total": len(ranked),
+        "failed": sum(1 for c in ranked if c["error"]),
+        "candidates": ranked
+    }
+
+def _hits(hits: List[Dict[str, Any]], data_key: str) -> List[Dict[str, Any]]:
+    return [
+        {"id": hit["id"], "name": hit["metadata"].get("name"), "similarity": hit["score"], data_key: hit["metadata"].get("data", {})}
+        for hit in hits
+    ]
+
+async def search_resumes(job_description: str, top_k: Optional[int] = None) -> Dict[str, Any]:
+    """
+        The indexed resumes most similar to a job description - only the JD is parsed, no matching
+    """
+    from retrieval import get_index
+
+    if not job_description or not job_description.strip():
+        raise ValueError("Job description is required")
+
+    jd_data = await get_agents().jd_agent.arun(job_description)
+    await _index_parsed("jd", jd_data)
+    index = get_index("resume")
+    hits = await asyncio.to_thread(index.search, jd_data, top_k or RETRIEVAL_CONFIG["default_top_k"])
+    return {"jd_data": jd_data, "indexed": len(index), "results": _hits(hits, "resume_data")}
+
+async def search_jobs(resume: Dict[str, Any], top_k: Optional[int] = None) -> Dict[str, Any]:
+    """
+        The indexed job descriptions most similar to a resume - only the resume is parsed, no matching
+
+        resume: {"text": resume text} or {"bytes": raw upload}
+    """
+    from retrieval import get_index
+
+    if not resume.get("bytes") and not resume.get("text", "").strip():
+        raise ValueError("Resume file or text is required")
+
+    resume_data = await get_agents().resume_agent.arun(resume.get("bytes") or resume["text"].encode("utf-8"))
+    await _index_parsed("resume", resume_data)
+    index = get_index("jd")
+    hits = await asyncio.to_thread(index.search, resume_data, top_k or RETRIEVAL_CONFIG["default_top_k"])
+    return {"resume_data": resume_data, "indexed": len(index), "results": _hits(hits, "jd_data")}
+
+async def process_shortlist(job_description: str, top_k: Optional[int] = None, max_concurrency: Optional[int] = None, score_only: bool = False) -> Dict[str, Any]:
+    """
+        Rank the indexed resumes for a job description without re-parsing them.
+
+        The top_k resumes most similar to the JD are taken from the retrieval
+        index and only those are matched (concurrently, bounded by
+        max_concurrency), so a large stored pool costs top_k matcher calls.
+    """
+    max_concurrency = max_concurrency or BATCH_CONFIG["max_concurrency"]
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    search = await search_resumes(job_description, top_k)
+    jd_data = search["jd_data"]
+    matcher_agent = get_agents().matcher_agent
+
+    logger.info(f"Shortlist analysis: {len(search['results'])} of {search['indexed']} indexed resumes")
+
+    async def analyze_hit(hit: Dict[str, Any]) -> Dict[str, Any]:
+        candidate = {
+            "candidate": hit["name"] or hit["id"],
+            "resume_id": hit["id"],
+            "similarity": hit["similarity"],
+            "resume_data": hit["resume_data"],
+            "match_results": {},
+            "match_score": 0.0,
+            "error": None
+        }
+        queued_at = time.perf_counter()
+        async with semaphore:
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued_at, queue="batch")
+            try:
+                match_results = await matcher_agent.arun(hit["resume_data"], jd_data, score_only=score_only)
+                candidate["match_results"] = match_results
+                candidate["match_score"] = _score_value(match_results)
+            except Exception as e:
+                logger.error(f"Error matching {candidate['candidate']}: {e}")
+                candidate["error"] = str(e)
+                ERRORS.inc(stage="batch_candidate")
+        return candidate
+
+    candidates = await asyncio.gather(*[analyze_hit(hit) for hit in search["results"]])
+
+    # Failed candidates go to the bottom, ties keep similarity order
+    ranked = sorted(candidates, key=lambda c: (c["error"] is None, c["match_score"]), reverse=True)
+    for rank, candidate in enumerate(ranked, start=1):
+        candidate["rank"] = rank
+
+    return {
+        "jd_data": jd_data,
+        "indexed": search["indexed"],
+        "total": len(ranked),
+        "failed": sum(1 for c in ranked if c["error"]),
+        "candidates": ranked
+    }
+
+async def process_candidate(resume: Dict[str, Any], job_descriptions: List[Dict[str, str]], max_concurrency: Optional[int] = None, score_only: bool = False) -> Dict[str, Any]:
+    """
+        Rank many job descriptions for a single resume - the candidate's best-fit openings.
+
+        The resume is parsed once, every job description is then parsed and
+        matched concurrently (bounded by max_concurrency) and the jobs are
+        returned sorted by match score. With score_only the LLM matcher is
+        skipped and every job is scored locally.
+
+        resume: {"text": resume text} or {"bytes": raw upload}
+        job_descriptions: list of {"name": label, "text": job description text}
+    """
+    if not resume.get("bytes") and not resume.get("text", "").strip():
+        raise ValueError("Resume file or text is required")
+    if not job_descriptions:
+        raise ValueError("At least one job description is required")
+
+    max_concurrency = max_concurrency or BATCH_CONFIG["max_concurrency"]
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    logger.info(f"Candidate analysis: {len(job_descriptions)} job descriptions, concurrency {max_concurrency}")
+
+    agents = get_agents()
+    jd_agent, matcher_agent = agents.jd_agent, agents.matcher_agent
+
+    # Resume is extracted and parsed only once for all job descriptions
+    resume_data = await agents.resume_agent.arun(resume.get("bytes") or resume["text"].encode("utf-8"))
+    await _index_parsed("resume", resume_data)
+
+    async def analyze_job(index: int, job_description: Dict[str, str]) -> Dict[str, Any]:
+        job = {
+            "job": job_description.get("name") or f"job_description_{index + 1}",
+            "jd_data": {},
+            "match_results": {},
+            "match_score": 0.0,
+            "error": None
+        }
+        queued_at = time.perf_counter()
+        async with semaphore:
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued_at, queue="batch")
+            try:
+                if not job_description.get("text", "").strip():
+                    raise ValueError("Job description text is required")
+                jd_data = await jd_agent.arun(job_description["text"])
+                job["jd_data"] = jd_data
+                await _index_parsed("jd", jd_data, job["job"])
+
+                match_results = await matcher_agent.arun(resume_data, jd_data, score_only=score_only)
+                job["match_results"] = match_results
+                job["match_score"] = _score_value(match_results)
+            except Exception as e:
+                logger.error(f"Error analyzing {job['job']}: {e}")
+                job["error"] = str(e)
+                ERRORS.inc(stage="candidate_job")
+
+        return job
+
+    jobs = await asyncio.gather(*[analyze_job(i, jd) for i, jd in enumerate(job_descriptions)])
+
+    # Failed jobs go to the bottom, ties keep submission order
+    ranked = sorted(jobs, key=lambda j: (j["error"] is None, j["match_score"]), reverse=True)
+    for rank, job in enumerate(ranked, start=1):
+        job["rank"] = rank
+
+    return {
+        "resume_data": resume_data,
+        "total": len(ranked),
+        "failed": sum(1 for j in ranked if j["error"]),
+        "jobs": ranked
+    }
         
 if __name__ == "__main__":
     # Test with sample data
     test_jd = "Python developer with Django, React skills. 3+ years experience."
     test_resume_text = "Butchi Venkatesh Adari. I am a Python developer with 2 years Django experience."
     
-    result = process_resume_and_job(
+    result = asyncio.run(process_resume_and_job(
         job_description=test_jd,
         resume_text=test_resume_text
-    )
+    ))
     
     print(result["final_report"])
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+In-process metrics in the Prometheus text exposition format - counters and latency histograms
+"""
+
+import time
+import asyncio
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds - from a cached parse to a slow local model
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels.get(name, "")) for name in self.labelnames))
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (bucket_counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {repr(float(total))}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "rma_stage_duration_seconds", "Time spent in each workflow node", ["stage"]))
+QUEUE_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "rma_queue_wait_seconds", "Time spent waiting for a concurrency slot", ["queue"]))
+EXTRACTION_SECONDS = REGISTRY.register(Histogram(
+    "rma_extraction_duration_seconds", "Document text extraction time", ["format"]))
+LLM_CALL_SECONDS = REGISTRY.register(Histogram(
+    "rma_llm_call_duration_seconds", "LLM call time until the JSON object is complete", ["agent"]))
+JSON_PARSE_SECONDS = REGISTRY.register(Histogram(
+    "rma_json_parse_duration_seconds", "JSON extraction and repair time of LLM responses", ["agent"]))
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "rma_cache_requests_total", "Parse cache lookups", ["cache", "result"]))
+FALLBACK_RESPONSES = REGISTRY.register(Counter(
+    "rma_fallback_responses_total", "Default responses returned because the LLM output was unusable", ["agent"]))
+FIELD_RETRIES = REGISTRY.register(Counter(
+    "rma_llm_field_retries_total", "Follow-up prompts for fields missing from a truncated response", ["agent"]))
+ERRORS = REGISTRY.register(Counter(
+    "rma_errors_total", "Workflow nodes that finished with an error", ["stage"]))
+
+
+def track_stage(stage: str):
+    """
+        Time a workflow node and count the runs that returned an error
+    """
+    def decorator(func):
+        def record(start, result):
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+            if isinstance(result, dict) and result.get("error"):
+                ERRORS.inc(stage=stage)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                result = None
+                try:
+                    result = await func(*args, **kwargs)
+                    return result
+                except Exception:
+                    result = {"error": True}
+                    raise
+                finally:
+                    record(start, result)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except Exception:
+                result = {"error": True}
+                raise
+            finally:
+                record(start, result)
+        return wrapper
+
+    return decorator
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,189 @@
+"""
+Compact prompt serialization - drops empty fields, shortens keys and fits each section into a token budget
+"""
+
+import json
+import math
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from scoring import MISSING_VALUES
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Shorter keys for the verbose parser output, the matcher only needs to recognise them
+KEY_ALIASES = {
+    "years of experience": "yrs",
+    "experience required": "exp_req",
+    "required skills": "req_skills",
+    "preferred skills": "pref_skills",
+    "qualifications": "quals",
+    "certifications": "certs",
+    "publications": "pubs",
+    "responsibilities": "duties",
+    "description": "desc",
+    "experience": "exp",
+    "education": "edu"
+}
+
+# Contact details and logistics say nothing about fit
+DROP_KEYS = {"name", "email", "phone", "linkedin", "github", "portfolio url", "salary", "location", "company"}
+
+# What matching depends on most - never trimmed, the rest of the section gives way first
+PROTECTED_KEYS = {"skills", "req_skills", "pref_skills", "quals", "exp_req"}
+
+# Dropped whole, in this order, before anything else is shortened
+LOW_VALUE_KEYS = ("other", "pubs", "awards", "summary")
+
+STRING_LIMITS = (400, 200, 100, 50) # long strings are cut to these lengths in turn until the section fits
+ELLIPSIS = "..."
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # tiktoken is optional (it comes with langchain-openai), fall back to an estimate
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+        Token count with tiktoken when installed, otherwise ~4 characters per token
+    """
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def compact(value: Any, top_level: bool = True) -> Any:
+    """
+        Remove N/A / empty values and contact fields, shorten keys. Returns None when nothing is left
+    """
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if top_level and key in DROP_KEYS:
+                continue
+            item = compact(item, top_level=False)
+            if item is not None:
+                result[KEY_ALIASES.get(key, key)] = item
+        return result or None
+
+    if isinstance(value, (list, tuple)):
+        items = [item for item in (compact(item, top_level=False) for item in value) if item is not None]
+        return items or None
+
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return None if value.lower() in MISSING_VALUES else value
+
+    return value
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _cap_strings(value: Any, limit: int) -> Any:
+    if isinstance(value, dict):
+        return {key: _cap_strings(item, limit) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_cap_strings(item, limit) for item in value]
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit - len(ELLIPSIS)].rstrip() + ELLIPSIS
+    return value
+
+
+def _drop_last_item(value: Any) -> bool:
+    """
+        Remove the last item of the longest list, later entries are usually the least relevant
+    """
+    longest = None
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        children = node.values() if isinstance(node, dict) else node if isinstance(node, list) else ()
+        if isinstance(node, list) and len(node) > 1 and (longest is None or len(node) > len(longest)):
+            longest = node
+        stack.extend(child for child in children if isinstance(child, (dict, list)))
+
+    if longest is None:
+        return False
+    longest.pop()
+    return True
+
+
+def _cut_longest_string(value: Any, excess: int) -> bool:
+    """
+        Shorten the longest string by excess characters, the text stays valid JSON
+    """
+    longest = None # (container, key)
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node) if isinstance(node, list) else ()
+        for key, item in items:
+            if isinstance(item, str):
+                if len(item) > len(ELLIPSIS) + 1 and (longest is None or len(item) > len(longest[0][longest[1]])):
+                    longest = (node, key)
+            elif isinstance(item, (dict, list)):
+                stack.append(item)
+
+    if longest is None:
+        return False
+    node, key = longest
+    keep = max(1, len(node[key]) - excess - len(ELLIPSIS))
+    node[key] = node[key][:keep].rstrip() + ELLIPSIS
+    return True
+
+
+def serialize_section(data: Dict[str, Any], max_tokens: Optional[int] = None) -> Tuple[str, int]:
+    """
+        Compact JSON for one prompt section and its token count, trimmed to max_tokens.
+
+        Low-value fields are dropped first, then long strings and list tails of the other
+        unprotected fields are cut. Skills and requirements are kept whole, the output is
+        always valid JSON.
+    """
+    data = compact(data) or {}
+    text = _dumps(data)
+    tokens = count_tokens(text)
+    if max_tokens is None or tokens <= max_tokens:
+        return text, tokens
+
+    def measure():
+        text = _dumps(data)
+        return text, count_tokens(text)
+
+    for key in LOW_VALUE_KEYS:
+        if data.pop(key, None) is not None:
+            text, tokens = measure()
+            if tokens <= max_tokens:
+                return text, tokens
+
+    trimmable = {key: item for key, item in data.items() if key not in PROTECTED_KEYS}
+    for limit in STRING_LIMITS:
+        trimmable = _cap_strings(trimmable, limit)
+        data.update(trimmable)
+        text, tokens = measure()
+        if tokens <= max_tokens:
+            return text, tokens
+
+    while tokens > max_tokens and _drop_last_item(trimmable):
+        data.update(trimmable)
+        text, tokens = measure()
+
+    # Still too long (e.g. one huge field), cut inside the longest remaining strings
+    while tokens > max_tokens and _cut_longest_string(trimmable, max(1, len(text) * (tokens - max_tokens) // tokens)):
+        data.update(trimmable)
+        text, tokens = measure()
+
+    if tokens > max_tokens:
+        logger.warning(f"Prompt section needs {tokens} tokens, over the budget of {max_tokens}, skills and requirements are kept whole")
+    return text, tokens
@@ -0,0 +1,263 @@
+"""
+Report sinks - reports are written off the request path by a background writer, in batches,
+with collision-free IDs and size / age based retention
+"""
+
+import os
+import json
+import atexit
+import glob
+import queue
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config import REPORT_CONFIG
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def new_report_id() -> str:
+    """
+        Sortable by time, unique across requests in the same second and across processes
+    """
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:12]}"
+
+
+class ReportSink(ABC):
+    """
+        Where reports go. write_batch receives records with "report_id", "created_at" and "final_report"
+    """
+
+    @abstractmethod
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class _RetentionMixin:
+    """
+        Deletes the oldest files matching pattern beyond max_age_days, max_files or max_total_bytes
+    """
+
+    def _enforce_retention(self, pattern: str, keep: Optional[str] = None) -> None:
+        files = []
+        for path in glob.glob(pattern):
+            if path == keep:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()  # oldest first
+
+        cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days else None
+        total_bytes = sum(size for _, size, _ in files)
+        count = len(files)
+        for mtime, size, path in files:
+            expired = cutoff is not None and mtime < cutoff
+            over_count = self.max_files is not None and count > self.max_files
+            over_size = self.max_total_bytes is not None and total_bytes > self.max_total_bytes
+            if not (expired or over_count or over_size):
+                break
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.error(f"Could not delete old report {path}: {e}")
+                continue
+            count -= 1
+            total_bytes -= size
+
+
+class MarkdownReportSink(_RetentionMixin, ReportSink):
+    """
+        One markdown file per report
+    """
+
+    def __init__(self, directory: str, max_files: Optional[int] = None, max_total_bytes: Optional[int] = None,
+                 max_age_days: Optional[float] = None):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_total_bytes = max_total_bytes
+        self.max_age_days = max_age_days
+
+    def path_for(self, report_id: str) -> str:
+        return os.path.join(self.directory, f"report_{report_id}.md")
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        for record in records:
+            with open(self.path_for(record["report_id"]), "w", encoding="utf-8") as f:
+                f.write(record["final_report"])
+        self._enforce_retention(os.path.join(self.directory, "report_*.md"))
+
+
+class JSONLReportSink(_RetentionMixin, ReportSink):
+    """
+        All reports appended to one JSON lines file, rotated to timestamped segments past segment_bytes
+    """
+
+    def __init__(self, path: str, segment_bytes: int = 50 * 1024 * 1024, max_files: Optional[int] = None,
+                 max_total_bytes: Optional[int] = None, max_age_days: Optional[float] = None):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.max_files = max_files
+        self.max_total_bytes = max_total_bytes
+        self.max_age_days = max_age_days
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record, default=str) + "\n" for record in records))
+
+        if os.path.getsize(self.path) >= self.segment_bytes:
+            os.replace(self.path, f"{self.path}.{new_report_id()}")
+            # Only rotated segments are subject to retention, never the active file
+            self._enforce_retention(f"{self.path}.*", keep=self.path)
+
+
+class BackgroundReportWriter:
+    """
+        Hands reports to a sink from a worker thread, in batches. submit() never blocks,
+        when the queue is full the report is dropped and counted.
+    """
+
+    def __init__(self, sink: ReportSink, max_queue_size: int = 10000, batch_size: int = 50, flush_interval: float = 1.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.error(f"Report queue full, dropped report {record.get('report_id')}")
+            return False
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="report-writer", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self.sink.write_batch(batch)
+                    self.written += len(batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.error(f"Writing {len(batch)} reports failed: {e}")
+            elif self._stopping.is_set():
+                self.sink.close()
+                return
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or (self._stopping.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(timeout, 0.5)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+            Write what is queued, waiting at most timeout seconds
+        """
+        self._stopping.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+
+def build_report_sink(report_config: Dict[str, Any]) -> ReportSink:
+    retention = {
+        "max_files": report_config.get("max_files"),
+        "max_total_bytes": report_config.get("max_total_bytes"),
+        "max_age_days": report_config.get("max_age_days")
+    }
+    if report_config.get("format") == "jsonl":
+        return JSONLReportSink(
+            os.path.join(report_config["directory"], report_config["jsonl_file"]),
+            segment_bytes=report_config["jsonl_segment_bytes"],
+            **retention
+        )
+    return MarkdownReportSink(report_config["directory"], **retention)
+
+
+_report_writer = None
+_report_writer_lock = threading.Lock()
+
+
+def get_report_writer() -> Optional[BackgroundReportWriter]:
+    """
+        Process-wide writer built from REPORT_CONFIG, None when reports are disabled
+    """
+    global _report_writer
+
+    if not REPORT_CONFIG["enabled"]:
+        return None
+    with _report_writer_lock:
+        if _report_writer is None:
+            _report_writer = BackgroundReportWriter(
+                build_report_sink(REPORT_CONFIG),
+                max_queue_size=REPORT_CONFIG["queue_size"],
+                batch_size=REPORT_CONFIG["batch_size"],
+                flush_interval=REPORT_CONFIG["flush_interval_seconds"]
+            )
+            # Queued reports are still written when a CLI run exits
+            atexit.register(_report_writer.shutdown)
+        return _report_writer
+
+
+def save_report(final_report: str, **fields) -> str:
+    """
+        Queue a report for writing and return its ID
+    """
+    report_id = new_report_id()
+    writer = get_report_writer()
+    if writer is not None:
+        writer.submit({
+            "report_id": report_id,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "final_report": final_report,
+            **fields
+        })
+    return report_id
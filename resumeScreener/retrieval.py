@@ -0,0 +1,177 @@
+"""
+Local similarity search over parsed resumes and job descriptions - hashed TF features and cosine
+top-k in NumPy / SciPy, no network model. Used to shortlist candidates before the LLM matcher runs.
+"""
+
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from config import RETRIEVAL_CONFIG, CANDIDATE_STORE_CONFIG
+from scoring import as_list, normalize_skill, without_contacts
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Free text of both resume_data and jd_data
+TEXT_FIELDS = ("title", "summary", "experience", "projects", "education", "qualifications",
+               "certifications", "experience required", "other")
+# Resume skills and JD required / preferred skills share one token space
+SKILL_FIELDS = ("skills", "required skills", "preferred skills")
+
+
+def document_text(data: Dict[str, Any], skill_weight: int = 3) -> str:
+    """
+        Text that is vectorized for a parsed document. Skills become single tokens (e.g.
+        "skill_machine_learning"), repeated skill_weight times so they dominate the free text.
+    """
+    parts = []
+    for field in TEXT_FIELDS:
+        parts.extend(as_list(data.get(field)))
+
+    skills = []
+    for field in SKILL_FIELDS:
+        for skill in as_list(data.get(field)):
+            skill = normalize_skill(skill)
+            if skill:
+                skills.append("skill_" + re.sub(r"\W", "_", skill))
+    return " ".join(parts + skills * skill_weight)
+
+
+def document_id(data: Dict[str, Any]) -> str:
+    """
+        Stable ID of a parsed document, the same parse is indexed only once
+    """
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class RetrievalIndex:
+    """
+        In-memory index of parsed documents. Rows are L2-normalised hashed term frequencies,
+        so a sparse dot product is the cosine similarity. Beyond max_documents the oldest are dropped.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, skill_weight: int = 3, max_documents: Optional[int] = None):
+        self.skill_weight = skill_weight
+        self.max_documents = max_documents
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, ngram_range=(1, 2), stop_words="english", alternate_sign=False, norm="l2"
+        )
+        self._documents: "OrderedDict[str, Tuple[Any, Dict[str, Any]]]" = OrderedDict()  # id -> (row, metadata)
+        self._matrix = None  # stacked rows, rebuilt lazily after changes
+        self._ids: List[str] = []
+        self._lock = threading.Lock()
+
+    def vectorize(self, data: Dict[str, Any]):
+        return self.vectorizer.transform([document_text(data, self.skill_weight)])
+
+    def add(self, data: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None, doc_id: Optional[str] = None) -> Optional[str]:
+        """
+            Index a parsed document and return its ID, None when it has no usable content
+        """
+        row = self.vectorize(data)
+        if row.nnz == 0:
+            return None
+        doc_id = doc_id or document_id(data)
+
+        with self._lock:
+            self._documents.pop(doc_id, None)
+            self._documents[doc_id] = (row, metadata or {})
+            if self.max_documents is not None:
+                while len(self._documents) > self.max_documents:
+                    self._documents.popitem(last=False)
+            self._matrix = None
+        return doc_id
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            if self._documents.pop(doc_id, None) is None:
+                return False
+            self._matrix = None
+            return True
+
+    def search(self, data: Dict[str, Any], top_k: int = 50, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """
+            The top_k indexed documents most similar to a parsed document:
+            [{"id", "score", "metadata"}], best first
+        """
+        query = self.vectorize(data)
+        with self._lock:
+            if not self._documents or query.nnz == 0:
+                return []
+            if self._matrix is None:
+                self._ids = list(self._documents)
+                self._matrix = sparse.vstack([row for row, _ in self._documents.values()], format="csr")
+            matrix, ids = self._matrix, self._ids
+            metadata = {doc_id: self._documents[doc_id][1] for doc_id in ids}
+
+        scores = (matrix @ query.T).toarray().ravel()
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {"id": ids[i], "score": round(float(scores[i]), 4), "metadata": metadata[ids[i]]}
+            for i in top if scores[i] > min_score
+        ]
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+
+_indexes: Dict[str, RetrievalIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(kind: str) -> RetrievalIndex:
+    """
+        Process-wide index of parsed "resume" or "jd" documents
+    """
+    with _indexes_lock:
+        if kind not in _indexes:
+            _indexes[kind] = RetrievalIndex(
+                n_features=RETRIEVAL_CONFIG["n_features"],
+                skill_weight=RETRIEVAL_CONFIG["skill_weight"],
+                max_documents=RETRIEVAL_CONFIG["max_documents"]
+            )
+        return _indexes[kind]
+
+
+def index_document(kind: str, data: Dict[str, Any], name: Optional[str] = None) -> Optional[str]:
+    """
+        Add an agent's parse to the shared index. The parse, minus contact details, is kept so a match
+        needs no re-parsing
+    """
+    if not RETRIEVAL_CONFIG["enabled"] or not data:
+        return None
+    try:
+        name = name or next(iter(as_list(data.get("name")) + as_list(data.get("title"))), None)
+        return get_index(kind).add(data, {"name": name, "data": without_contacts(data)})
+    except Exception as e:
+        logger.error(f"Indexing {kind} failed: {e}")
+        return None
+
+
+def rebuild_resume_index() -> int:
+    """
+        Re-index the newest stored candidates after a restart, returns how many were indexed.
+        Only resumes are persisted (candidates.py), the JD index starts empty.
+    """
+    if not RETRIEVAL_CONFIG["enabled"] or not CANDIDATE_STORE_CONFIG["enabled"]:
+        return 0
+
+    from candidates import get_candidate_store
+
+    indexed = 0
+    for candidate in get_candidate_store().iter_candidates(limit=RETRIEVAL_CONFIG["max_documents"]):
+        if index_document("resume", candidate["resume_data"], candidate["name"]):
+            indexed += 1
+    logger.info(f"Rebuilt the resume index from {indexed} stored candidates")
+    return indexed
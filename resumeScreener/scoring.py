@@ -0,0 +1,294 @@
+"""
+Local scoring engine - computes the set-overlap parts of the matcher rubric without an LLM
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Rubric weights used in the matcher prompt, only the parts that can be computed locally
+RUBRIC_WEIGHTS = {
+    "technical_skills": 0.30,
+    "soft_skills": 0.15,
+    "experience": 0.25,
+    "education": 0.10
+}
+
+# The rest of the matcher rubric needs judgement, the LLM rates these parts from 0 to 100
+LLM_RUBRIC_WEIGHTS = {
+    "domain_relevance": 0.10,
+    "project_relevance": 0.10
+}
+
+PREFERRED_SKILL_WEIGHT = 0.5 # a preferred skill counts half as much as a required one
+
+SOFT_SKILLS = {
+    "communication", "teamwork", "leadership", "problem solving", "collaboration",
+    "time management", "adaptability", "critical thinking", "mentoring", "ownership",
+    "attention to detail", "creativity", "interpersonal skills", "presentation",
+    "stakeholder management", "negotiation", "self motivated", "analytical skills",
+    "organization", "decision making", "conflict resolution", "customer service"
+}
+
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "node.js": "nodejs",
+    "node": "nodejs",
+    "react.js": "react",
+    "reactjs": "react",
+    "vue.js": "vue",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "gcp": "google cloud",
+    "amazon web services": "aws",
+    "golang": "go",
+    "problem-solving": "problem solving",
+    "team work": "teamwork",
+    "communication skills": "communication",
+    "leadership skills": "leadership"
+}
+
+# Degree level keywords, highest level wins
+DEGREE_LEVELS = [
+    (4, ("phd", "ph.d", "doctorate", "doctoral")),
+    (3, ("master", "masters", "m.s", "msc", "m.sc", "mba", "m.tech", "m.eng", "ms")),
+    (2, ("bachelor", "bachelors", "b.s", "bsc", "b.sc", "b.tech", "b.e", "b.eng", "ba", "bs", "undergraduate")),
+    (1, ("associate", "diploma", "high school"))
+]
+
+MISSING_VALUES = {"", "n/a", "na", "none", "null", "not specified", "not mentioned"}
+
+# Resume fields that identify the applicant, never returned by search or lookup endpoints
+CONTACT_FIELDS = ("email", "phone", "linkedin", "github", "portfolio url")
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def without_contacts(resume_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+        Copy of a parsed resume without the contact fields
+    """
+    return {key: value for key, value in resume_data.items() if key not in CONTACT_FIELDS}
+
+
+def normalize_skill(skill: str) -> str:
+    """
+        Lower-case, trim punctuation / whitespace and resolve common aliases
+    """
+    skill = " ".join(str(skill).lower().split()).strip(" .,;:-")
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def as_list(value: Any) -> List[str]:
+    """
+        Parsed fields are lists, comma separated strings or "N/A" depending on the LLM
+    """
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        return [str(v) for v in value.values() if str(v).strip().lower() not in MISSING_VALUES]
+    if isinstance(value, (list, tuple)):
+        items = []
+        for item in value:
+            if isinstance(item, dict):
+                items.append(" ".join(str(v) for v in item.values()))
+            else:
+                items.append(str(item))
+        return [item for item in items if item.strip().lower() not in MISSING_VALUES]
+
+    value = str(value)
+    if value.strip().lower() in MISSING_VALUES:
+        return []
+    return [part.strip() for part in re.split(r"[,;\n]", value) if part.strip()]
+
+
+def parse_years(value: Any) -> Optional[float]:
+    """
+        First number in strings like "3+ years" or "2-4 yrs", None when absent
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value or ""))
+    return float(match.group()) if match else None
+
+
+def parse_percent(value: Any) -> Optional[float]:
+    """
+        A 0-100 rating as a 0-1 fraction, None when absent
+    """
+    number = parse_years(value)
+    return None if number is None else min(max(number / 100, 0.0), 1.0)
+
+
+def resume_years(resume_data: Dict[str, Any]) -> float:
+    """
+        Total years across the resume's experience entries
+    """
+    experience = resume_data.get("experience")
+    if not isinstance(experience, list):
+        return parse_years(experience) or 0.0
+
+    total = 0.0
+    for entry in experience:
+        if isinstance(entry, dict):
+            total += parse_years(entry.get("years of experience")) or 0.0
+    return total
+
+
+def _contains(text: str, term: str) -> bool:
+    """
+        Whole-word search, so "java" does not match "javascript" and "c" does not match "c++"
+    """
+    return re.search(rf"(?<![\w+#]){re.escape(term)}(?![\w+#])", text) is not None
+
+
+def degree_level(texts: List[str]) -> int:
+    """
+        Highest degree level mentioned, 0 when none is recognised
+    """
+    level = 0
+    for text in texts:
+        text = text.lower().replace("'", "")
+        for degree, keywords in DEGREE_LEVELS:
+            if degree > level and any(_contains(text, keyword) for keyword in keywords):
+                level = degree
+    return level
+
+
+def _resume_text(resume_data: Dict[str, Any]) -> str:
+    parts = []
+    for key in ("skills", "experience", "projects", "certifications", "summary", "other"):
+        parts.extend(as_list(resume_data.get(key)))
+    return " ".join(parts).lower()
+
+
+def _has_skill(term: str, skills: set, text: str) -> bool:
+    if term in skills:
+        return True
+    return _contains(text, term)
+
+
+class LocalScorer:
+    """
+        Deterministic scorer for the technical, soft skill, experience and education parts of the rubric.
+
+        score_many scores a whole candidate pool against one JD with NumPy, so ranking
+        does not need an LLM call per resume. With the LLM's ratings of the qualitative parts
+        (LLM_RUBRIC_WEIGHTS) the score covers the whole rubric.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, max_missing_skills: int = 10):
+        self.weights = weights or RUBRIC_WEIGHTS
+        self.max_missing_skills = max_missing_skills
+
+    def _jd_terms(self, jd_data: Dict[str, Any]):
+        """
+            JD skills as (normalized term, display name, weight, is_soft), required before preferred
+        """
+        terms = {}
+        for field, weight in (("required skills", 1.0), ("preferred skills", PREFERRED_SKILL_WEIGHT)):
+            for skill in as_list(jd_data.get(field)):
+                term = normalize_skill(skill)
+                if term and term not in terms:
+                    terms[term] = (skill, weight, term in SOFT_SKILLS)
+
+        # Soft skills are rarely listed as skills, so pick them up from the JD prose too
+        jd_text = " ".join(as_list(jd_data.get("summary")) + as_list(jd_data.get("other"))).lower()
+        for term in sorted(SOFT_SKILLS):
+            if term not in terms and _contains(jd_text, term):
+                terms[term] = (term, PREFERRED_SKILL_WEIGHT, True)
+
+        return [(term, name, weight, soft) for term, (name, weight, soft) in terms.items()]
+
+    def score_many(self, resumes: List[Dict[str, Any]], jd_data: Dict[str, Any],
+                   assessments: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+            Score every parsed resume against one parsed JD. assessments are the LLM's
+            ratings per resume, e.g. {"domain_relevance": 80, "project_relevance": 60}
+        """
+        if not resumes:
+            return []
+
+        terms = self._jd_terms(jd_data)
+        weights = np.array([weight for _, _, weight, _ in terms], dtype=float)
+        soft_mask = np.array([soft for _, _, _, soft in terms], dtype=bool)
+        required_mask = weights == 1.0
+
+        # presence[i, j] - resume i has JD skill j
+        presence = np.zeros((len(resumes), len(terms)), dtype=bool)
+        for i, resume_data in enumerate(resumes):
+            skills = {normalize_skill(skill) for skill in as_list(resume_data.get("skills"))}
+            text = _resume_text(resume_data)
+            for j, (term, _, _, _) in enumerate(terms):
+                presence[i, j] = _has_skill(term, skills, text)
+
+        components = {
+            "technical_skills": self._coverage(presence, weights, ~soft_mask),
+            "soft_skills": self._coverage(presence, weights, soft_mask),
+            "experience": self._experience(resumes, jd_data),
+            "education": self._education(resumes, jd_data)
+        }
+        if assessments is not None:
+            for name in LLM_RUBRIC_WEIGHTS:
+                ratings = [parse_percent(assessment.get(name)) for assessment in assessments]
+                components[name] = np.array([np.nan if r is None else r for r in ratings], dtype=float)
+        rubric_weights = {**LLM_RUBRIC_WEIGHTS, **self.weights}
+
+        # Parts the JD says nothing about are left out and the rest re-weighted
+        names = list(components)
+        values = np.array([components[name] for name in names], dtype=float)  # (components, resumes)
+        rubric = np.array([rubric_weights[name] for name in names], dtype=float)[:, None]
+        available = ~np.isnan(values)
+        total_weight = (rubric * available).sum(axis=0)
+        scores = np.where(
+            total_weight > 0,
+            (np.nan_to_num(values) * rubric).sum(axis=0) / np.where(total_weight > 0, total_weight, 1),
+            0.0
+        )
+
+        results = []
+        for i in range(len(resumes)):
+            matching = [name for j, (_, name, _, _) in enumerate(terms) if presence[i, j]]
+            missing = [name for j, (_, name, _, _) in enumerate(terms) if required_mask[j] and not presence[i, j]]
+            results.append({
+                "match_score": int(round(scores[i] * 100)),
+                "matching_skills": matching,
+                "missing_skills": missing[:self.max_missing_skills],
+                "score_breakdown": {
+                    name: (None if np.isnan(components[name][i]) else round(float(components[name][i]) * 100, 1))
+                    for name in names
+                }
+            })
+        return results
+
+    def score(self, resume_data: Dict[str, Any], jd_data: Dict[str, Any],
+              assessment: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+            Score one parsed resume against one parsed JD
+        """
+        return self.score_many([resume_data], jd_data, None if assessment is None else [assessment])[0]
+
+    def _coverage(self, presence: np.ndarray, weights: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        total = weights[mask].sum()
+        if total == 0:
+            return np.full(presence.shape[0], np.nan)
+        return presence[:, mask].astype(float) @ weights[mask] / total
+
+    def _experience(self, resumes: List[Dict[str, Any]], jd_data: Dict[str, Any]) -> np.ndarray:
+        required = parse_years(jd_data.get("experience required"))
+        if not required:
+            return np.full(len(resumes), np.nan)
+        years = np.array([resume_years(resume_data) for resume_data in resumes], dtype=float)
+        return np.minimum(years / required, 1.0)
+
+    def _education(self, resumes: List[Dict[str, Any]], jd_data: Dict[str, Any]) -> np.ndarray:
+        required = degree_level(as_list(jd_data.get("qualifications")))
+        if not required:
+            return np.full(len(resumes), np.nan)
+        levels = np.array([degree_level(as_list(resume_data.get("education"))) for resume_data in resumes], dtype=float)
+        return np.minimum(levels / required, 1.0)
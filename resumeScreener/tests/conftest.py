@@ -0,0 +1,16 @@
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import candidates
+from config import CANDIDATE_STORE_CONFIG
+
+@pytest.fixture(autouse=True)
+def candidate_store(monkeypatch, tmp_path):
+    # Analyses run in the tests are stored in a throwaway database, not in cache/candidates.db
+    monkeypatch.setitem(CANDIDATE_STORE_CONFIG, "path", str(tmp_path / "candidates.db"))
+    monkeypatch.setattr(candidates, "_store", None)
+    yield
+    if candidates._store is not None:
+        candidates._store.close()
@@ -0,0 +1,119 @@
+import sys
+import os
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+import main
+import tracing
+from config import CANDIDATE_STORE_CONFIG, EXTRACTION_CONFIG, REPORT_CONFIG
+from evaluation import get_evaluation_queue
+from benchmarks.corpus import make_pdf
+from benchmarks.fake_llm import FakeLLM, NullTracer
+from test_candidate import fake_agents
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "_agents", fake_agents(FakeLLM()))
+    monkeypatch.setattr(tracing, "_tracer", NullTracer())
+    monkeypatch.setattr(get_evaluation_queue(), "sample_rate", 0.0)
+    monkeypatch.setitem(EXTRACTION_CONFIG, "use_process_pool", False)
+    monkeypatch.setitem(REPORT_CONFIG, "enabled", False)
+    monkeypatch.setitem(CANDIDATE_STORE_CONFIG, "enabled", False)
+    # No lifespan - warm-up and the job queue are not needed
+    return TestClient(api.app)
+
+def test_binary_pdf_upload_is_not_echoed(client):
+    pdf = make_pdf("Jane Doe\nPython developer\nSkills: Python, Django")
+    with pytest.raises(UnicodeDecodeError):
+        pdf.decode("utf-8")
+
+    response = client.post(
+        "/analyze",
+        data={"job_description": "Backend developer, Python and Django", "resume_text": " "},
+        files={"resume_file": ("resume.pdf", pdf, "application/pdf")}
+    )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["resume_data"]["name"] == "Jane Doe"
+    assert "resume_bytes" not in data and "resume_upload" not in data
+    assert main._uploads == {}
+
+def read_events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+def test_stream_sends_stages_in_order(client):
+    response = client.post(
+        "/analyze/stream",
+        data={"job_description": "Backend developer, Python and Django", "resume_text": "Jane Doe, Python developer"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    names = [event for event, _ in read_events(response)]
+    stages = [event for event in names if event != "token"]
+    assert set(stages[:2]) == {"parse_resume", "parse_jd"}
+    assert stages[2:] == ["score", "match_analysis", "compile_report", "done"]
+    assert "token" in names
+    assert max(i for i, event in enumerate(names) if event == "token") < names.index("match_analysis")
+    assert read_events(response)[-1][1]["error"] is None
+
+def test_stream_reports_a_failed_stage(client):
+    response = client.post(
+        "/analyze/stream",
+        data={"job_description": "Backend developer, Python and Django", "resume_text": " "},
+        files={"resume_file": ("resume.pdf", b"%PDF-1.4\nnot really a pdf", "application/pdf")}
+    )
+
+    assert response.status_code == 200
+    events = read_events(response)
+    errors = [data for event, data in events if event == "error"]
+    assert errors[0]["stage"] == "parse_resume"
+    assert errors[0]["error"].startswith("Could not read PDF")
+    assert events[-1][0] == "done" and events[-1][1]["error"]
+
+def test_stream_ends_with_done_when_the_workflow_fails(client, monkeypatch):
+    from types import SimpleNamespace
+    from checkpoints import BoundedMemorySaver
+
+    async def astream(*args, **kwargs):
+        raise RuntimeError("graph exploded")
+        yield
+
+    monkeypatch.setattr(main, "get_workflow_app", lambda: SimpleNamespace(astream=astream))
+    monkeypatch.setattr(main, "_checkpointer", BoundedMemorySaver())
+    response = client.post(
+        "/analyze/stream",
+        data={"job_description": "Backend developer", "resume_text": "Jane Doe, Python developer"}
+    )
+
+    assert response.status_code == 200
+    assert read_events(response) == [
+        ("error", {"stage": None, "error": "graph exploded"}),
+        ("done", {"error": "graph exploded", "final_report": ""})
+    ]
+
+def test_candidate_endpoints_never_return_contact_fields(client):
+    from scoring import CONTACT_FIELDS
+    from candidates import get_candidate_store
+
+    get_candidate_store().add({
+        "name": "Jane Doe", "email": "jane@example.com", "phone": "555-0100", "linkedin": "linkedin.com/in/jane",
+        "github": "github.com/jane", "portfolio url": "jane.dev", "skills": ["Python"]
+    })
+
+    found = client.get("/candidates/search").json()["data"]["candidates"]
+    fetched = client.get(f"/candidates/{found[0]['id']}").json()["data"]
+
+    for candidate in (found[0], fetched):
+        assert candidate["name"] == "Jane Doe" and candidate["resume_data"]["skills"] == ["Python"]
+        assert not set(CONTACT_FIELDS) & (set(candidate) | set(candidate["resume_data"]))
+        assert "jane@example.com" not in json.dumps(candidate)
@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fake_llm import FakeLLM
+from benchmarks.corpus import load_corpus
+from benchmarks.run_benchmarks import summarize, compare
+from extraction import extract_text
+from jsonstream import extract_json
+
+def test_fake_llm_is_deterministic_and_scalable():
+    prompt = "You are a resume extraction engine. ..."
+
+    assert FakeLLM().invoke(prompt) == FakeLLM().invoke(prompt)
+    small = extract_json(FakeLLM(response_scale=1).invoke(prompt))
+    large = extract_json(FakeLLM(response_scale=5).invoke(prompt))
+    assert len(large["skills"]) > len(small["skills"])
+
+def test_corpus_renders_every_format():
+    documents = load_corpus()
+    formats = {document["format"] for document in documents}
+
+    assert {"txt", "pdf", "docx"} <= formats
+    for document in documents:
+        if document["name"].startswith("sample_resume"):
+            assert "Alex Morgan" in extract_text(document["bytes"])
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"a": summarize([0.010] * 5), "b": summarize([0.010] * 5)}
+    current = {"a": summarize([0.020] * 5), "b": summarize([0.0101] * 5)}
+
+    assert compare(current, baseline, threshold=0.25, min_delta_ms=0.5) == ["a: 10.000 ms -> 20.000 ms"]
@@ -0,0 +1,101 @@
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cache import LRUCache, SQLiteCache, TieredCache, content_hash
+
+def test_content_hash_ignores_whitespace():
+    assert content_hash("Python  developer\n\n3+ years") == content_hash(" Python developer 3+ years ")
+    assert content_hash("Python developer") != content_hash("Java developer")
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert cache.stats()["evictions"] == 1
+
+def test_lru_cache_ttl_expiry():
+    cache = LRUCache(max_entries=10, ttl_seconds=0.01)
+    cache.set("a", {"v": 1})
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.db"), max_entries=1)
+    TieredCache(LRUCache(), disk).set("a", {"v": 1})
+
+    # A fresh memory tier (e.g. after a restart) is refilled from disk
+    cache = TieredCache(LRUCache(), disk)
+    assert cache.get("a") == {"v": 1}
+    assert cache.memory.get("a") == {"v": 1}
+
+    cache.set("b", {"v": 2})
+    assert disk.get("a") is None
+    assert disk.stats()["size"] == 1
+
+def test_sqlite_cache_creates_its_directory(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache" / "jd_cache.db"))
+    disk.set("a", {"v": 1})
+    assert disk.get("a") == {"v": 1}
+
+class CountingLLM:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return self.response
+
+def test_resume_parser_caches_on_resume_bytes(tmp_path):
+    from Agents.resumeParserAgent import ResumeParserAgent
+
+    llm = CountingLLM('{"name": "Jane", "skills": ["Python"]}')
+    agent = ResumeParserAgent(llm, cache=TieredCache(LRUCache(max_entries=8)))
+
+    resume_file = tmp_path / "resume.txt"
+    resume_file.write_text("Jane - Python developer", encoding="utf-8")
+
+    assert agent.run(str(resume_file))["skills"] == ["Python"]
+    # The same bytes passed in memory share the cache entry
+    assert agent.run(b"Jane - Python developer")["name"] == "Jane"
+    assert llm.calls == 1
+    assert agent.cache_stats()["memory"]["hits"] == 1
+
+def test_resume_parser_does_not_cache_failed_parses():
+    from Agents.resumeParserAgent import ResumeParserAgent
+
+    llm = CountingLLM("not json")
+    agent = ResumeParserAgent(llm, cache=TieredCache(LRUCache(max_entries=8)))
+
+    agent.run(b"Jane - Python developer")
+    agent.run(b"Jane - Python developer")
+    # one follow-up prompt per failed parse, then nothing is cached
+    assert llm.calls == 4
+
+class FailingLLM:
+    def invoke(self, prompt):
+        raise ConnectionError("LLM backend unreachable")
+
+    async def ainvoke(self, prompt):
+        raise ConnectionError("LLM backend unreachable")
+
+def test_jd_parser_falls_back_when_the_llm_fails():
+    import asyncio
+    from Agents.jdParserAgent import JDParserAgent
+    from metrics import FALLBACK_RESPONSES
+
+    agent = JDParserAgent(FailingLLM(), cache=TieredCache(LRUCache(max_entries=8)))
+    fallbacks = FALLBACK_RESPONSES.value(agent="jd_parser")
+
+    assert agent.run("Backend developer, Python") == agent.__get_default_response__()
+    assert asyncio.run(agent.arun("Backend developer, Python")) == agent.__get_default_response__()
+    assert FALLBACK_RESPONSES.value(agent="jd_parser") == fallbacks + 2
+    assert agent.cache_stats()["memory"]["size"] == 0
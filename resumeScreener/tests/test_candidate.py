@@ -0,0 +1,85 @@
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import main
+from cache import LRUCache
+from benchmarks.fake_llm import FakeLLM
+from Agents.resumeParserAgent import ResumeParserAgent
+from Agents.jdParserAgent import JDParserAgent
+from Agents.matcherAgent import MatcherAgent
+from Agents.fastMatchAgent import FastMatchAgent
+
+def fake_agents(llm):
+    matcher_agent = MatcherAgent(llm)
+    # FakeLLM parses of different JDs can share their match fields, count every match call
+    matcher_agent.cache = None
+    resume_agent = ResumeParserAgent(llm, cache=LRUCache())
+    jd_agent = JDParserAgent(llm, cache=LRUCache())
+    return SimpleNamespace(
+        llm=llm,
+        resume_agent=resume_agent,
+        jd_agent=jd_agent,
+        matcher_agent=matcher_agent,
+        fast_match_agent=FastMatchAgent(llm, resume_agent, jd_agent, matcher_agent)
+    )
+
+def test_resume_is_parsed_once_for_all_jobs(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(main, "_agents", fake_agents(llm))
+    jobs = [{"name": f"job {i}", "text": f"Backend developer {i}, Python and Django"} for i in range(3)]
+    jobs.append({"name": "empty", "text": " "})
+
+    result = asyncio.run(main.process_candidate({"text": "Jane Doe, Python developer"}, jobs))
+
+    # 1 resume parse + (JD parse + match) per valid job
+    assert llm.calls == 1 + 2 * 3
+    assert result["total"] == 4
+    assert result["failed"] == 1
+    assert result["jobs"][-1]["job"] == "empty"
+    scores = [job["match_score"] for job in result["jobs"][:3]]
+    assert scores == sorted(scores, reverse=True)
+    assert [job["rank"] for job in result["jobs"]] == [1, 2, 3, 4]
+
+def test_score_only_skips_the_matcher_llm(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(main, "_agents", fake_agents(llm))
+    jobs = [{"text": "Backend developer, Python"}, {"text": "Frontend developer, React"}]
+
+    result = asyncio.run(main.process_candidate({"bytes": b"Jane Doe, Python developer"}, jobs, score_only=True))
+
+    assert llm.calls == 1 + 2
+    assert all(job["match_results"]["Suggestions"] == [] for job in result["jobs"])
+    assert result["jobs"][0]["job"] in ("job_description_1", "job_description_2")
+
+def test_batch_score_only_skips_the_matcher_llm(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(main, "_agents", fake_agents(llm))
+    resumes = [{"name": f"resume {i}", "text": f"Candidate {i}, Python developer"} for i in range(3)]
+
+    result = asyncio.run(main.process_batch("Backend developer, Python and Django", resumes, score_only=True))
+
+    # 1 JD parse + 3 resume parses, no matcher calls
+    assert llm.calls == 1 + 3
+    assert all(c["error"] is None and c["match_results"]["Suggestions"] == [] for c in result["candidates"])
+
+def test_batch_isolates_failing_resumes(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(main, "_agents", fake_agents(llm))
+    resumes = [
+        {"name": "good", "text": "Jane Doe, Python developer"},
+        {"name": "corrupt.pdf", "bytes": b"%PDF-1.4\nnot really a pdf"},
+        {"name": "empty", "text": " "}
+    ]
+
+    result = asyncio.run(main.process_batch("Backend developer, Python and Django", resumes))
+
+    # 1 JD parse + (resume parse + match) for the good resume only
+    assert llm.calls == 1 + 2
+    assert result["total"] == 3 and result["failed"] == 2
+    assert result["candidates"][0]["candidate"] == "good"
+    by_name = {c["candidate"]: c for c in result["candidates"]}
+    assert by_name["good"]["error"] is None and by_name["good"]["match_results"]
+    assert by_name["corrupt.pdf"]["error"] and by_name["empty"]["error"]
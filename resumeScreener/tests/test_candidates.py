@@ -0,0 +1,72 @@
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from candidates import CandidateStore, parse_query
+
+JANE = {
+    "name": "Jane Doe", "email": "jane@example.com",
+    "education": ["M.S. in Computer Science, Stanford"],
+    "experience": [{"title": "Backend Engineer", "years of experience": "4 years"}],
+    "skills": ["Python", "Django REST Framework", "Postgres"],
+    "certifications": ["AWS Certified Solutions Architect"]
+}
+JOHN = {
+    "name": "John Roe", "email": "john@example.com",
+    "education": ["B.S. in Computer Science"],
+    "experience": [{"title": "Developer", "years of experience": "2"}],
+    "skills": ["Python", "Flask", "JS"],
+    "certifications": "N/A"
+}
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(str(tmp_path / "candidates.db"))
+    store.add(JANE)
+    store.add(JOHN)
+    yield store
+    store.close()
+
+def names(result):
+    return [candidate["name"] for candidate in result["candidates"]]
+
+def test_parse_query():
+    parsed = parse_query("Python AND skill:Django && 3+ years, MSc")
+    assert parsed == {"terms": [(None, "python"), ("skill", "django")], "min_years": 3.0, "min_degree": 3}
+    assert parse_query("R&D and AT&T")["terms"] == [(None, "r&d"), (None, "at&t")]
+    with pytest.raises(ValueError):
+        parse_query("python AND cert:")
+
+def test_boolean_search(store):
+    assert names(store.search("Python")) == ["Jane Doe", "John Roe"]
+    assert names(store.search("Python AND Django AND 3+ years")) == ["Jane Doe"]
+    assert names(store.search("python and 3 years")) == ["Jane Doe"]
+    assert names(store.search("python and 5 years")) == []
+    # aliases are resolved on both sides, words of an entry are indexed too
+    assert names(store.search("postgresql, javascript")) == []
+    assert names(store.search("javascript")) == ["John Roe"]
+    assert names(store.search("cert:aws")) == ["Jane Doe"]
+    assert names(store.search("skill:aws")) == []
+    assert names(store.search("bachelor")) == ["Jane Doe", "John Roe"]
+    assert names(store.search("master AND edu:stanford")) == ["Jane Doe"]
+
+def test_stored_candidates_are_returned_without_contacts(store):
+    jane = store.search("cert:aws")["candidates"][0]
+
+    assert "email" not in jane and "email" not in jane["resume_data"]
+    assert store.get(jane["id"])["resume_data"]["skills"] == JANE["skills"]
+    assert "email" not in store.get(jane["id"])["resume_data"]
+
+def test_resubmitted_resume_replaces_candidate(store, tmp_path):
+    store.add(dict(JOHN, skills=["Go"]))
+    assert names(store.search("flask")) == []
+    assert names(store.search("go")) == ["John Roe"]
+    assert store.stats()["candidates"] == 2
+
+    # persisted across restarts
+    reopened = CandidateStore(str(tmp_path / "candidates.db"), max_candidates=1)
+    assert reopened.search("")["total"] == 2
+    reopened.add({"name": "Ana", "skills": ["Rust"]})
+    assert names(reopened.search("")) == ["Ana"]
+    reopened.close()
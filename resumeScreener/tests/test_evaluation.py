@@ -0,0 +1,87 @@
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from evaluation import EvaluationQueue
+
+class Recorder:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    def __call__(self, stage, examples):
+        time.sleep(self.delay)
+        self.batches.append((stage, examples))
+
+def test_sample_rate_zero_evaluates_nothing():
+    recorder = Recorder()
+    evaluations = EvaluationQueue(sample_rate=0.0, send_batch=recorder)
+
+    assert not evaluations.submit("match_analysis", "in", {"match_score": 80})
+    assert evaluations.stats()["sampled_out"] == 1
+    assert evaluations._worker is None
+
+def test_examples_are_batched_per_stage():
+    recorder = Recorder()
+    evaluations = EvaluationQueue(sample_rate=1.0, batch_size=10, flush_interval=0.05, send_batch=recorder)
+
+    for i in range(3):
+        evaluations.submit("job_description_parsing", f"jd {i}", {"title": "Dev"})
+    evaluations.submit("match_analysis", {"skills": ["Python"]}, {"match_score": 80})
+    evaluations.shutdown()
+
+    stages = {stage: examples for stage, examples in recorder.batches}
+    assert len(stages["job_description_parsing"]) == 3
+    assert stages["match_analysis"] == [{"input": '{"skills": ["Python"]}', "actual_output": '{"match_score": 80}'}]
+    assert evaluations.stats()["sent"] == 4
+
+def test_full_queue_drops_without_blocking():
+    recorder = Recorder(delay=0.2)
+    evaluations = EvaluationQueue(sample_rate=1.0, max_queue_size=2, batch_size=1, flush_interval=0.01, send_batch=recorder)
+
+    started = time.monotonic()
+    accepted = [evaluations.submit("match_analysis", "in", "out") for _ in range(20)]
+    assert time.monotonic() - started < 0.1
+    assert accepted.count(False) == evaluations.stats()["dropped"] > 0
+    evaluations.shutdown(timeout=0)
+
+def test_examples_keep_the_trace_they_were_submitted_from():
+    from types import SimpleNamespace
+    from judgeval.common.tracer import current_trace_var, current_span_var
+
+    recorder = Recorder()
+    evaluations = EvaluationQueue(sample_rate=1.0, flush_interval=0.05, send_batch=recorder)
+
+    trace_token = current_trace_var.set(SimpleNamespace(trace_id="trace-1"))
+    span_token = current_span_var.set("span-1")
+    try:
+        evaluations.submit("match_analysis", "in", "out")
+    finally:
+        current_span_var.reset(span_token)
+        current_trace_var.reset(trace_token)
+    evaluations.submit("match_analysis", "untraced", "out")
+    evaluations.shutdown()
+
+    traced, untraced = recorder.batches[0][1]
+    assert traced["trace_id"] == "trace-1" and traced["additional_metadata"] == {"span_id": "span-1"}
+    assert "trace_id" not in untraced
+
+def test_counters_are_exact_under_threads():
+    import threading
+
+    evaluations = EvaluationQueue(sample_rate=0.5, max_queue_size=100, flush_interval=0.01, send_batch=Recorder())
+
+    def worker():
+        for _ in range(500):
+            evaluations.submit("match_analysis", "in", "out")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    evaluations.shutdown(timeout=0)
+
+    stats = evaluations.stats()
+    assert stats["submitted"] + stats["dropped"] + stats["sampled_out"] == 8 * 500
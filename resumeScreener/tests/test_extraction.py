@@ -0,0 +1,145 @@
+import sys
+import os
+import io
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import PyPDF2
+from docx import Document
+
+from extraction import extract_pdf_text, extract_docx_text, extract_txt_text
+
+def make_pdf(pages):
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 712 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {content_id} 0 R /Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+def test_pdf_extraction_stops_at_budget(monkeypatch):
+    pdf_bytes = make_pdf([f"Page {i} " + "x" * 100 for i in range(40)])
+
+    decoded = []
+    original = PyPDF2.PageObject.extract_text
+    def counting_extract_text(page, *args, **kwargs):
+        decoded.append(page)
+        return original(page, *args, **kwargs)
+    monkeypatch.setattr(PyPDF2.PageObject, "extract_text", counting_extract_text)
+
+    text = extract_pdf_text(io.BytesIO(pdf_bytes), max_chars=250)
+
+    assert len(text) == 250
+    assert text.startswith("Page 0")
+    assert len(decoded) == 3
+
+def test_pdf_extraction_without_budget_reads_all_pages():
+    text = extract_pdf_text(io.BytesIO(make_pdf(["first page", "second page"])))
+
+    assert "first page" in text and "second page" in text
+
+def test_docx_and_txt_extraction_are_capped(tmp_path):
+    doc = Document()
+    for i in range(50):
+        doc.add_paragraph(f"Paragraph {i}")
+    docx_path = str(tmp_path / "resume.docx")
+    doc.save(docx_path)
+
+    assert extract_docx_text(docx_path, max_chars=30) == "Paragraph 0\nParagraph 1\nParagr"
+    assert extract_txt_text(io.BytesIO("héllo world".encode("utf-8")), max_chars=5) == "héllo"
+
+def test_detect_format_uses_content_not_name(tmp_path):
+    from extraction import detect_format
+
+    doc = Document()
+    doc.add_paragraph("Jane Doe")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+
+    assert detect_format(make_pdf(["Jane Doe"])) == "pdf"
+    assert detect_format(buffer.getvalue()) == "docx"
+    assert detect_format("Jane Doe, Python developer".encode("utf-8")) == "txt"
+
+def test_resume_parser_reads_bytes_streams_and_paths(tmp_path):
+    from Agents.resumeParserAgent import ResumeParserAgent
+
+    agent = ResumeParserAgent(llm=None)
+    pdf_bytes = make_pdf(["Jane Doe Python"])
+    pdf_path = tmp_path / "resume.pdf"
+    pdf_path.write_bytes(pdf_bytes)
+
+    assert "Jane Doe Python" in agent.parse_resume(pdf_bytes)
+    assert "Jane Doe Python" in agent.parse_resume(io.BytesIO(pdf_bytes))
+    assert "Jane Doe Python" in agent.parse_resume(str(pdf_path))
+    assert agent.parse_resume("Jane Doe, pasted text") == "Jane Doe, pasted text"
+    with pytest.raises(FileNotFoundError):
+        agent.parse_resume(str(tmp_path / "missing.pdf"))
+
+def test_async_extraction_runs_in_worker_process():
+    import asyncio
+    from extraction import extract_text_async, shutdown_extraction_pool
+
+    pdf_bytes = make_pdf(["Jane Doe Python"])
+    try:
+        text = asyncio.run(extract_text_async(pdf_bytes))
+    finally:
+        shutdown_extraction_pool()
+
+    assert "Jane Doe Python" in text
+
+def sleepy_extract(data, max_chars=None):
+    # Stand-in for a pathological document: sleeps for the seconds given as data
+    import time
+    time.sleep(float(data))
+    return data.decode()
+
+def test_timeout_only_kills_its_own_worker():
+    from concurrent.futures import ThreadPoolExecutor
+    from extraction import ExtractionPool
+
+    pool = ExtractionPool(max_workers=2, target=sleepy_extract)
+    try:
+        pool.extract(b"0") # start a worker
+        with ThreadPoolExecutor(2) as threads:
+            hung = threads.submit(pool.extract, b"30", None, 1.0)
+            healthy = threads.submit(pool.extract, b"1.5", None, 10)
+            with pytest.raises(TimeoutError):
+                hung.result()
+            assert healthy.result() == "1.5"
+        assert pool.extract(b"0", None, 10) == "0"
+    finally:
+        pool.shutdown()
+
+def test_queued_extractions_leave_the_default_executor_free():
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from extraction import ExtractionPool
+
+    pool = ExtractionPool(max_workers=1, target=sleepy_extract)
+
+    async def run():
+        # A single default executor thread: a document waiting for the busy worker must not hold it
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(1))
+        queued = [asyncio.create_task(pool.aextract(b"0.5", None, 10)) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        other = await asyncio.wait_for(asyncio.to_thread(lambda: "done"), timeout=0.3)
+        return other, await asyncio.gather(*queued)
+
+    try:
+        assert asyncio.run(run()) == ("done", ["0.5"] * 3)
+    finally:
+        pool.shutdown()
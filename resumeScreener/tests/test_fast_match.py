@@ -0,0 +1,52 @@
+import sys
+import os
+import json
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+RESPONSE = json.dumps({
+    "resume": {"name": "Jane", "skills": ["Python", "Django"], "education": ["B.S. Computer Science"], "unknown": "x"},
+    "job_description": {"title": "Backend Developer", "required skills": ["Python", "React"]},
+    "match": {"match_score": 90, "matching_skills": ["Python"], "missing_skills": ["React"], "Suggestions": ["Add React"]}
+})
+
+class CountingLLM:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return "```json\n" + self.response + "\n```"
+
+def build_agent(llm):
+    from Agents.resumeParserAgent import ResumeParserAgent
+    from Agents.jdParserAgent import JDParserAgent
+    from Agents.matcherAgent import MatcherAgent
+    from Agents.fastMatchAgent import FastMatchAgent
+    from cache import LRUCache
+
+    # cache=None means "build the configured cache", every agent gets a fresh one instead
+    return FastMatchAgent(
+        llm, ResumeParserAgent(llm, cache=LRUCache()), JDParserAgent(llm, cache=LRUCache()), MatcherAgent(llm, cache=LRUCache())
+    )
+
+def test_fast_match_single_call_has_pipeline_shape():
+    llm = CountingLLM(RESPONSE)
+    result = asyncio.run(build_agent(llm).arun(b"Jane - Python, Django developer", "Backend Developer: Python, React"))
+
+    assert llm.calls == 1
+    assert result["resume_data"]["name"] == "Jane"
+    assert result["resume_data"]["email"] == "N/A"
+    assert "unknown" not in result["resume_data"]
+    assert result["jd_data"]["preferred skills"] == "N/A"
+    assert result["match_results"]["Suggestions"] == ["Add React"]
+    assert result["match_results"]["missing_skills"] == ["React"]
+
+def test_fast_match_rejects_invalid_response():
+    llm = CountingLLM("no json here")
+    try:
+        asyncio.run(build_agent(llm).arun(b"Jane", "Backend Developer"))
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "Fast match" in str(e)
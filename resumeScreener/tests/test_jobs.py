@@ -0,0 +1,82 @@
+import sys
+import os
+import asyncio
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from jobs import JobQueue, JobQueueFull
+
+async def wait_for(queue, job_id, status):
+    for _ in range(200):
+        if queue.get(job_id)["status"] == status:
+            return queue.get(job_id)
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job never became {status}: {queue.get(job_id)}")
+
+def test_jobs_run_in_the_background():
+    async def handler(params):
+        await asyncio.sleep(0.01)
+        if params["fail"]:
+            return {"error": "LLM unavailable"}
+        return {"final_report": f"report for {params['name']}"}
+
+    async def scenario():
+        queue = JobQueue(handler, workers=2, max_queue_size=10)
+        await queue.start()
+        ok = queue.submit({"name": "alice", "fail": False})
+        failed = queue.submit({"name": "bob", "fail": True})
+        assert queue.get(ok)["status"] in ("queued", "running")
+
+        done = await wait_for(queue, ok, "completed")
+        assert done["result"] == {"final_report": "report for alice"}
+        assert done["started_at"] and done["finished_at"]
+        assert (await wait_for(queue, failed, "failed"))["error"] == "LLM unavailable"
+        await queue.shutdown()
+
+    asyncio.run(scenario())
+
+def test_full_backlog_is_rejected_with_retry_hint():
+    release = None
+
+    async def handler(params):
+        await release.wait()
+        return {}
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        queue = JobQueue(handler, workers=1, max_queue_size=2, default_retry_after=30)
+        await queue.start()
+
+        first = queue.submit({})
+        await wait_for(queue, first, "running")
+        queue.submit({})
+        queue.submit({})
+        with pytest.raises(JobQueueFull) as error:
+            queue.submit({})
+        assert error.value.retry_after == 30
+        assert queue.stats()["rejected"] == 1
+
+        release.set()
+        await wait_for(queue, first, "completed")
+        await queue.shutdown()
+
+    asyncio.run(scenario())
+
+def test_finished_jobs_expire():
+    async def handler(params):
+        return {}
+
+    async def scenario():
+        queue = JobQueue(handler, workers=1, max_queue_size=10, max_finished_jobs=1)
+        await queue.start()
+        first = queue.submit({})
+        await wait_for(queue, first, "completed")
+        second = queue.submit({})
+        await wait_for(queue, second, "completed")
+
+        assert queue.get(first) is None
+        assert queue.get(second)["status"] == "completed"
+        await queue.shutdown()
+
+    asyncio.run(scenario())
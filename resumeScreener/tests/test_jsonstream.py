@@ -0,0 +1,71 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from jsonstream import extract_json, JSONObjectScanner, collect_json, acollect_json, complete_json
+
+def test_extract_json_repairs_fences_comments_and_trailing_commas():
+    text = '```json\n{"match_score": 80, // final score\n "skills": ["Python", "SQL",],}\n```'
+
+    assert extract_json(text) == {"match_score": 80, "skills": ["Python", "SQL"]}
+
+def test_extract_json_closes_truncated_output():
+    assert extract_json('{"name": "Jane", "skills": ["Python", "Dja') == {"name": "Jane", "skills": ["Python", "Dja"]}
+    # a dangling key is cut back to the last complete member
+    assert extract_json('{"name": "Jane", "skills": ["Python"], "summary":') == {"name": "Jane", "skills": ["Python"]}
+
+def test_extract_json_raises_without_object():
+    try:
+        extract_json("Sorry, I cannot help with that.")
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_scanner_ignores_braces_in_strings():
+    scanner = JSONObjectScanner()
+
+    assert not scanner.feed('Here: {"a": "}{", "b": [1, ')
+    assert scanner.feed('2]} trailing')
+
+class StreamingLLM:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+        self.chunks_read = 0
+
+    def _chunks(self, prompt):
+        self.prompts.append(prompt)
+        response = self.responses.pop(0)
+        for i in range(0, len(response), 5):
+            self.chunks_read += 1
+            yield response[i:i + 5]
+
+    def stream(self, prompt):
+        return self._chunks(prompt)
+
+    async def astream(self, prompt):
+        for chunk in self._chunks(prompt):
+            yield chunk
+
+def test_collect_json_stops_when_object_closes():
+    llm = StreamingLLM(['{"a": 1}' + " and some rambling explanation" * 20])
+
+    text = collect_json(llm, "prompt")
+    assert extract_json(text) == {"a": 1}
+    assert llm.chunks_read == 2
+
+def test_acollect_json_streams_tokens():
+    llm = StreamingLLM(['{"a": 1}'])
+    tokens = []
+
+    asyncio.run(acollect_json(llm, "prompt", on_token=tokens.append))
+    assert "".join(tokens) == '{"a": 1}'
+
+def test_complete_json_reprompts_only_missing_fields():
+    llm = StreamingLLM(['{"name": "Jane", "skills": ["Python"', '{"summary": "Backend developer"}'])
+
+    data = complete_json(llm, "Extract the resume", ["name", "skills", "summary"])
+    assert data == {"name": "Jane", "skills": ["Python"], "summary": "Backend developer"}
+    assert len(llm.prompts) == 2
+    assert '"summary"' in llm.prompts[1] and '"name"' not in llm.prompts[1].split("ONLY these keys")[1]
@@ -0,0 +1,175 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from llm_pool import BackendLimiter, PooledLLM
+
+class SlowLLM:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"answer to {prompt}"
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return f"answer to {prompt}"
+
+    async def astream(self, prompt):
+        self.calls += 1
+        for token in ("answer ", "to ", prompt):
+            await asyncio.sleep(self.delay / 3)
+            yield token
+
+def test_identical_prompts_share_one_call():
+    llm = SlowLLM()
+    pooled = PooledLLM(llm, BackendLimiter(max_in_flight=4))
+
+    async def run():
+        return await asyncio.gather(*(pooled.ainvoke("same JD") for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert results == ["answer to same JD"] * 20
+    assert llm.calls == 1
+    assert pooled.stats()["coalesced"] == 19
+
+def test_in_flight_limit_per_backend():
+    llm = SlowLLM()
+    limiter = BackendLimiter(max_in_flight=2)
+    first, second = PooledLLM(llm, limiter), PooledLLM(llm, limiter)
+
+    async def run():
+        await asyncio.gather(*(client.ainvoke(f"prompt {i} {n}") for i in range(6) for n, client in enumerate((first, second))))
+
+    asyncio.run(run())
+    assert llm.calls == 12
+    assert llm.peak == 2
+
+def test_coalesced_streams_get_full_text():
+    llm = SlowLLM()
+    pooled = PooledLLM(llm, BackendLimiter(max_in_flight=4))
+
+    async def collect():
+        return "".join([chunk async for chunk in pooled.astream("resume")])
+
+    async def run():
+        return await asyncio.gather(*(collect() for _ in range(5)))
+
+    assert asyncio.run(run()) == ["answer to resume"] * 5
+    assert llm.calls == 1
+
+def test_sync_single_flight():
+    llm = SlowLLM()
+    pooled = PooledLLM(llm, BackendLimiter(max_in_flight=4))
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(pooled.invoke("same"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["answer to same"] * 8
+    assert llm.calls == 1
+    assert pooled.stats()["calls"] + pooled.stats()["coalesced"] == 8
+
+def test_counters_are_exact_under_threads():
+    pooled = PooledLLM(SlowLLM(delay=0), BackendLimiter(max_in_flight=16), single_flight=False)
+
+    def worker():
+        for i in range(500):
+            pooled.invoke(f"prompt {i}")
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pooled.stats()["calls"] == 8 * 500
+
+class CountingLLM:
+    """
+        Records the peak number of concurrent calls across threads and event loops
+    """
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+
+    def _enter(self):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _exit(self):
+        with self.lock:
+            self.active -= 1
+
+    def invoke(self, prompt):
+        self._enter()
+        time.sleep(self.delay)
+        self._exit()
+        return prompt
+
+    async def ainvoke(self, prompt):
+        self._enter()
+        await asyncio.sleep(self.delay)
+        self._exit()
+        return prompt
+
+def test_sync_and_async_callers_share_the_limit():
+    llm = CountingLLM()
+    pooled = PooledLLM(llm, BackendLimiter(max_in_flight=3), single_flight=False)
+
+    def sync_caller(n):
+        for i in range(5):
+            pooled.invoke(f"sync {n} {i}")
+
+    def async_caller(n):
+        async def run():
+            await asyncio.gather(*(pooled.ainvoke(f"async {n} {i}") for i in range(10)))
+        asyncio.run(run())
+
+    # Two event loops and two plain threads against one backend
+    threads = [threading.Thread(target=sync_caller, args=(n,)) for n in range(2)]
+    threads += [threading.Thread(target=async_caller, args=(n,)) for n in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert llm.calls == 2 * 5 + 2 * 10
+    assert llm.peak == 3
+    assert pooled.limiter.in_flight == 0
+
+def test_cancelled_waiter_gives_up_its_place():
+    llm = CountingLLM(delay=0.05)
+    pooled = PooledLLM(llm, BackendLimiter(max_in_flight=1), single_flight=False)
+
+    async def run():
+        first = asyncio.create_task(pooled.ainvoke("first"))
+        waiting = asyncio.create_task(pooled.ainvoke("cancelled"))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        return await first, await pooled.ainvoke("last")
+
+    assert asyncio.run(run()) == ("first", "last")
+    assert llm.calls == 2
+    assert pooled.limiter.in_flight == 0
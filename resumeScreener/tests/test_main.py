@@ -0,0 +1,97 @@
+import sys
+import os
+import uuid
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+import main
+import tracing
+from config import EXTRACTION_CONFIG, REPORT_CONFIG, CANDIDATE_STORE_CONFIG, RETRIEVAL_CONFIG, WORKFLOW_CONFIG
+from evaluation import get_evaluation_queue
+from benchmarks.fake_llm import FakeLLM, NullTracer
+from test_candidate import fake_agents
+
+@pytest.fixture
+def llm(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(main, "_agents", fake_agents(llm))
+    monkeypatch.setattr(tracing, "_tracer", NullTracer())
+    monkeypatch.setattr(get_evaluation_queue(), "sample_rate", 0.0)
+    monkeypatch.setitem(EXTRACTION_CONFIG, "use_process_pool", False)
+    monkeypatch.setitem(REPORT_CONFIG, "enabled", False)
+    monkeypatch.setitem(CANDIDATE_STORE_CONFIG, "enabled", False)
+    monkeypatch.setitem(RETRIEVAL_CONFIG, "enabled", False)
+    return llm
+
+async def run_nodes(thread_id=None, **state_kwargs):
+    """
+        Run the compiled workflow, return the nodes in the order they finished and the final state
+    """
+    app = main.get_workflow_app()
+    state = await main._build_initial_state(**state_kwargs)
+    config = {"configurable": {"thread_id": thread_id or f"test-{uuid.uuid4().hex}"}}
+    nodes = []
+    try:
+        async for update in app.astream(state, config, stream_mode="updates"):
+            nodes.extend(update)
+    finally:
+        main._checkpointer.mark_completed(config["configurable"]["thread_id"])
+    return nodes, app.get_state(config).values
+
+def test_errors_of_both_parallel_parsers_are_merged(llm):
+    nodes, state = asyncio.run(run_nodes(
+        job_description="", resume_file=None, resume_text=None, resume_bytes=b"%PDF-1.4\nnot really a pdf"
+    ))
+
+    assert set(nodes[:2]) == {"parse_resume", "parse_jd"}
+    # Both branch errors survive the join, the skipped match adds its own
+    errors = sorted(state["error"].split("; ")[:2])
+    assert errors[0].startswith("Could not read PDF") and errors[1] == "No job description text provided"
+    assert state["final_report"].startswith("#Analysis Failed")
+    assert llm.calls == 0
+
+def test_fast_mode_skips_the_parallel_parsers(llm):
+    nodes, state = asyncio.run(run_nodes(
+        job_description="Backend developer, Python and Django", resume_file=None,
+        resume_text="Jane Doe, Python developer", fast_mode=True
+    ))
+
+    assert nodes == ["fast_analysis", "compile_report"]
+    assert llm.calls == 1
+    assert state["error"] is None and state["match_results"]["match_score"]
+
+def test_workflow_is_compiled_once_and_keeps_only_recent_checkpoints(llm, monkeypatch):
+    monkeypatch.setattr(main, "_workflow_app", None)
+    monkeypatch.setattr(main, "_checkpointer", None)
+    monkeypatch.setitem(WORKFLOW_CONFIG, "max_completed_threads", 2)
+    app = main.get_workflow_app()
+
+    threads = [f"thread-{i}" for i in range(5)]
+    for thread_id in threads:
+        asyncio.run(run_nodes(
+            thread_id, job_description="Backend developer, Python", resume_file=None, resume_text="Jane Doe, Python developer"
+        ))
+
+    assert main.get_workflow_app() is app
+    checkpoints = {
+        thread_id: main._checkpointer.get_tuple({"configurable": {"thread_id": thread_id}}) for thread_id in threads
+    }
+    assert [thread_id for thread_id, checkpoint in checkpoints.items() if checkpoint is not None] == threads[-2:]
+    assert list(main._checkpointer._completed) == threads[-2:]
+
+def test_fast_mode_results_are_not_indexed(llm, monkeypatch):
+    indexed = []
+    monkeypatch.setattr(main, "_index_parsed_sync", lambda kind, data, name=None: indexed.append(kind))
+    monkeypatch.setitem(RETRIEVAL_CONFIG, "enabled", True)
+
+    asyncio.run(run_nodes(
+        job_description="Backend developer, Python", resume_file=None, resume_text="Jane Doe, Python developer", fast_mode=True
+    ))
+    assert indexed == []
+
+    asyncio.run(run_nodes(
+        job_description="Backend developer, Python", resume_file=None, resume_text="Jane Doe, Python developer"
+    ))
+    assert sorted(indexed) == ["jd", "resume"]
@@ -0,0 +1,43 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cache import LRUCache
+from benchmarks.fake_llm import FakeLLM
+from Agents.matcherAgent import MatcherAgent
+
+RESUME = {
+    "name": "Jane Doe", "email": "jane@example.com",
+    "skills": ["Python", "Django"], "experience": [{"title": "Backend Engineer", "years of experience": "4"}],
+    "education": ["B.S. in Computer Science"]
+}
+JD = {
+    "title": "Backend Developer", "location": "Remote", "salary": "$120k",
+    "required skills": ["Python", "Django"], "preferred skills": "AWS",
+    "experience required": "3+ years", "qualifications": ["Bachelor's degree"]
+}
+
+def test_cosmetic_jd_edits_reuse_the_match():
+    llm = FakeLLM()
+    agent = MatcherAgent(llm, cache=LRUCache())
+    first = agent.run(RESUME, JD)
+
+    edited = dict(JD, title="Backend Developer (Python)", location="Berlin", salary="$130k",
+                  summary="Join our team", **{"required skills": ["django", " python "]})
+    # the local score is recomputed on the current data, the LLM part is reused
+    for results in (agent.run(RESUME, edited), asyncio.run(agent.arun(dict(RESUME, phone="555-0100"), edited))):
+        assert results["Suggestions"] == first["Suggestions"]
+        assert results["match_score"] == first["match_score"]
+    assert llm.calls == 1
+    assert agent.cache_stats()["hits"] == 2
+
+def test_requirement_changes_trigger_a_new_match():
+    llm = FakeLLM()
+    agent = MatcherAgent(llm, cache=LRUCache())
+    agent.run(RESUME, JD)
+
+    agent.run(RESUME, dict(JD, **{"required skills": ["Python", "Django", "Kubernetes"]}))
+    agent.run(RESUME, dict(JD, **{"experience required": "5+ years"}))
+    agent.run(dict(RESUME, skills=["Python", "Django", "AWS"]), JD)
+    assert llm.calls == 4
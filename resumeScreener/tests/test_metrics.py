@@ -0,0 +1,60 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from metrics import Counter, Histogram, Registry, track_stage, STAGE_SECONDS, ERRORS, LLM_CALL_SECONDS, JSON_PARSE_SECONDS
+from jsonstream import complete_json
+
+class FakeLLM:
+    def __init__(self, response):
+        self.response = response
+
+    def invoke(self, prompt):
+        return self.response
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.register(Histogram("test_latency_seconds", "Latency", ["stage"], buckets=(0.1, 1)))
+    latency.observe(0.05, stage="parse")
+    latency.observe(0.5, stage="parse")
+    latency.observe(5, stage="parse")
+
+    text = registry.render()
+    assert "# TYPE test_latency_seconds histogram" in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{stage="parse"} 3' in text
+    assert 'test_latency_seconds_sum{stage="parse"} 5.55' in text
+
+def test_counter_escapes_label_values():
+    registry = Registry()
+    errors = registry.register(Counter("test_errors_total", "Errors", ["stage"]))
+    errors.inc(stage='say "hi"')
+    errors.inc(2, stage='say "hi"')
+
+    assert 'test_errors_total{stage="say \\"hi\\""} 3' in registry.render()
+
+def test_track_stage_times_nodes_and_counts_errors():
+    @track_stage("test_async_node")
+    async def failing_node(state):
+        return {"error": "boom"}
+
+    @track_stage("test_sync_node")
+    def ok_node(state):
+        return {"final_report": "ok"}
+
+    asyncio.run(failing_node({}))
+    ok_node({})
+
+    assert STAGE_SECONDS.count(stage="test_async_node") == 1
+    assert ERRORS.value(stage="test_async_node") == 1
+    assert STAGE_SECONDS.count(stage="test_sync_node") == 1
+    assert ERRORS.value(stage="test_sync_node") == 0
+
+def test_llm_call_and_parse_are_timed_per_agent():
+    complete_json(FakeLLM('{"match_score": 80}'), "prompt", ["match_score"], agent="test_agent")
+
+    assert LLM_CALL_SECONDS.count(agent="test_agent") == 1
+    assert JSON_PARSE_SECONDS.count(agent="test_agent") == 1
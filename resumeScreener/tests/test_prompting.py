@@ -0,0 +1,69 @@
+import sys
+import os
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from prompting import compact, serialize_section, count_tokens, _dumps
+
+RESUME = {
+    "name": "Jane Doe",
+    "email": "jane@example.com",
+    "phone": "N/A",
+    "skills": ["Python", "Django", "N/A"],
+    "experience": [
+        {"company": "Acme", "title": "Developer", "description": "Built   dashboards " * 200, "years of experience": "2"},
+        {"company": "Beta", "title": "Intern", "description": "Wrote tests", "years of experience": "N/A"}
+    ],
+    "projects": "N/A",
+    "awards": []
+}
+
+def test_compact_drops_empty_and_contact_fields():
+    data = compact(RESUME)
+
+    assert "name" not in data and "email" not in data and "projects" not in data and "awards" not in data
+    assert data["skills"] == ["Python", "Django"]
+    assert data["exp"][1] == {"company": "Beta", "title": "Intern", "desc": "Wrote tests"}
+
+def test_serialize_section_fits_budget():
+    text, tokens = serialize_section(RESUME, max_tokens=120)
+
+    assert tokens <= 120
+    assert tokens == count_tokens(text)
+    data = json.loads(text)
+    assert data["skills"] == ["Python", "Django"]
+    assert data["exp"][0]["desc"].endswith("...")
+
+def test_serialize_section_without_budget_keeps_content():
+    text, _ = serialize_section({"required skills": ["Python"], "summary": "N/A"})
+
+    assert text == '{"req_skills":["Python"]}'
+
+def test_budget_trims_low_value_fields_and_keeps_skills():
+    skills = [f"Skill {i}" for i in range(40)]
+    resume = {
+        "skills": skills,
+        "experience": [{"title": f"Engineer {i}", "description": "Shipped features " * 30} for i in range(8)],
+        "summary": "Seasoned engineer " * 20,
+        "publications": [f"Paper {i}" for i in range(10)],
+        "other": "Chess, hiking " * 10
+    }
+    budget = count_tokens(_dumps(skills)) + 80
+
+    text, tokens = serialize_section(resume, max_tokens=budget)
+
+    assert tokens <= budget
+    data = json.loads(text)
+    assert data["skills"] == skills
+    assert "other" not in data and "pubs" not in data and "summary" not in data
+    assert data["exp"]
+
+def test_budget_cuts_inside_strings_and_keeps_requirements():
+    jd = {"required skills": ["Python", "Django"], "preferred skills": ["AWS"], "title": "Backend " * 2000}
+
+    text, tokens = serialize_section(jd, max_tokens=40)
+
+    assert tokens <= 40
+    data = json.loads(text)
+    assert data["req_skills"] == ["Python", "Django"] and data["pref_skills"] == ["AWS"]
+    assert data["title"].endswith("...")
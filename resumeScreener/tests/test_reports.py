@@ -0,0 +1,59 @@
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from reports import BackgroundReportWriter, JSONLReportSink, MarkdownReportSink, new_report_id
+
+def record(report_id=None, text="Match Score: 80%"):
+    return {"report_id": report_id or new_report_id(), "created_at": "2025-01-01T00:00:00", "final_report": text}
+
+def test_report_ids_do_not_collide():
+    ids = {new_report_id() for _ in range(1000)}
+    assert len(ids) == 1000
+
+def test_markdown_sink_keeps_newest_files(tmp_path):
+    sink = MarkdownReportSink(str(tmp_path), max_files=3)
+    for i in range(5):
+        sink.write_batch([record(f"r{i}")])
+        os.utime(sink.path_for(f"r{i}"), (i, i))  # distinct mtimes, r0 oldest
+
+    assert sorted(os.listdir(tmp_path)) == ["report_r2.md", "report_r3.md", "report_r4.md"]
+
+def test_markdown_sink_age_retention(tmp_path):
+    sink = MarkdownReportSink(str(tmp_path), max_age_days=1)
+    sink.write_batch([record("old")])
+    os.utime(sink.path_for("old"), (time.time() - 3 * 86400,) * 2)
+    sink.write_batch([record("new")])
+
+    assert os.listdir(tmp_path) == ["report_new.md"]
+
+def test_jsonl_sink_appends_and_rotates(tmp_path):
+    path = str(tmp_path / "reports.jsonl")
+    sink = JSONLReportSink(path, segment_bytes=200, max_files=2)
+    for i in range(12):
+        sink.write_batch([record(f"r{i}")])
+
+    segments = [name for name in os.listdir(tmp_path) if name != "reports.jsonl"]
+    assert 0 < len(segments) <= 2
+    with open(os.path.join(tmp_path, sorted(segments)[-1]), encoding="utf-8") as f:
+        assert json.loads(f.readline())["final_report"] == "Match Score: 80%"
+
+def test_background_writer_batches_off_thread(tmp_path):
+    batches = []
+
+    class Recorder:
+        def write_batch(self, records):
+            batches.append(len(records))
+
+        def close(self):
+            pass
+
+    writer = BackgroundReportWriter(Recorder(), batch_size=10, flush_interval=0.05)
+    for _ in range(25):
+        assert writer.submit(record())
+    writer.shutdown()
+
+    assert sum(batches) == 25 and max(batches) <= 10
+    assert writer.stats()["written"] == 25
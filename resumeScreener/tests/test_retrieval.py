@@ -0,0 +1,70 @@
+import sys
+import os
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import main
+from retrieval import RetrievalIndex, document_text
+from benchmarks.fake_llm import FakeLLM
+from test_candidate import fake_agents
+
+BACKEND = {"name": "Jane", "skills": ["Python", "Django", "PostgreSQL"], "summary": "Backend engineer building APIs"}
+FRONTEND = {"name": "John", "skills": ["React", "TypeScript", "CSS"], "summary": "Frontend engineer building UIs"}
+DATA = {"name": "Ana", "skills": ["Python", "Pandas", "Scikit-learn"], "summary": "Data scientist"}
+JD = {"title": "Backend Developer", "required skills": ["Python", "Django"], "preferred skills": "PostgreSQL, AWS"}
+
+def test_skills_share_tokens_across_resume_and_jd():
+    assert "skill_python" in document_text(BACKEND)
+    assert "skill_python" in document_text(JD)
+    assert document_text({"name": "N/A", "skills": "N/A"}) == ""
+
+def test_search_returns_most_similar_first():
+    index = RetrievalIndex(n_features=2 ** 12)
+    for resume in (FRONTEND, DATA, BACKEND):
+        index.add(resume, {"name": resume["name"]})
+
+    hits = index.search(JD, top_k=2)
+    assert [hit["metadata"]["name"] for hit in hits] == ["Jane", "Ana"]
+    assert hits[0]["score"] > hits[1]["score"] > 0
+
+def test_index_deduplicates_and_evicts_oldest():
+    index = RetrievalIndex(n_features=2 ** 12, max_documents=2)
+    first = index.add(BACKEND)
+    assert index.add(dict(BACKEND)) == first
+    assert index.add({"skills": "N/A"}) is None
+    assert len(index) == 1
+
+    index.add(FRONTEND)
+    index.add(DATA)
+    assert len(index) == 2
+    assert first not in [hit["id"] for hit in index.search(JD, top_k=5)]
+
+def test_batch_shortlist_limits_matcher_calls(monkeypatch):
+    llm = FakeLLM()
+    monkeypatch.setattr(main, "_agents", fake_agents(llm))
+    resumes = [{"name": f"resume {i}", "text": f"Candidate {i}" + " Python" * i} for i in range(6)]
+
+    result = asyncio.run(main.process_batch("Backend developer, Python and Django", resumes, shortlist=2))
+
+    # 1 JD parse + 6 resume parses + 2 matcher calls
+    assert llm.calls == 1 + 6 + 2
+    shortlisted = [c for c in result["candidates"] if c["shortlisted"]]
+    assert len(shortlisted) == 2
+    assert all(c["similarity"] > 0 for c in shortlisted)
+    assert all(c["match_results"] for c in result["candidates"])
+
+def test_index_is_rebuilt_from_the_candidate_store_without_contacts(monkeypatch, tmp_path):
+    import retrieval
+    import candidates
+    store = candidates.CandidateStore(str(tmp_path / "candidates.db"))
+    store.add(dict(BACKEND, email="jane@example.com", phone="555-0100"))
+    store.add(dict(FRONTEND, email="john@example.com"))
+    monkeypatch.setattr(candidates, "_store", store)
+    monkeypatch.setattr(retrieval, "_indexes", {})
+
+    assert retrieval.rebuild_resume_index() == 2
+    hits = retrieval.get_index("resume").search(JD, top_k=1)
+    assert hits[0]["metadata"]["name"] == "Jane"
+    assert hits[0]["metadata"]["data"]["skills"] == BACKEND["skills"]
+    assert "email" not in hits[0]["metadata"]["data"] and "phone" not in hits[0]["metadata"]["data"]
+    store.close()
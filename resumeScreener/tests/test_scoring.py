@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scoring import LocalScorer, normalize_skill, degree_level, parse_years
+
+RESUME = {
+    "skills": ["Python", "Django", "SQL", "Communication"],
+    "experience": [
+        {"company": "Acme", "title": "Developer", "description": "Built React dashboards", "years of experience": "2 years"}
+    ],
+    "education": ["B.S. in Computer Science"]
+}
+
+JD = {
+    "required skills": ["Python", "Django", "React", "Kubernetes"],
+    "preferred skills": ["AWS"],
+    "experience required": "4+ years",
+    "qualifications": ["Bachelor's degree in Computer Science"],
+    "summary": "Strong communication skills are a must."
+}
+
+def test_normalize_skill_aliases():
+    assert normalize_skill(" React.js ") == "react"
+    assert normalize_skill("K8s") == "kubernetes"
+
+def test_parse_helpers():
+    assert parse_years("3+ years") == 3.0
+    assert parse_years("N/A") is None
+    assert degree_level(["Bachelor in Information Systems"]) == 2
+    assert degree_level(["MS in Computer Science", "B.Tech"]) == 3
+
+def test_score_is_deterministic_and_explained():
+    result = LocalScorer().score(RESUME, JD)
+
+    assert result == LocalScorer().score(RESUME, JD)
+    assert result["matching_skills"] == ["Python", "Django", "React", "communication"]
+    assert result["missing_skills"] == ["Kubernetes"]
+    assert result["score_breakdown"]["experience"] == 50.0
+    assert result["score_breakdown"]["education"] == 100.0
+    assert 0 <= result["match_score"] <= 100
+
+def test_score_many_ranks_pool():
+    weak = {"skills": ["Excel"], "education": "N/A", "experience": "N/A"}
+    scores = LocalScorer().score_many([weak, RESUME], JD)
+
+    assert scores[1]["match_score"] > scores[0]["match_score"]
+    assert scores[0]["missing_skills"] == ["Python", "Django", "React", "Kubernetes"]
+
+def test_unknown_jd_fields_are_left_out():
+    result = LocalScorer().score(RESUME, {"required skills": ["Python"]})
+
+    assert result["score_breakdown"]["experience"] is None
+    assert result["match_score"] == 100
+
+def test_llm_ratings_complete_the_rubric():
+    jd = {"required skills": ["Python"]}
+    result = LocalScorer().score(RESUME, jd, assessment={"domain_relevance": 100, "project_relevance": "0"})
+
+    # technical 30% at 100, domain 10% at 100, project 10% at 0
+    assert result["match_score"] == 80
+    assert result["score_breakdown"]["domain_relevance"] == 100.0
+    assert result["score_breakdown"]["project_relevance"] == 0.0
+    # missing ratings are left out like unknown JD fields
+    assert LocalScorer().score(RESUME, jd, assessment={})["match_score"] == 100
@@ -0,0 +1,36 @@
+import sys
+import os
+import json
+import subprocess
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import WORKFLOW_CONFIG
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HEAVY_MODULES = ["judgeval", "langgraph", "langchain_core", "langchain_ollama", "langchain_openai", "PyPDF2", "docx"]
+
+IMPORT_API = f"""
+import sys, json, time
+start = time.perf_counter()
+import api
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def import_api():
+    # No credentials - importing the API must not need them
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("JUDGMENT_", "LLM_", "OPENAI_"))}
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_API], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_importing_the_api_loads_no_heavy_sdk():
+    assert import_api()["loaded"] == []
+
+def test_importing_the_api_stays_within_budget():
+    # Best of three, the first run also pays for cold .pyc / disk caches
+    seconds = min(import_api()["seconds"] for _ in range(3))
+    assert seconds < WORKFLOW_CONFIG["import_budget_seconds"]
@@ -0,0 +1,66 @@
+"""
+Lazy Judgeval tracing - the Tracer (and the judgeval SDK) is only loaded when the first traced node runs
+"""
+
+import sys
+import asyncio
+import functools
+import threading
+from typing import Optional, Tuple
+
+from config import JUDGEVAL_CONFIG
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """
+        Process-wide Tracer, created on first use. Creating it validates the API key over the network.
+    """
+    global _tracer
+
+    with _tracer_lock:
+        if _tracer is None:
+            from judgeval.common.tracer import Tracer
+            _tracer = Tracer(project_name=JUDGEVAL_CONFIG["project_name"])
+        return _tracer
+
+
+def observe(name: str, span_type: str):
+    """
+        Same as @tracer.observe(name=..., span_type=...), but the tracer is only created
+        (and the function wrapped) on the first call
+    """
+    def decorator(func):
+        traced = []
+
+        def resolve():
+            if not traced:
+                traced.append(get_tracer().observe(name=name, span_type=span_type)(func))
+            return traced[0]
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await resolve()(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return resolve()(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def current_span() -> Tuple[Optional[str], Optional[str]]:
+    """
+        (trace_id, span_id) of the traced node running in this context, (None, None) outside a trace.
+        Never imports judgeval, nothing can be traced before the Tracer loaded it.
+    """
+    module = sys.modules.get("judgeval.common.tracer")
+    trace = module.current_trace_var.get() if module is not None else None
+    if trace is None:
+        return None, None
+    return trace.trace_id, module.current_span_var.get()
@@ -1,29 +1,63 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+from config import LLM_CONFIG
+from llm_pool import get_pooled_llm
+
+def _http_limits():
+   import httpx
+   return httpx.Limits(
+      max_connections=LLM_CONFIG["max_connections"],
+      max_keepalive_connections=LLM_CONFIG["max_keepalive_connections"],
+      keepalive_expiry=LLM_CONFIG["keepalive_expiry"]
+   )
 
 def initialize_llm():
+   """
+      Shared pooled client for the configured backend - keep-alive connections, a per-backend
+      in-flight limit and single-flight coalescing of identical prompts
+   """
+   load_dotenv()
    provider = os.getenv("LLM_PROVIDER")
    model_name = os.getenv("LLM_MODEL")
    base_url = os.getenv("LLM_BASE_URL")
-   
+
    if provider == "openai":
-       from langchain_openai import ChatOpenAI
-       api_key = os.getenv("OPENAI_API_KEY")
-       if not api_key:
-           raise ValueError("Missing OPENAI_API_KEY")
-       llm = ChatOpenAI(model=model_name, api_key=api_key)
-       print(f"Using OpenAI model: {model_name}")
-   
+      from langchain_openai import ChatOpenAI
+      api_key = os.getenv("OPENAI_API_KEY")
+      if not api_key:
+         raise ValueError("Missing OPENAI_API_KEY")
+
+      def factory():
+         import httpx
+         print(f"Using OpenAI model: {model_name}")
+         return ChatOpenAI(
+            model=model_name,
+            api_key=api_key,
+            http_client=httpx.Client(limits=_http_limits(), timeout=LLM_CONFIG["timeout_seconds"]),
+            http_async_client=httpx.AsyncClient(limits=_http_limits(), timeout=LLM_CONFIG["timeout_seconds"])
+         )
+
    elif provider == "ollama":
-       from langchain_ollama import OllamaLLM
-       if not base_url:
-           base_url = "http://localhost:11434"
-       llm = OllamaLLM(model=model_name, base_url=base_url)
-       print(f"Using Ollama model: {model_name}")
-   
+      from langchain_ollama import OllamaLLM
+      if not base_url:
+         base_url = "http://localhost:11434"
+
+      def factory():
+         print(f"Using Ollama model: {model_name}")
+         return OllamaLLM(
+            model=model_name,
+            base_url=base_url,
+            client_kwargs={"limits": _http_limits(), "timeout": LLM_CONFIG["timeout_seconds"]}
+         )
+
    else:
-       raise ValueError(f"Unsupported provider: {provider}")
-   
-   return llm
\ No newline at end of file
+      raise ValueError(f"Unsupported provider: {provider}")
+
+   return get_pooled_llm(
+      (provider, model_name, base_url),
+      backend=f"{provider}:{base_url or 'default'}",
+      factory=factory,
+      max_in_flight=LLM_CONFIG["max_in_flight"],
+      single_flight=LLM_CONFIG["single_flight"]
+   )